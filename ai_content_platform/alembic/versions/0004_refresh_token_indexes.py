@@ -0,0 +1,38 @@
+"""Index refresh_tokens for hash lookup, per-user revocation and expiry sweeps
+
+Revision ID: 0004_refresh_token_indexes
+Revises: 0003_seed_permissions_and_admin
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0004_refresh_token_indexes"
+down_revision = "0003_seed_permissions_and_admin"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rotation and revocation look tokens up by hash
+    op.create_index(
+        "ix_refresh_tokens_token_hash", "refresh_tokens", ["token_hash"], unique=True
+    )
+    # Live tokens per user; revoked rows are excluded to keep the index small
+    op.create_index(
+        "ix_refresh_tokens_active_user",
+        "refresh_tokens",
+        ["user_id", "expires_at"],
+        postgresql_where=sa.text("NOT revoked"),
+        sqlite_where=sa.text("NOT revoked"),
+    )
+    # The expiry sweeper deletes in expires_at order
+    op.create_index("ix_refresh_tokens_expires_at", "refresh_tokens", ["expires_at"])
+
+
+def downgrade():
+    op.drop_index("ix_refresh_tokens_expires_at", table_name="refresh_tokens")
+    op.drop_index("ix_refresh_tokens_active_user", table_name="refresh_tokens")
+    op.drop_index("ix_refresh_tokens_token_hash", table_name="refresh_tokens")
@@ -0,0 +1,36 @@
+"""Index (created_at, id) sort keys used by keyset-paginated list endpoints
+
+Revision ID: 0005_keyset_pagination_indexes
+Revises: 0004_refresh_token_indexes
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0005_keyset_pagination_indexes"
+down_revision = "0004_refresh_token_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Article listing (all and flagged) pages newest first
+    op.create_index("ix_articles_created_at_id", "articles", ["created_at", "id"])
+    # Conversations and notifications are always listed per user
+    op.create_index(
+        "ix_conversations_user_created_at_id",
+        "conversations",
+        ["user_id", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_notifications_user_created_at_id",
+        "notifications",
+        ["user_id", "created_at", "id"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_notifications_user_created_at_id", table_name="notifications")
+    op.drop_index("ix_conversations_user_created_at_id", table_name="conversations")
+    op.drop_index("ix_articles_created_at_id", table_name="articles")
@@ -0,0 +1,76 @@
+"""Full-text search for articles: weighted tsvector, GIN and pg_trgm indexes
+
+On SQLite, an FTS5 external-content table kept in sync by triggers instead.
+
+Revision ID: 0006_article_search
+Revises: 0005_keyset_pagination_indexes
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0006_article_search"
+down_revision = "0005_keyset_pagination_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        # Title ranks above summary, summary above body
+        op.execute(
+            "ALTER TABLE articles ADD COLUMN search_vector tsvector "
+            "GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(summary, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(content, '')), 'C')"
+            ") STORED"
+        )
+        op.execute(
+            "CREATE INDEX ix_articles_search_vector "
+            "ON articles USING gin (search_vector)"
+        )
+        # Fuzzy fallback on titles
+        op.execute(
+            "CREATE INDEX ix_articles_title_trgm "
+            "ON articles USING gin (title gin_trgm_ops)"
+        )
+    elif dialect == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE articles_fts USING fts5("
+            "title, summary, content, content='articles', content_rowid='id', "
+            "tokenize='porter unicode61')"
+        )
+        op.execute(
+            "CREATE TRIGGER articles_fts_ai AFTER INSERT ON articles BEGIN "
+            "INSERT INTO articles_fts(rowid, title, summary, content) "
+            "VALUES (new.id, new.title, new.summary, new.content); END"
+        )
+        op.execute(
+            "CREATE TRIGGER articles_fts_ad AFTER DELETE ON articles BEGIN "
+            "INSERT INTO articles_fts(articles_fts, rowid, title, summary, content) "
+            "VALUES ('delete', old.id, old.title, old.summary, old.content); END"
+        )
+        op.execute(
+            "CREATE TRIGGER articles_fts_au AFTER UPDATE ON articles BEGIN "
+            "INSERT INTO articles_fts(articles_fts, rowid, title, summary, content) "
+            "VALUES ('delete', old.id, old.title, old.summary, old.content); "
+            "INSERT INTO articles_fts(rowid, title, summary, content) "
+            "VALUES (new.id, new.title, new.summary, new.content); END"
+        )
+        op.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_articles_title_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_articles_search_vector")
+        op.execute("ALTER TABLE articles DROP COLUMN IF EXISTS search_vector")
+    elif dialect == "sqlite":
+        for trigger in ("articles_fts_au", "articles_fts_ad", "articles_fts_ai"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS articles_fts")
@@ -0,0 +1,42 @@
+"""Generation jobs table for queued AI article generation
+
+Revision ID: 0007_generation_jobs
+Revises: 0006_article_search
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0007_generation_jobs"
+down_revision = "0006_article_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "generation_jobs",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("status", sa.String, nullable=False),
+        sa.Column("title", sa.String, nullable=False),
+        sa.Column("content", sa.Text, nullable=False),
+        sa.Column("summary", sa.Text, nullable=True),
+        sa.Column("tag_names", sa.Text, nullable=True),
+        sa.Column(
+            "article_id", sa.Integer, sa.ForeignKey("articles.id"), nullable=True
+        ),
+        sa.Column("error", sa.Text, nullable=True),
+        sa.Column("attempts", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime),
+        sa.Column("started_at", sa.DateTime, nullable=True),
+        sa.Column("finished_at", sa.DateTime, nullable=True),
+    )
+    op.create_index("ix_generation_jobs_user_id", "generation_jobs", ["user_id"])
+
+
+def downgrade():
+    op.drop_index("ix_generation_jobs_user_id", table_name="generation_jobs")
+    op.drop_table("generation_jobs")
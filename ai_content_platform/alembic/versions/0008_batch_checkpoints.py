@@ -0,0 +1,28 @@
+"""Checkpoints for resumable batch jobs (summary backfill)
+
+Revision ID: 0008_batch_checkpoints
+Revises: 0007_generation_jobs
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0008_batch_checkpoints"
+down_revision = "0007_generation_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "batch_checkpoints",
+        sa.Column("name", sa.String, primary_key=True),
+        sa.Column("last_id", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime),
+    )
+
+
+def downgrade():
+    op.drop_table("batch_checkpoints")
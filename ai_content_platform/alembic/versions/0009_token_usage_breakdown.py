@@ -0,0 +1,55 @@
+"""Split token usage into prompt, context and completion tokens
+
+Revision ID: 0009_token_usage_breakdown
+Revises: 0008_batch_checkpoints
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0009_token_usage_breakdown"
+down_revision = "0008_batch_checkpoints"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("token_usage") as batch:
+        batch.alter_column("conversation_id", existing_type=sa.Integer, nullable=True)
+        batch.alter_column("user_id", existing_type=sa.Integer, nullable=True)
+        batch.add_column(
+            sa.Column("purpose", sa.String, nullable=False, server_default="chat")
+        )
+        for name in ("prompt_tokens", "context_tokens", "completion_tokens"):
+            batch.add_column(
+                sa.Column(name, sa.Integer, nullable=False, server_default="0")
+            )
+        batch.add_column(
+            sa.Column(
+                "estimated", sa.Boolean, nullable=False, server_default=sa.false()
+            )
+        )
+    # Earlier rows counted characters; convert them to a token estimate
+    op.execute(
+        "UPDATE token_usage SET tokens_used = (tokens_used + 3) / 4, "
+        "estimated = true"
+    )
+
+
+def downgrade():
+    op.execute(
+        "DELETE FROM token_usage WHERE conversation_id IS NULL OR user_id IS NULL"
+    )
+    with op.batch_alter_table("token_usage") as batch:
+        for name in (
+            "estimated",
+            "completion_tokens",
+            "context_tokens",
+            "prompt_tokens",
+            "purpose",
+        ):
+            batch.drop_column(name)
+        batch.alter_column("user_id", existing_type=sa.Integer, nullable=False)
+        batch.alter_column("conversation_id", existing_type=sa.Integer, nullable=False)
@@ -0,0 +1,52 @@
+"""Hourly and daily token usage rollups
+
+Revision ID: 0010_token_usage_rollups
+Revises: 0009_token_usage_breakdown
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0010_token_usage_rollups"
+down_revision = "0009_token_usage_breakdown"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("token_usage", sa.Column("model", sa.String, nullable=True))
+    op.create_table(
+        "token_usage_rollups",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("granularity", sa.String(4), nullable=False),
+        sa.Column("bucket_start", sa.DateTime, nullable=False),
+        sa.Column("user_id", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("conversation_id", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("model", sa.String, nullable=False, server_default=""),
+        sa.Column("purpose", sa.String, nullable=False, server_default=""),
+        sa.Column("requests", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("prompt_tokens", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("context_tokens", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column(
+            "completion_tokens", sa.BigInteger, nullable=False, server_default="0"
+        ),
+        sa.Column("tokens_used", sa.BigInteger, nullable=False, server_default="0"),
+        # Leading (granularity, bucket_start) serves time-range queries
+        sa.UniqueConstraint(
+            "granularity",
+            "bucket_start",
+            "user_id",
+            "conversation_id",
+            "model",
+            "purpose",
+            name="uq_token_usage_rollups_cell",
+        ),
+    )
+
+
+def downgrade():
+    op.drop_table("token_usage_rollups")
+    with op.batch_alter_table("token_usage") as batch:
+        batch.drop_column("model")
@@ -0,0 +1,27 @@
+"""Signup time on users, for analytics time series
+
+Revision ID: 0011_user_created_at
+Revises: 0010_token_usage_rollups
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0011_user_created_at"
+down_revision = "0010_token_usage_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing users have no known signup time and stay NULL
+    op.add_column("users", sa.Column("created_at", sa.DateTime, nullable=True))
+    op.create_index("ix_users_created_at", "users", ["created_at"])
+
+
+def downgrade():
+    op.drop_index("ix_users_created_at", table_name="users")
+    with op.batch_alter_table("users") as batch:
+        batch.drop_column("created_at")
@@ -0,0 +1,28 @@
+"""Index the (created_at, id) sort key of messages within a conversation
+
+Revision ID: 0012_message_history_index
+Revises: 0011_user_created_at
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0012_message_history_index"
+down_revision = "0011_user_created_at"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Message history pages and chat context reads are per conversation,
+    # newest first
+    op.create_index(
+        "ix_messages_conversation_created_at_id",
+        "messages",
+        ["conversation_id", "created_at", "id"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_messages_conversation_created_at_id", table_name="messages")
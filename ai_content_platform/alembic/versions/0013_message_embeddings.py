@@ -0,0 +1,50 @@
+"""Message embeddings for semantic chat retrieval
+
+Revision ID: 0013_message_embeddings
+Revises: 0012_message_history_index
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0013_message_embeddings"
+down_revision = "0012_message_history_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "message_embeddings",
+        sa.Column(
+            "message_id",
+            sa.Integer,
+            sa.ForeignKey("messages.id"),
+            primary_key=True,
+        ),
+        sa.Column("embedder", sa.String, primary_key=True),
+        sa.Column(
+            "conversation_id",
+            sa.Integer,
+            sa.ForeignKey("conversations.id"),
+            nullable=False,
+        ),
+        # Packed little-endian float32
+        sa.Column("vector", sa.LargeBinary, nullable=False),
+    )
+    # Retrieval loads one conversation's vectors past a message id
+    op.create_index(
+        "ix_message_embeddings_conversation_embedder_message",
+        "message_embeddings",
+        ["conversation_id", "embedder", "message_id"],
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_message_embeddings_conversation_embedder_message",
+        table_name="message_embeddings",
+    )
+    op.drop_table("message_embeddings")
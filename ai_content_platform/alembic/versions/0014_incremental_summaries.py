@@ -0,0 +1,51 @@
+"""Message counter and optimistic summary watermark on conversations
+
+Revision ID: 0014_incremental_summaries
+Revises: 0013_message_embeddings
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0014_incremental_summaries"
+down_revision = "0013_message_embeddings"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "conversations",
+        sa.Column("message_count", sa.Integer, nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "conversations",
+        sa.Column("summary_last_message_id", sa.Integer, nullable=True),
+    )
+    op.add_column(
+        "conversations",
+        sa.Column("summary_version", sa.Integer, nullable=False, server_default="0"),
+    )
+    op.execute(
+        "UPDATE conversations SET message_count = ("
+        "SELECT COUNT(*) FROM messages "
+        "WHERE messages.conversation_id = conversations.id)"
+    )
+    # Existing summaries cover their first summary_msg_count messages
+    op.execute(
+        "UPDATE conversations SET summary_last_message_id = ranked.id FROM ("
+        "SELECT id, conversation_id, ROW_NUMBER() OVER ("
+        "PARTITION BY conversation_id ORDER BY created_at, id) AS position "
+        "FROM messages WHERE sender IN ('user', 'assistant')) AS ranked "
+        "WHERE ranked.conversation_id = conversations.id "
+        "AND ranked.position = conversations.summary_msg_count"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("conversations") as batch:
+        batch.drop_column("summary_version")
+        batch.drop_column("summary_last_message_id")
+        batch.drop_column("message_count")
@@ -6,6 +6,7 @@ Loads environment variables for DB and secret settings.
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
 from dotenv import load_dotenv
+from typing import Optional
 import os
 
 load_dotenv()
@@ -24,10 +25,228 @@ class Settings(BaseSettings):
     DB_NAME: str = os.getenv("DB_NAME", "ai_content_platform")
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your_secret_key")
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "your-gemini-api-key")
+    # Override the Gemini API endpoint (proxies, local fakes in benchmarks)
+    GEMINI_BASE_URL: str = os.getenv("GEMINI_BASE_URL", "")
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Asymmetric JWT keys (RS*/ES* algorithms); see shared/jwt_keys.py
+    JWT_PRIVATE_KEY_PATH: Optional[str] = os.getenv("JWT_PRIVATE_KEY_PATH")
+    JWT_PUBLIC_KEYS_PATH: Optional[str] = os.getenv("JWT_PUBLIC_KEYS_PATH")
+    JWT_ACTIVE_KID: Optional[str] = os.getenv("JWT_ACTIVE_KID")
+    # Verified access-token cache (skips jwt.decode for repeated tokens)
+    ACCESS_TOKEN_CACHE_ENABLED: bool = (
+        os.getenv("ACCESS_TOKEN_CACHE_ENABLED", "true").lower() == "true"
+    )
+    ACCESS_TOKEN_CACHE_MAXSIZE: int = int(
+        os.getenv("ACCESS_TOKEN_CACHE_MAXSIZE", 10000)
+    )
+    ACCESS_TOKEN_CACHE_MAX_TTL_SECONDS: int = int(
+        os.getenv("ACCESS_TOKEN_CACHE_MAX_TTL_SECONDS", 300)
+    )
+
+    # Shared LLM gateway: HTTP pool size, per-model concurrency and rate limit
+    LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", 20))
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+    LLM_REQUESTS_PER_MINUTE: float = float(os.getenv("LLM_REQUESTS_PER_MINUTE", 60))
+    LLM_RATE_LIMIT_BURST: int = int(os.getenv("LLM_RATE_LIMIT_BURST", 10))
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", 60))
+    # LLM response cache (non-streaming calls), optionally shared via Redis
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", 86400))
+    LLM_CACHE_MAXSIZE: int = int(os.getenv("LLM_CACHE_MAXSIZE", 2048))
+    LLM_CACHE_MAX_ENTRY_BYTES: int = int(
+        os.getenv("LLM_CACHE_MAX_ENTRY_BYTES", 64 * 1024)
+    )
+    LLM_CACHE_REDIS_ENABLED: bool = (
+        os.getenv("LLM_CACHE_REDIS_ENABLED", "false").lower() == "true"
+    )
+
+    # Background AI article generation (content_jobs stream, worker.py)
+    CONTENT_JOB_WORKERS: int = int(os.getenv("CONTENT_JOB_WORKERS", 4))
+    CONTENT_JOB_MAX_ATTEMPTS: int = int(os.getenv("CONTENT_JOB_MAX_ATTEMPTS", 3))
+    CONTENT_JOB_CLAIM_IDLE_SECONDS: int = int(
+        os.getenv("CONTENT_JOB_CLAIM_IDLE_SECONDS", 300)
+    )
+    CONTENT_JOB_SSE_POLL_SECONDS: float = float(
+        os.getenv("CONTENT_JOB_SSE_POLL_SECONDS", 1.0)
+    )
+    CONTENT_JOB_SSE_MAX_SECONDS: int = int(
+        os.getenv("CONTENT_JOB_SSE_MAX_SECONDS", 300)
+    )
+
+    # Summary backfill for articles without one (batch_summaries.py)
+    SUMMARY_BATCH_PAGE_SIZE: int = int(os.getenv("SUMMARY_BATCH_PAGE_SIZE", 200))
+    SUMMARY_BATCH_CONCURRENCY: int = int(os.getenv("SUMMARY_BATCH_CONCURRENCY", 4))
+    SUMMARY_PACK_MAX_ARTICLES: int = int(os.getenv("SUMMARY_PACK_MAX_ARTICLES", 8))
+    SUMMARY_PACK_MAX_CHARS: int = int(os.getenv("SUMMARY_PACK_MAX_CHARS", 24000))
+    # Provider prices used for cost reports
+    LLM_COST_PER_1K_INPUT_TOKENS: float = float(
+        os.getenv("LLM_COST_PER_1K_INPUT_TOKENS", 0.0003)
+    )
+    LLM_COST_PER_1K_OUTPUT_TOKENS: float = float(
+        os.getenv("LLM_COST_PER_1K_OUTPUT_TOKENS", 0.0025)
+    )
+    # Strings whose local token estimate is memoised (llm_usage.py)
+    TOKEN_COUNT_CACHE_SIZE: int = int(os.getenv("TOKEN_COUNT_CACHE_SIZE", 4096))
+
+    # Sliding-window LLM budgets held in Redis (llm_quota.py). Budgets are
+    # "role=tokens:requests" lists; 0 means unlimited.
+    LLM_QUOTA_ENABLED: bool = os.getenv("LLM_QUOTA_ENABLED", "false").lower() == "true"
+    LLM_QUOTA_WINDOW_SECONDS: int = int(os.getenv("LLM_QUOTA_WINDOW_SECONDS", 3600))
+    LLM_QUOTA_USER_TOKENS: int = int(os.getenv("LLM_QUOTA_USER_TOKENS", 100000))
+    LLM_QUOTA_USER_REQUESTS: int = int(os.getenv("LLM_QUOTA_USER_REQUESTS", 100))
+    LLM_QUOTA_ROLE_BUDGETS: str = os.getenv(
+        "LLM_QUOTA_ROLE_BUDGETS", "admin=0:0,creator=500000:500"
+    )
+    LLM_QUOTA_ROLE_POOLS: str = os.getenv("LLM_QUOTA_ROLE_POOLS", "")
+    LLM_QUOTA_RESERVE_TOKENS: int = int(os.getenv("LLM_QUOTA_RESERVE_TOKENS", 2048))
+
+    # Hourly/daily token usage rollups maintained by the worker (usage_rollups.py)
+    USAGE_ROLLUP_INTERVAL_SECONDS: int = int(
+        os.getenv("USAGE_ROLLUP_INTERVAL_SECONDS", 60)
+    )
+    USAGE_ROLLUP_BATCH_SIZE: int = int(os.getenv("USAGE_ROLLUP_BATCH_SIZE", 5000))
+    USAGE_ROLLUP_LAG_SECONDS: int = int(os.getenv("USAGE_ROLLUP_LAG_SECONDS", 5))
+
+    # Admin dashboard aggregates: fresh for TTL, then served stale while one
+    # request recomputes them
+    ANALYTICS_CACHE_TTL_SECONDS: float = float(
+        os.getenv("ANALYTICS_CACHE_TTL_SECONDS", 30)
+    )
+    ANALYTICS_CACHE_STALE_SECONDS: float = float(
+        os.getenv("ANALYTICS_CACHE_STALE_SECONDS", 300)
+    )
+    ANALYTICS_SERIES_MAX_DAYS: int = int(os.getenv("ANALYTICS_SERIES_MAX_DAYS", 365))
+
+    # Per-process hot cache of chat context (owner, summary, recent messages);
+    # disable when running several API replicas (chat/context.py)
+    CHAT_CONTEXT_CACHE_ENABLED: bool = (
+        os.getenv("CHAT_CONTEXT_CACHE_ENABLED", "true").lower() == "true"
+    )
+    CHAT_CONTEXT_CACHE_MAXSIZE: int = int(os.getenv("CHAT_CONTEXT_CACHE_MAXSIZE", 1000))
+    CHAT_CONTEXT_CACHE_TTL_SECONDS: int = int(
+        os.getenv("CHAT_CONTEXT_CACHE_TTL_SECONDS", 900)
+    )
+    CHAT_CONTEXT_BUFFER_SIZE: int = int(os.getenv("CHAT_CONTEXT_BUFFER_SIZE", 50))
+
+    # Incremental conversation summaries (chat/services.py): new messages are
+    # read in passes of at most CHAT_SUMMARY_MAX_MESSAGES and summarised in
+    # chunks, whose summaries are merged CHAT_SUMMARY_FANOUT at a time
+    CHAT_SUMMARY_MAX_MESSAGES: int = int(os.getenv("CHAT_SUMMARY_MAX_MESSAGES", 400))
+    CHAT_SUMMARY_CHUNK_MESSAGES: int = int(os.getenv("CHAT_SUMMARY_CHUNK_MESSAGES", 40))
+    CHAT_SUMMARY_CHUNK_CHARS: int = int(os.getenv("CHAT_SUMMARY_CHUNK_CHARS", 12000))
+    CHAT_SUMMARY_FANOUT: int = int(os.getenv("CHAT_SUMMARY_FANOUT", 8))
+
+    # Semantic retrieval memory for chat (chat/embeddings.py, chat/retrieval.py).
+    # CHAT_EMBEDDER is "hashing" (local, CPU only) or "gemini"
+    CHAT_RETRIEVAL_ENABLED: bool = (
+        os.getenv("CHAT_RETRIEVAL_ENABLED", "false").lower() == "true"
+    )
+    CHAT_EMBEDDER: str = os.getenv("CHAT_EMBEDDER", "hashing")
+    CHAT_EMBEDDING_MODEL: str = os.getenv(
+        "CHAT_EMBEDDING_MODEL", "models/text-embedding-004"
+    )
+    CHAT_EMBEDDING_DIM: int = int(os.getenv("CHAT_EMBEDDING_DIM", 256))
+    CHAT_EMBEDDING_INTERVAL_SECONDS: int = int(
+        os.getenv("CHAT_EMBEDDING_INTERVAL_SECONDS", 5)
+    )
+    CHAT_EMBEDDING_BATCH_SIZE: int = int(os.getenv("CHAT_EMBEDDING_BATCH_SIZE", 256))
+    CHAT_EMBEDDING_LAG_SECONDS: int = int(os.getenv("CHAT_EMBEDDING_LAG_SECONDS", 2))
+    CHAT_RETRIEVAL_TOP_K: int = int(os.getenv("CHAT_RETRIEVAL_TOP_K", 5))
+    CHAT_RETRIEVAL_MIN_SCORE: float = float(os.getenv("CHAT_RETRIEVAL_MIN_SCORE", 0.1))
+    CHAT_RETRIEVAL_MAX_MESSAGES: int = int(
+        os.getenv("CHAT_RETRIEVAL_MAX_MESSAGES", 1000)
+    )
+    CHAT_RETRIEVAL_CACHE_MAXSIZE: int = int(
+        os.getenv("CHAT_RETRIEVAL_CACHE_MAXSIZE", 200)
+    )
+    CHAT_RETRIEVAL_CACHE_TTL_SECONDS: int = int(
+        os.getenv("CHAT_RETRIEVAL_CACHE_TTL_SECONDS", 900)
+    )
+    CHAT_RETRIEVAL_QUERY_CACHE_MAXSIZE: int = int(
+        os.getenv("CHAT_RETRIEVAL_QUERY_CACHE_MAXSIZE", 1000)
+    )
+    CHAT_RETRIEVAL_EMBED_TIMEOUT_SECONDS: float = float(
+        os.getenv("CHAT_RETRIEVAL_EMBED_TIMEOUT_SECONDS", 1.0)
+    )
+
+    # Conversation id -> owner map behind chat access checks (chat/access.py)
+    CONVERSATION_OWNER_CACHE_MAXSIZE: int = int(
+        os.getenv("CONVERSATION_OWNER_CACHE_MAXSIZE", 10000)
+    )
+    CONVERSATION_OWNER_CACHE_TTL_SECONDS: int = int(
+        os.getenv("CONVERSATION_OWNER_CACHE_TTL_SECONDS", 3600)
+    )
+
+    # Characters of content returned as "snippet" by the message history
+    # endpoint's fields= projection
+    CHAT_MESSAGE_SNIPPET_CHARS: int = int(os.getenv("CHAT_MESSAGE_SNIPPET_CHARS", 120))
+
+    # Keyset pagination for list endpoints
+    PAGE_SIZE_DEFAULT: int = int(os.getenv("PAGE_SIZE_DEFAULT", 50))
+    PAGE_SIZE_MAX: int = int(os.getenv("PAGE_SIZE_MAX", 200))
+
+    # Article search: auto (by DB dialect), postgresql, sqlite or memory
+    SEARCH_BACKEND: str = os.getenv("SEARCH_BACKEND", "auto")
+    SEARCH_FUZZY_FALLBACK: bool = (
+        os.getenv("SEARCH_FUZZY_FALLBACK", "true").lower() == "true"
+    )
+    SEARCH_SNIPPET_WORDS: int = int(os.getenv("SEARCH_SNIPPET_WORDS", 24))
+    # In-process index (SEARCH_BACKEND=memory); empty path disables snapshots
+    SEARCH_INDEX_SNAPSHOT_PATH: str = os.getenv("SEARCH_INDEX_SNAPSHOT_PATH", "")
+    SEARCH_INDEX_COMPACT_MIN: int = int(os.getenv("SEARCH_INDEX_COMPACT_MIN", 1000))
+    # Picks up articles created by the generation job workers; 0 turns it off
+    SEARCH_INDEX_REFRESH_SECONDS: int = int(
+        os.getenv("SEARCH_INDEX_REFRESH_SECONDS", 10)
+    )
+
+    # Streaming admin exports
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", 500))
+    EXPORT_CHUNK_BYTES: int = int(os.getenv("EXPORT_CHUNK_BYTES", 64 * 1024))
+    EXPORT_GZIP_LEVEL: int = int(os.getenv("EXPORT_GZIP_LEVEL", 6))
+
+    # Principal cache (authenticated user, roles and permissions per token)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 60))
+    PRINCIPAL_CACHE_MAXSIZE: int = int(os.getenv("PRINCIPAL_CACHE_MAXSIZE", 10000))
+    PRINCIPAL_CACHE_REDIS_ENABLED: bool = (
+        os.getenv("PRINCIPAL_CACHE_REDIS_ENABLED", "false").lower() == "true"
+    )
+
+    # RBAC: compiled permission masks, optionally embedded in access tokens
+    RBAC_TOKEN_CLAIMS_ENABLED: bool = (
+        os.getenv("RBAC_TOKEN_CLAIMS_ENABLED", "true").lower() == "true"
+    )
+    RBAC_REGISTRY_TTL_SECONDS: int = int(os.getenv("RBAC_REGISTRY_TTL_SECONDS", 30))
+
+    # Password hashing pool (bcrypt runs off the event loop)
+    PASSWORD_HASH_EXECUTOR: str = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+    PASSWORD_HASH_WORKERS: int = int(
+        os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1))
+    )
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 64))
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 12))
+
+    # Verified-credential cache (skips bcrypt for repeated identical logins)
+    CREDENTIAL_CACHE_ENABLED: bool = (
+        os.getenv("CREDENTIAL_CACHE_ENABLED", "true").lower() == "true"
+    )
+    CREDENTIAL_CACHE_TTL_SECONDS: int = int(
+        os.getenv("CREDENTIAL_CACHE_TTL_SECONDS", 60)
+    )
+    CREDENTIAL_CACHE_MAXSIZE: int = int(os.getenv("CREDENTIAL_CACHE_MAXSIZE", 1024))
+
+    # Refresh tokens: Redis revocation set and background expiry sweeps
+    REFRESH_TOKEN_REVOCATION_REDIS_ENABLED: bool = (
+        os.getenv("REFRESH_TOKEN_REVOCATION_REDIS_ENABLED", "false").lower() == "true"
+    )
+    REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS: int = int(
+        os.getenv("REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS", 300)
+    )
+    REFRESH_TOKEN_SWEEP_BATCH_SIZE: int = int(
+        os.getenv("REFRESH_TOKEN_SWEEP_BATCH_SIZE", 5000)
+    )
 
     model_config = ConfigDict(env_file=".env", env_file_encoding="utf-8", extra="allow")
 
@@ -1,6 +1,7 @@
+import asyncio
 from fastapi import FastAPI, Depends
 from ai_content_platform.app.modules.auth.routes import auth_router
-from ai_content_platform.app.shared.dependencies import require_role
+from ai_content_platform.app.shared.dependencies import get_db, require_role
 from ai_content_platform.app.modules.users.routes import user_router
 from ai_content_platform.app.modules.content.routes import content_router
 from ai_content_platform.app.modules.chat.routes import chat_router
@@ -8,7 +9,15 @@ from ai_content_platform.app.modules.admin.routes import admin_router
 from ai_content_platform.app.modules.notifications.routes import (
     router as notifications_router,
 )
+from ai_content_platform.app.modules.content.inverted_index import (
+    article_index,
+    index_enabled,
+    refresh_article_index,
+    warm_article_index,
+)
+from ai_content_platform.app.modules.content.llm_gateway import llm_gateway
 from ai_content_platform.app.shared.middleware import LoggingMiddleware
+from ai_content_platform.app.config import settings
 
 app = FastAPI()
 app.add_middleware(LoggingMiddleware)
@@ -20,6 +29,32 @@ app.include_router(chat_router)
 app.include_router(notifications_router)
 app.include_router(admin_router)
 
+
+@app.on_event("startup")
+async def build_search_index():
+    if index_enabled():
+        async for db in get_db():
+            await warm_article_index(db)
+        if settings.SEARCH_INDEX_REFRESH_SECONDS > 0:
+            app.state.search_index_refresh = asyncio.create_task(
+                refresh_article_index()
+            )
+
+
+@app.on_event("shutdown")
+async def snapshot_search_index():
+    refresh = getattr(app.state, "search_index_refresh", None)
+    if refresh is not None:
+        refresh.cancel()
+    if index_enabled() and article_index.ready and settings.SEARCH_INDEX_SNAPSHOT_PATH:
+        article_index.snapshot(settings.SEARCH_INDEX_SNAPSHOT_PATH)
+
+
+@app.on_event("shutdown")
+async def close_llm_gateway():
+    await llm_gateway.aclose()
+
+
 # Example admin-only route
 
 
@@ -0,0 +1,90 @@
+"""
+Admin dashboard aggregates.
+dashboard_counts() returns every headline number in one statement (one
+scalar subquery per table) and daily_series() returns both time series in
+one UNION ALL grouped by day, so the database does the counting and each
+dashboard refresh is a single round trip. Token totals come from the daily
+usage rollups (usage_rollups.py).
+
+Results are cached in `analytics_cache` with stale-while-revalidate, so a
+polling dashboard hits the database at most once per TTL.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List
+from sqlalchemy import func, literal, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.modules.chat.models import (
+    Conversation,
+    Message,
+    TokenUsageRollup,
+)
+from ai_content_platform.app.modules.content.models import Article
+from ai_content_platform.app.modules.users.models import User
+from ai_content_platform.app.shared.cache import StaleWhileRevalidateCache
+
+SERIES = {"signups": User.created_at, "articles": Article.created_at}
+
+analytics_cache = StaleWhileRevalidateCache(
+    ttl=settings.ANALYTICS_CACHE_TTL_SECONDS,
+    stale_ttl=settings.ANALYTICS_CACHE_STALE_SECONDS,
+    name="admin_analytics",
+)
+
+
+def _count(*criteria, table):
+    return select(func.count()).select_from(table).where(*criteria).scalar_subquery()
+
+
+async def dashboard_counts(db: AsyncSession) -> dict:
+    token_total = (
+        select(func.coalesce(func.sum(TokenUsageRollup.tokens_used), 0))
+        .where(TokenUsageRollup.granularity == "day")
+        .scalar_subquery()
+    )
+    row = (
+        await db.execute(
+            select(
+                _count(table=User).label("users"),
+                _count(table=Article).label("articles"),
+                _count(Article.flagged.is_(True), table=Article).label(
+                    "flagged_articles"
+                ),
+                _count(table=Conversation).label("conversations"),
+                _count(table=Message).label("messages"),
+                token_total.label("ai_usage"),
+            )
+        )
+    ).one()
+    return {name: int(value or 0) for name, value in row._mapping.items()}
+
+
+async def daily_series(db: AsyncSession, days: int) -> Dict[str, List[dict]]:
+    """
+    Per-day counts for the last `days` days (today included) of each of
+    SERIES, with empty days filled in as zero.
+    """
+    # Timestamps are stored in UTC
+    first = datetime.utcnow().date() - timedelta(days=days - 1)
+    since = datetime.combine(first, datetime.min.time())
+    parts = [
+        select(
+            literal(name).label("series"),
+            func.date(column).label("day"),
+            func.count().label("count"),
+        )
+        .where(column >= since)
+        .group_by(func.date(column))
+        for name, column in SERIES.items()
+    ]
+    rows = (await db.execute(union_all(*parts))).all()
+    counts = {(row.series, str(row.day)): row.count for row in rows}
+    return {
+        name: [
+            {"day": day.isoformat(), "count": counts.get((name, day.isoformat()), 0)}
+            for day in (first + timedelta(days=i) for i in range(days))
+        ]
+        for name in SERIES
+    }
@@ -1,12 +1,22 @@
 # Admin dashboard routes for user management, content moderation,
 # analytics, and system health monitoring
-from fastapi import APIRouter, Depends, status
+from datetime import datetime
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from ai_content_platform.app.config import settings
 from ai_content_platform.app.shared.dependencies import require_role
+from ai_content_platform.app.shared.pagination import PageParams, set_next_cursor
 from ai_content_platform.app.modules.users.schemas import (
     UserCreate,
     UserOut,
     UserUpdate,
 )
+from ai_content_platform.app.modules.admin.exports import (
+    EXPORT_FORMATS,
+    export_articles,
+    export_users,
+)
 from ai_content_platform.app.modules.admin.services import (
     get_all_users,
     create_user_service,
@@ -18,10 +28,14 @@ from ai_content_platform.app.modules.admin.services import (
     delete_article_service,
     get_flagged_content,
     get_analytics_stats,
+    get_analytics_timeseries,
+    get_usage_analytics,
     get_system_health,
     moderate_article_service,
 )
 
+from ai_content_platform.app.modules.content import batch_summaries
+
 # Content moderation endpoints
 
 from ai_content_platform.app.modules.content.schemas import (
@@ -33,14 +47,25 @@ from ai_content_platform.app.modules.content.schemas import (
 admin_router = APIRouter(prefix="/admin", tags=["admin"])
 
 
+def _export_response(body, name: str, fmt: str, gzip: bool) -> StreamingResponse:
+    filename = f"{name}.{fmt}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        body,
+        media_type="application/gzip" if gzip else EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 # List flagged articles
 @admin_router.get(
     "/moderation/flagged",
     response_model=list[ArticleOut],
     dependencies=[Depends(require_role("admin"))],
 )
-async def list_flagged_articles():
-    return await get_flagged_content()
+async def list_flagged_articles(response: Response, page: PageParams = Depends()):
+    result = await get_flagged_content(page.cursor, page.limit)
+    set_next_cursor(response, result)
+    return result.items
 
 
 # User management endpoints
@@ -49,8 +74,22 @@ async def list_flagged_articles():
     response_model=list[UserOut],
     dependencies=[Depends(require_role("admin"))],
 )
-async def admin_list_users():
-    return await get_all_users()
+async def admin_list_users(response: Response, page: PageParams = Depends()):
+    result = await get_all_users(page.cursor, page.limit)
+    set_next_cursor(response, result)
+    return result.items
+
+
+@admin_router.get(
+    "/users/export",
+    dependencies=[Depends(require_role("admin"))],
+)
+async def admin_export_users(
+    format: Literal["ndjson", "json"] = "ndjson",
+    gzip: bool = False,
+    after_id: int = Query(0, ge=0, description="Export only users with a larger id"),
+):
+    return _export_response(export_users(format, gzip, after_id), "users", format, gzip)
 
 
 @admin_router.post(
@@ -89,8 +128,26 @@ async def admin_delete_user(user_id: int):
     response_model=list[ArticleOut],
     dependencies=[Depends(require_role("admin"))],
 )
-async def admin_list_articles():
-    return await get_all_articles()
+async def admin_list_articles(response: Response, page: PageParams = Depends()):
+    result = await get_all_articles(page.cursor, page.limit)
+    set_next_cursor(response, result)
+    return result.items
+
+
+@admin_router.get(
+    "/articles/export",
+    dependencies=[Depends(require_role("admin"))],
+)
+async def admin_export_articles(
+    format: Literal["ndjson", "json"] = "ndjson",
+    gzip: bool = False,
+    updated_since: Optional[datetime] = Query(
+        None, description="Export only articles updated after this time"
+    ),
+):
+    return _export_response(
+        export_articles(format, gzip, updated_since), "articles", format, gzip
+    )
 
 
 @admin_router.post(
@@ -121,28 +178,46 @@ async def admin_delete_article(article_id: int):
     return await delete_article_service(article_id)
 
 
-# List flagged articles (admin only)
+# Moderate article (approve/reject) with AI suggestion
 
 
-@admin_router.get(
-    "/moderation/flagged",
-    response_model=list[ArticleOut],
-    dependencies=[Depends(require_role("admin"))],
+@admin_router.post(
+    "/moderation/{article_id}/review",
+    response_model=ArticleOut,
 )
-async def list_flagged_articles():
-    return await get_flagged_content()
+async def moderate_article(
+    article_id: int, action: str, admin=Depends(require_role("admin"))
+):
+    return await moderate_article_service(article_id, action, admin.id)
 
 
-# Moderate article (approve/reject) with AI suggestion
+# Summary backfill for articles without a summary
 
 
 @admin_router.post(
-    "/moderation/{article_id}/review",
-    response_model=ArticleOut,
+    "/articles/summaries/backfill",
+    status_code=status.HTTP_202_ACCEPTED,
     dependencies=[Depends(require_role("admin"))],
 )
-async def moderate_article(article_id: int, action: str):
-    return await moderate_article_service(article_id, action)
+async def start_summary_backfill(
+    concurrency: Optional[int] = Query(None, ge=1, le=64),
+    limit: Optional[int] = Query(None, ge=1),
+    restart: bool = False,
+):
+    report = batch_summaries.start_backfill(concurrency, limit, restart)
+    if report is None:
+        raise HTTPException(status.HTTP_409_CONFLICT, "A backfill is already running")
+    return report.to_dict()
+
+
+@admin_router.get(
+    "/articles/summaries/backfill", dependencies=[Depends(require_role("admin"))]
+)
+async def summary_backfill_status():
+    report = batch_summaries.backfill_status()
+    if report is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "No backfill has run")
+    return report.to_dict()
 
 
 # Analytics endpoint
@@ -153,6 +228,33 @@ async def get_analytics():
     return await get_analytics_stats()
 
 
+@admin_router.get(
+    "/analytics/timeseries", dependencies=[Depends(require_role("admin"))]
+)
+async def get_analytics_series(
+    days: int = Query(30, ge=1, le=settings.ANALYTICS_SERIES_MAX_DAYS),
+):
+    """Signups and new articles per day over the last `days` days."""
+    return await get_analytics_timeseries(days)
+
+
+@admin_router.get("/analytics/usage", dependencies=[Depends(require_role("admin"))])
+async def get_analytics_usage(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    group_by: List[
+        Literal["bucket", "user", "conversation", "model", "purpose"]
+    ] = Query(default=[]),
+    granularity: Literal["hour", "day"] = "day",
+    user_id: Optional[int] = None,
+):
+    """
+    Token usage summed from the hourly/daily rollups over [start, end),
+    grouped by any of bucket, user, conversation, model and purpose.
+    """
+    return await get_usage_analytics(start, end, group_by, granularity, user_id)
+
+
 # System health monitoring endpoint
 
 
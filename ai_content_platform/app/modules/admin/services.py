@@ -11,7 +11,7 @@ from ai_content_platform.app.modules.users.schemas import (
 )
 from ai_content_platform.app.modules.users.services import (
     get_user_by_username,
-    get_password_hash,
+    get_password_hash_async,
     create_user,
 )
 from ai_content_platform.app.modules.content.models import Article
@@ -21,18 +21,35 @@ from ai_content_platform.app.modules.content.services import (
     update_article,
     delete_article,
 )
-from ai_content_platform.app.modules.content.gemini_service import GeminiService
+from ai_content_platform.app.modules.content.llm_cache import llm_cache
+from ai_content_platform.app.modules.content.llm_gateway import llm_gateway
+from ai_content_platform.app.modules.content.llm_quota import llm_quota
+from ai_content_platform.app.modules.content.llm_usage import UsageMeter
 from ai_content_platform.app.modules.content.schemas import (
     ArticleCreate,
     ArticleUpdate,
     ArticleOut,
 )
-from ai_content_platform.app.modules.chat.models import Conversation
-from ai_content_platform.app.modules.chat.services import get_token_usage
+from ai_content_platform.app.modules.chat.services import track_token_usage
+from ai_content_platform.app.modules.chat import usage_rollups
+from ai_content_platform.app.modules.chat.access import conversation_owners
+from ai_content_platform.app.modules.chat.context import chat_context
+from ai_content_platform.app.modules.chat.retrieval import vector_index
+from ai_content_platform.app.modules.admin import analytics
+from ai_content_platform.app.modules.auth.principal import principal_cache
+from ai_content_platform.app.modules.auth.credential_cache import credential_cache
+from ai_content_platform.app.modules.auth.refresh_tokens import (
+    refresh_token_revocations,
+)
+from ai_content_platform.app.shared import metrics
+from ai_content_platform.app.shared.pagination import Page, fetch_page, id_key
+from ai_content_platform.app.config import settings
+from datetime import datetime
+from typing import Optional, Sequence
+from ai_content_platform.app.shared.utils import verified_token_cache_stats
 from sqlalchemy import func
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
-import os
 import traceback
 
 logger = get_logger(__name__)
@@ -40,15 +57,25 @@ logger = get_logger(__name__)
 # User management
 
 
-async def get_all_users():
-    logger.info("Fetching all users from database")
+async def get_all_users(
+    cursor: Optional[str] = None, limit: int = settings.PAGE_SIZE_DEFAULT
+) -> Page:
+    logger.info(f"Fetching users from database, limit={limit}")
     try:
         async for db in get_db():
             # Eager-load roles if UserOut expects them
-            result = await db.execute(select(User).options(selectinload(User.roles)))
-            users = result.scalars().all()
-            logger.info(f"Fetched {len(users)} users")
-            return [UserOut.model_validate(u) for u in users]
+            page = await fetch_page(
+                db,
+                select(User).options(selectinload(User.roles)),
+                (User.id,),
+                cursor,
+                limit,
+                id_key,
+                desc=False,
+            )
+            logger.info(f"Fetched {len(page.items)} users")
+            page.items = [UserOut.model_validate(u) for u in page.items]
+            return page
             break
     except Exception as e:
         logger.error(f"Error fetching users: {e}", exc_info=True)
@@ -80,14 +107,17 @@ async def update_user_service(user_id: int, update: UserUpdate):
             if not user:
                 logger.error(f"User not found: {user_id}")
                 raise HTTPException(status_code=404, detail="User not found")
+            previous_username = user.username
             if update.username:
                 user.username = update.username
             if update.password:
-                user.hashed_password = get_password_hash(update.password)
+                user.hashed_password = await get_password_hash_async(update.password)
             if update.avatar:
                 user.avatar = update.avatar
             await db.commit()
             await db.refresh(user)
+            await principal_cache.invalidate_user(previous_username)
+            credential_cache.invalidate_user(previous_username)
             logger.info(f"User updated: {user_id}")
             return UserOut.model_validate(user)
             break
@@ -104,8 +134,11 @@ async def delete_user_service(user_id: int):
             if not user:
                 logger.error(f"User not found: {user_id}")
                 raise HTTPException(status_code=404, detail="User not found")
+            username = user.username
             await db.delete(user)
             await db.commit()
+            await principal_cache.invalidate_user(username)
+            credential_cache.invalidate_user(username)
             logger.info(f"User deleted: {user_id}")
             return None
             break
@@ -117,16 +150,16 @@ async def delete_user_service(user_id: int):
 # Article management
 
 
-async def get_all_articles():
-    logger.info("Fetching all articles from database")
+async def get_all_articles(
+    cursor: Optional[str] = None, limit: int = settings.PAGE_SIZE_DEFAULT
+) -> Page:
+    logger.info(f"Fetching articles from database, limit={limit}")
     try:
         async for db in get_db():
-            # Eager-load tags if ArticleOut expects them
-            stmt = select(Article).options(selectinload(Article.tags))
-            result = await db.execute(stmt)
-            articles = result.scalars().all()
-            logger.info(f"Fetched {len(articles)} articles")
-            return [ArticleOut.model_validate(a) for a in articles]
+            page = await list_articles(db, cursor, limit)
+            logger.info(f"Fetched {len(page.items)} articles")
+            page.items = [ArticleOut.model_validate(a) for a in page.items]
+            return page
             break
     except Exception as e:
         logger.error(f"Error fetching articles: {e}", exc_info=True)
@@ -183,26 +216,25 @@ async def delete_article_service(article_id: int):
 
 
 # Moderation
-async def get_flagged_content():
+async def get_flagged_content(
+    cursor: Optional[str] = None, limit: int = settings.PAGE_SIZE_DEFAULT
+) -> Page:
     logger.info("Fetching flagged content")
     try:
         async for db in get_db():
-            # Eager-load tags for flagged articles if needed
-            result = await db.execute(
-                select(Article)
-                .options(selectinload(Article.tags))
-                .where(Article.flagged)
-            )
-            flagged = result.scalars().all()
-            logger.info(f"Fetched {len(flagged)} flagged articles")
-            return [ArticleOut.model_validate(a) for a in flagged]
+            page = await list_articles(db, cursor, limit, flagged=True)
+            logger.info(f"Fetched {len(page.items)} flagged articles")
+            page.items = [ArticleOut.model_validate(a) for a in page.items]
+            return page
             break
     except Exception as e:
         logger.error(f"Error fetching flagged content: {e}", exc_info=True)
         raise
 
 
-async def moderate_article_service(article_id: int, action: str):
+async def moderate_article_service(
+    article_id: int, action: str, user_id: Optional[int] = None
+):
     logger.info(f"Moderating article: {article_id} with action: {action}")
     try:
         async for db in get_db():
@@ -216,10 +248,10 @@ async def moderate_article_service(article_id: int, action: str):
             if not article:
                 logger.error(f"Article not found: {article_id}")
                 raise HTTPException(status_code=404, detail="Article not found")
-            gemini_api_key = os.getenv("GEMINI_API_KEY", "your-gemini-api-key")
-            gemini_service = GeminiService(api_key=gemini_api_key)
             prompt = f"Should the following article be approved or rejected for publication?\nContent: {article.content}"
-            ai_suggestion = await gemini_service.generate_text(prompt)
+            usage = UsageMeter()
+            ai_suggestion = await llm_gateway.generate_text(prompt, usage=usage)
+            await track_token_usage(db, None, user_id, usage, purpose="moderation")
             if action == "approve":
                 article.flagged = False
                 article.summary = (article.summary or "") + "\n[Approved by admin]"
@@ -245,29 +277,57 @@ async def moderate_article_service(article_id: int, action: str):
 # Analytics
 
 
+async def _load_dashboard_counts():
+    async for db in get_db():
+        stats = await analytics.dashboard_counts(db)
+        logger.info(f"Analytics recomputed: {stats}")
+        return stats
+
+
 async def get_analytics_stats():
+    """
+    Headline counts, from the analytics cache. ai_usage comes from the daily
+    rollups, so usage from the last rollup interval is not included yet.
+    """
     logger.info("Fetching analytics stats")
     try:
+        return await analytics.analytics_cache.get("counts", _load_dashboard_counts)
+    except Exception as e:
+        logger.error(f"Error fetching analytics stats: {e}", exc_info=True)
+        raise
+
+
+async def get_analytics_timeseries(days: int = 30):
+    logger.info(f"Fetching analytics time series for {days} days")
+
+    async def load():
         async for db in get_db():
-            user_count = (await db.execute(func.count(User.id))).scalar()
-            article_count = (await db.execute(func.count(Article.id))).scalar()
-            conv_result = await db.execute(select(Conversation.id))
-            conversation_ids = [row[0] for row in conv_result.fetchall()]
-            ai_usage = 0
-            for conv_id in conversation_ids:
-                token_usages = await get_token_usage(db, conv_id)
-                ai_usage += sum(tu.tokens_used for tu in token_usages)
-            logger.info(
-                f"Analytics: users={user_count}, articles={article_count}, ai_usage={ai_usage}"
+            return await analytics.daily_series(db, days)
+
+    try:
+        return await analytics.analytics_cache.get(("series", days), load)
+    except Exception as e:
+        logger.error(f"Error fetching analytics time series: {e}", exc_info=True)
+        raise
+
+
+async def get_usage_analytics(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    group_by: Sequence[str] = (),
+    granularity: str = "day",
+    user_id: Optional[int] = None,
+):
+    logger.info(
+        f"Fetching usage analytics: {start} - {end}, by {list(group_by)}, {granularity}"
+    )
+    try:
+        async for db in get_db():
+            return await usage_rollups.usage_totals(
+                db, start, end, group_by, granularity, user_id
             )
-            return {
-                "users": user_count,
-                "articles": article_count,
-                "ai_usage": ai_usage,
-            }
-            break
     except Exception as e:
-        logger.error(f"Error fetching analytics stats: {e}", exc_info=True)
+        logger.error(f"Error fetching usage analytics: {e}", exc_info=True)
         raise
 
 
@@ -289,7 +349,25 @@ async def get_system_health():
                 details = str(e)
                 errors = [traceback.format_exc()]
                 logger.error(f"System health check failed: {details}")
-            return {"status": status, "details": details, "errors": errors}
+            return {
+                "status": status,
+                "details": details,
+                "errors": errors,
+                "caches": {
+                    "principal": principal_cache.stats(),
+                    "verified_credentials": credential_cache.stats(),
+                    "verified_access_tokens": verified_token_cache_stats(),
+                    "refresh_token_revocations": refresh_token_revocations.stats(),
+                    "llm_responses": llm_cache.stats(),
+                    "admin_analytics": analytics.analytics_cache.stats(),
+                    "chat_context": chat_context.stats(),
+                    "conversation_owners": conversation_owners.stats(),
+                    "chat_vectors": vector_index.stats(),
+                },
+                "llm_gateway": llm_gateway.stats(),
+                "llm_quota": llm_quota.stats(),
+                "metrics": metrics.snapshot(),
+            }
             break
     except Exception as e:
         logger.error(f"Error checking system health: {e}", exc_info=True)
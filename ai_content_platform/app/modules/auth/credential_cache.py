@@ -0,0 +1,57 @@
+"""
+Short-lived cache of successfully verified credentials.
+Integration clients log in with the same username/password many times per
+minute; each login would otherwise pay a full bcrypt verification. Entries are
+keyed by an HMAC (server secret) of username, password and stored hash, so the
+plaintext password is never kept, and a password change alters the stored hash
+and therefore the key. The cache is memory-only, bounded and TTL'd, and only
+successful verifications are remembered, so failed guesses always pay bcrypt.
+"""
+
+import hashlib
+import hmac
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.shared.cache import TTLCache
+from ai_content_platform.app.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class VerifiedCredentialCache:
+    def __init__(self, maxsize: int, ttl: int, enabled: bool = True):
+        self.enabled = enabled
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, name="verified_credentials")
+        self._secret = settings.SECRET_KEY.encode()
+
+    def _key(self, username: str, password: str, hashed_password: str) -> bytes:
+        message = "\0".join((username, password, hashed_password)).encode()
+        return hmac.new(self._secret, message, hashlib.sha256).digest()
+
+    def is_verified(self, username: str, password: str, hashed_password: str) -> bool:
+        if not self.enabled:
+            return False
+        return self._cache.get(self._key(username, password, hashed_password)) == (
+            username
+        )
+
+    def remember(self, username: str, password: str, hashed_password: str) -> None:
+        if self.enabled:
+            self._cache.set(self._key(username, password, hashed_password), username)
+
+    def invalidate_user(self, username: str) -> None:
+        removed = self._cache.delete_where(lambda _, value: value == username)
+        if removed:
+            logger.info(f"Dropped {removed} verified credentials for user: {username}")
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return dict(self._cache.stats(), enabled=self.enabled)
+
+
+credential_cache = VerifiedCredentialCache(
+    maxsize=settings.CREDENTIAL_CACHE_MAXSIZE,
+    ttl=settings.CREDENTIAL_CACHE_TTL_SECONDS,
+    enabled=settings.CREDENTIAL_CACHE_ENABLED,
+)
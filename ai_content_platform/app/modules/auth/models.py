@@ -1,4 +1,14 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Table
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    Table,
+    text,
+)
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ai_content_platform.app.database import Base
@@ -49,3 +59,16 @@ class RefreshToken(Base):
     expires_at = Column(DateTime, nullable=False)
     revoked = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Mirrors migration 0004_refresh_token_indexes
+    __table_args__ = (
+        Index("ix_refresh_tokens_token_hash", "token_hash", unique=True),
+        Index(
+            "ix_refresh_tokens_active_user",
+            "user_id",
+            "expires_at",
+            postgresql_where=text("NOT revoked"),
+            sqlite_where=text("NOT revoked"),
+        ),
+        Index("ix_refresh_tokens_expires_at", "expires_at"),
+    )
@@ -0,0 +1,123 @@
+"""
+Compiled RBAC permission registry.
+Every row in the permissions table gets a stable bit index (its primary key), and
+each role's grants are precompiled into an integer bitmask. A user's effective
+permissions are the OR of their role masks, so a permission check is a single
+AND against the mask, which access tokens can carry as a signed claim.
+"""
+
+import hashlib
+import time
+from typing import Iterable, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.modules.auth.models import (
+    Permission,
+    Role,
+    role_permissions,
+)
+from ai_content_platform.app.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class PermissionRegistry:
+    """
+    Process-wide snapshot of permissions and role grants.
+    The version is a digest of the snapshot, so it changes whenever an admin
+    changes grants; tokens and cached principals stamped with an older version
+    are re-resolved from the DB.
+    """
+
+    def __init__(self, ttl: float = 30.0):
+        self.ttl = ttl
+        self.version: Optional[str] = None
+        self._bits: dict[str, int] = {}
+        self._names: dict[int, str] = {}
+        self._role_masks: dict[str, int] = {}
+        self._loaded_at = 0.0
+
+    @property
+    def loaded(self) -> bool:
+        return self.version is not None
+
+    async def refresh(self, db: AsyncSession) -> "PermissionRegistry":
+        """Reload permissions and role grants from the DB."""
+        perm_rows = (await db.execute(select(Permission.id, Permission.name))).all()
+        grant_rows = (
+            await db.execute(
+                select(Role.name, role_permissions.c.permission_id).join(
+                    role_permissions, Role.id == role_permissions.c.role_id
+                )
+            )
+        ).all()
+        bits = {name: perm_id for perm_id, name in perm_rows}
+        role_masks: dict[str, int] = {}
+        for role_name, perm_id in grant_rows:
+            role_masks[role_name] = role_masks.get(role_name, 0) | (1 << perm_id)
+        digest = hashlib.sha1(
+            repr((sorted(bits.items()), sorted(role_masks.items()))).encode()
+        ).hexdigest()[:12]
+        if digest != self.version:
+            logger.info(
+                f"Permission registry loaded: {len(bits)} permissions, version {digest}"
+            )
+        self._bits = bits
+        self._names = {bit: name for name, bit in bits.items()}
+        self._role_masks = role_masks
+        self.version = digest
+        self._loaded_at = time.monotonic()
+        return self
+
+    async def ensure_fresh(self, db: AsyncSession) -> "PermissionRegistry":
+        """Reload only if the snapshot is missing or older than the TTL."""
+        if not self.loaded or time.monotonic() - self._loaded_at > self.ttl:
+            await self.refresh(db)
+        return self
+
+    def bit(self, permission: str) -> Optional[int]:
+        return self._bits.get(permission)
+
+    def mask_for(self, permissions: Iterable[str]) -> int:
+        mask = 0
+        for name in permissions:
+            bit = self._bits.get(name)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def mask_for_roles(self, roles: Iterable[str]) -> int:
+        mask = 0
+        for role in roles:
+            mask |= self._role_masks.get(role, 0)
+        return mask
+
+    def names_for(self, mask: int) -> frozenset:
+        return frozenset(
+            name for bit, name in self._names.items() if (mask >> bit) & 1
+        )
+
+    def allows(self, mask: int, permission: str) -> bool:
+        """O(1) permission test against a compiled mask."""
+        bit = self._bits.get(permission)
+        return bit is not None and bool((mask >> bit) & 1)
+
+
+permission_registry = PermissionRegistry(ttl=settings.RBAC_REGISTRY_TTL_SECONDS)
+
+
+def build_rbac_claims(user, registry: PermissionRegistry) -> dict:
+    """
+    Access-token claims carrying the user's compiled permissions.
+    Expects user.roles to be loaded. Returns {} when claims are disabled.
+    """
+    if not settings.RBAC_TOKEN_CLAIMS_ENABLED or not registry.loaded:
+        return {}
+    role_names = sorted(r.name for r in (getattr(user, "roles", None) or []))
+    return {
+        "uid": user.id,
+        "roles": role_names,
+        "perms": format(registry.mask_for_roles(role_names), "x"),
+        "pv": registry.version,
+    }
@@ -0,0 +1,257 @@
+"""
+Authenticated principal and its cache.
+A Principal is the immutable snapshot of a user's identity, roles and permissions
+that request handlers need. It is cached per access token (username + jti/iat) so
+get_current_user does not reload the user, roles and permissions on every request.
+"""
+
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.shared.cache import TTLCache
+from ai_content_platform.app.shared.logging import get_logger
+from ai_content_platform.app.shared.utils import get_async_redis_connection
+
+logger = get_logger(__name__)
+
+REDIS_KEY_PREFIX = "principal"
+REVOKED_KEY_PREFIX = "principal_revoked"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Read-only view of the authenticated user.
+    Exposes id, username and role like the User model, plus frozen role and
+    permission name sets and the compiled permission mask for O(1) RBAC checks.
+    rbac_version records which permission registry snapshot compiled the mask.
+    """
+
+    id: int
+    username: str
+    role: Optional[str] = None
+    roles: frozenset = field(default_factory=frozenset)
+    permissions: frozenset = field(default_factory=frozenset)
+    permission_mask: int = 0
+    rbac_version: Optional[str] = None
+
+    @classmethod
+    def from_user(cls, user, registry=None) -> "Principal":
+        """Build a principal from a User loaded with roles and permissions."""
+        roles = getattr(user, "roles", None) or []
+        permissions = frozenset(
+            p.name for r in roles for p in (getattr(r, "permissions", None) or [])
+        )
+        return cls(
+            id=user.id,
+            username=user.username,
+            role=getattr(user, "role", None),
+            roles=frozenset(r.name for r in roles),
+            permissions=permissions,
+            permission_mask=registry.mask_for(permissions) if registry else 0,
+            rbac_version=registry.version if registry else None,
+        )
+
+    @classmethod
+    def from_claims(cls, payload: dict, registry) -> Optional["Principal"]:
+        """
+        Build a principal purely from access-token claims, without the DB.
+        Returns None if the token has no RBAC claims or was compiled against a
+        different registry version (grants changed since it was issued).
+        """
+        if "perms" not in payload or "uid" not in payload:
+            return None
+        if not registry.loaded or payload.get("pv") != registry.version:
+            return None
+        try:
+            mask = int(payload["perms"], 16)
+        except (TypeError, ValueError):
+            return None
+        return cls(
+            id=payload["uid"],
+            username=payload["sub"],
+            role=payload.get("role"),
+            roles=frozenset(payload.get("roles") or []),
+            permissions=registry.names_for(mask),
+            permission_mask=mask,
+            rbac_version=registry.version,
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "id": self.id,
+                "username": self.username,
+                "role": self.role,
+                "roles": sorted(self.roles),
+                "permissions": sorted(self.permissions),
+                "permission_mask": format(self.permission_mask, "x"),
+                "rbac_version": self.rbac_version,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Principal":
+        data = json.loads(raw)
+        return cls(
+            id=data["id"],
+            username=data["username"],
+            role=data.get("role"),
+            roles=frozenset(data.get("roles", [])),
+            permissions=frozenset(data.get("permissions", [])),
+            permission_mask=int(data.get("permission_mask") or "0", 16),
+            rbac_version=data.get("rbac_version"),
+        )
+
+    def has_role(self, role: str) -> bool:
+        return role in self.roles
+
+    def has_permission(self, permission: str) -> bool:
+        return permission in self.permissions
+
+
+class PrincipalCache:
+    """
+    Two-tier principal cache keyed by (username, token id).
+    The in-process tier is an LRU with TTL; the optional Redis tier is shared by
+    all workers and stores one hash per username so a user can be invalidated
+    with a single DEL. Redis failures are logged and treated as misses.
+    Invalidation also records a per-user cutoff so self-contained tokens issued
+    before it are not trusted from their claims alone; claims are only trusted
+    at all when that cutoff is shared through Redis.
+    """
+
+    def __init__(self, maxsize: int, ttl: int, redis_enabled: bool = False):
+        self.ttl = ttl
+        self.redis_enabled = redis_enabled
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl, name="principal")
+        self._revoked_before = TTLCache(
+            maxsize=maxsize,
+            ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            name="principal_revocations",
+        )
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.redis_errors = 0
+
+    @staticmethod
+    def _redis_key(username: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:{username}"
+
+    async def get(self, username: str, token_id) -> Optional[Principal]:
+        principal = self._local.get((username, token_id))
+        if principal is not None or not self.redis_enabled:
+            return principal
+        try:
+            raw = await get_async_redis_connection().hget(
+                self._redis_key(username), str(token_id)
+            )
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Principal cache Redis lookup failed: {e}")
+            return None
+        if raw is None:
+            self.redis_misses += 1
+            return None
+        self.redis_hits += 1
+        principal = Principal.from_json(raw)
+        self._local.set((username, token_id), principal)
+        return principal
+
+    async def set(self, principal: Principal, token_id) -> None:
+        self._local.set((principal.username, token_id), principal)
+        if not self.redis_enabled:
+            return
+        try:
+            conn = get_async_redis_connection()
+            key = self._redis_key(principal.username)
+            await conn.hset(key, str(token_id), principal.to_json())
+            await conn.expire(key, self.ttl)
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Principal cache Redis write failed: {e}")
+
+    async def invalidate_user(self, username: str) -> None:
+        """Drop every cached token principal for username (profile/role change)."""
+        removed = self._local.delete_where(lambda key, _: key[0] == username)
+        cutoff = time.time()
+        self._revoked_before.set(username, cutoff)
+        logger.info(f"Invalidated {removed} cached principals for user: {username}")
+        if not self.redis_enabled:
+            return
+        try:
+            conn = get_async_redis_connection()
+            await conn.delete(self._redis_key(username))
+            await conn.set(
+                f"{REVOKED_KEY_PREFIX}:{username}",
+                cutoff,
+                ex=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            )
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Principal cache Redis invalidation failed: {e}")
+
+    async def trusts_claims(self, username: str, issued_at) -> bool:
+        """
+        True if a self-contained token issued at issued_at may be trusted from
+        its claims alone: it is newer than the user's last invalidation, as
+        seen by every worker. That needs the Redis tier; without it, or when
+        Redis cannot be read, an invalidation in another worker would go
+        unseen, so this fails closed and the caller loads the user instead.
+        """
+        if not self.redis_enabled:
+            return False
+        cutoff = self._revoked_before.get(username)
+        try:
+            raw = await get_async_redis_connection().get(
+                f"{REVOKED_KEY_PREFIX}:{username}"
+            )
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Principal cache Redis cutoff lookup failed: {e}")
+            return False
+        if raw is not None:
+            cutoff = max(cutoff or 0.0, float(raw))
+        if cutoff is None:
+            return True
+        return issued_at is not None and float(issued_at) > cutoff
+
+    async def invalidate_all(self) -> None:
+        """Drop every cached principal (role or permission grants changed)."""
+        self._local.clear()
+        logger.info("Invalidated all cached principals")
+        if not self.redis_enabled:
+            return
+        try:
+            conn = get_async_redis_connection()
+            async for key in conn.scan_iter(match=f"{REDIS_KEY_PREFIX}:*"):
+                await conn.delete(key)
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Principal cache Redis flush failed: {e}")
+
+    def stats(self) -> dict:
+        stats = self._local.stats()
+        stats.update(
+            {
+                "redis_enabled": self.redis_enabled,
+                "redis_hits": self.redis_hits,
+                "redis_misses": self.redis_misses,
+                "redis_errors": self.redis_errors,
+            }
+        )
+        return stats
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAXSIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    redis_enabled=settings.PRINCIPAL_CACHE_REDIS_ENABLED,
+)
+
+
+def token_cache_id(payload: dict):
+    """Identify an access token for caching: jti, else iat, else exp."""
+    return payload.get("jti") or payload.get("iat") or payload.get("exp")
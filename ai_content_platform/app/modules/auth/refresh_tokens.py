@@ -0,0 +1,130 @@
+"""
+Refresh-token housekeeping: Redis revocation set and expiry sweeper.
+Revoked token hashes are mirrored to Redis (one key per hash, expiring with the
+token) so repeated refresh/revoke attempts with a dead token are answered
+without touching Postgres; the database stays authoritative and Redis errors
+fall through to it. Expired rows are deleted in bounded batches by a sweeper
+that runs in the background worker, so the table only holds tokens issued
+within REFRESH_TOKEN_EXPIRE_DAYS.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.database import AsyncSessionLocal
+from ai_content_platform.app.modules.auth.models import RefreshToken
+from ai_content_platform.app.shared import metrics
+from ai_content_platform.app.shared.logging import get_logger
+from ai_content_platform.app.shared.utils import get_async_redis_connection
+
+logger = get_logger(__name__)
+
+
+class RevocationSet:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @staticmethod
+    def _key(token_hash: str) -> str:
+        return f"revoked_rt:{token_hash}"
+
+    async def is_revoked(self, token_hash: str) -> bool:
+        if not self.enabled:
+            return False
+        try:
+            found = await get_async_redis_connection().exists(self._key(token_hash))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Refresh-token revocation lookup failed: {e}")
+            return False
+        if found:
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    async def add(self, token_hash: str, expires_at: datetime) -> None:
+        if not self.enabled:
+            return
+        ttl = int((expires_at - datetime.utcnow()).total_seconds())
+        if ttl <= 0:
+            return
+        try:
+            await get_async_redis_connection().set(self._key(token_hash), 1, ex=ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Failed to record refresh-token revocation: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+refresh_token_revocations = RevocationSet(
+    enabled=settings.REFRESH_TOKEN_REVOCATION_REDIS_ENABLED
+)
+
+_swept = metrics.counter("refresh_tokens_swept_total")
+_sweep_latency = metrics.latency("refresh_token_sweep_batch_seconds")
+
+
+async def sweep_expired_refresh_tokens(
+    db: AsyncSession, batch_size: int = None, now: datetime = None
+) -> int:
+    """
+    Delete expired refresh tokens, committing every batch_size rows so no
+    single statement holds locks on a large slice of the table.
+    """
+    batch_size = batch_size or settings.REFRESH_TOKEN_SWEEP_BATCH_SIZE
+    now = now or datetime.utcnow()
+    total = 0
+    try:
+        while True:
+            started = time.perf_counter()
+            batch = (
+                select(RefreshToken.id)
+                .where(RefreshToken.expires_at < now)
+                .order_by(RefreshToken.expires_at)
+                .limit(batch_size)
+            )
+            result = await db.execute(
+                delete(RefreshToken)
+                .where(RefreshToken.id.in_(batch.scalar_subquery()))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            _sweep_latency.observe(time.perf_counter() - started)
+            total += result.rowcount
+            if result.rowcount < batch_size:
+                break
+        if total:
+            _swept.inc(total)
+            logger.info(f"Swept {total} expired refresh tokens")
+        return total
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error sweeping refresh tokens: {e}", exc_info=True)
+        raise
+
+
+async def run_refresh_token_sweeper(interval: int = None):
+    """Sweep loop for the background worker; a task in the worker's event loop."""
+    interval = interval or settings.REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS
+    logger.info(f"Refresh-token sweeper started, interval={interval}s")
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await sweep_expired_refresh_tokens(db)
+        except Exception as e:
+            logger.error(f"Refresh-token sweep failed: {e}", exc_info=True)
+        await asyncio.sleep(interval)
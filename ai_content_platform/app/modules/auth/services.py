@@ -6,13 +6,27 @@ Uses real database for user lookup and password verification.
 from ai_content_platform.app.shared.logging import get_logger
 from sqlalchemy.ext.asyncio import AsyncSession
 from ai_content_platform.app.modules.users.services import (
+    get_user_by_id,
     get_user_by_username,
-    verify_password,
+    get_password_hash_async,
+    password_needs_rehash,
+    verify_password_async,
+)
+from ai_content_platform.app.modules.auth.credential_cache import credential_cache
+from ai_content_platform.app.modules.auth.permissions import (
+    build_rbac_claims,
+    permission_registry,
+)
+from ai_content_platform.app.modules.auth.refresh_tokens import (
+    refresh_token_revocations,
 )
 import hashlib
+import time
 from datetime import datetime, timedelta
-from sqlalchemy import select, update
+from sqlalchemy import update
+from ai_content_platform.app.config import settings
 from ai_content_platform.app.modules.auth.models import RefreshToken
+from ai_content_platform.app.shared import metrics
 from ai_content_platform.app.shared.utils import (
     create_access_token,
     create_refresh_token,
@@ -20,7 +34,9 @@ from ai_content_platform.app.shared.utils import (
 
 logger = get_logger(__name__)
 
-REFRESH_TOKEN_EXPIRE_DAYS = 7  # Or import from config
+REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
+
+_rotate_latency = metrics.latency("refresh_token_rotate_seconds")
 
 
 def hash_token(token: str) -> str:
@@ -37,9 +53,23 @@ async def authenticate_user(username: str, password: str, db: AsyncSession = Non
             logger.error("Database session is required for authentication.")
             raise ValueError("Database session is required for authentication.")
         user = await get_user_by_username(db, username)
-        if not user or not verify_password(password, user.hashed_password):
+        if not user:
+            logger.warning(f"Failed authentication for user: {username}")
+            return None
+        if credential_cache.is_verified(username, password, user.hashed_password):
+            logger.info(
+                f"User authenticated from verified-credential cache: {username}"
+            )
+            return user
+        if not await verify_password_async(password, user.hashed_password):
             logger.warning(f"Failed authentication for user: {username}")
             return None
+        if password_needs_rehash(user.hashed_password):
+            # Cost factor or scheme changed: upgrade the stored hash in place
+            user.hashed_password = await get_password_hash_async(password)
+            await db.commit()
+            logger.info(f"Re-hashed password with current policy for user: {username}")
+        credential_cache.remember(username, password, user.hashed_password)
         logger.info(f"User authenticated: {username}")
         return user
     except Exception as e:
@@ -49,8 +79,15 @@ async def authenticate_user(username: str, password: str, db: AsyncSession = Non
 
 async def issue_tokens(user, db):
     try:
+        # Compile permissions against the cached grants (reloaded after the
+        # registry TTL); expects user.roles loaded
+        registry = await permission_registry.ensure_fresh(db)
         access_token = create_access_token(
-            data={"sub": user.username, "role": user.role},
+            data={
+                "sub": user.username,
+                "role": user.role,
+                **build_rbac_claims(user, registry),
+            },
             expires_delta=timedelta(minutes=30),
         )
         refresh_token = create_refresh_token()
@@ -73,30 +110,50 @@ async def issue_tokens(user, db):
 
 async def rotate_refresh_token(refresh_token, db, User):
     try:
+        started = time.perf_counter()
         token_hash_val = hash_token(refresh_token)
-        db_token = await db.execute(
-            select(RefreshToken).where(
-                RefreshToken.token_hash == token_hash_val, RefreshToken.revoked == False
+        if await refresh_token_revocations.is_revoked(token_hash_val):
+            logger.warning("Revoked refresh token presented for rotation.")
+            return None, None, None
+        # Claim the token in one statement: of two concurrent rotations with the
+        # same token only one matches revoked = false, so it is used exactly once
+        now = datetime.utcnow()
+        result = await db.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.token_hash == token_hash_val,
+                RefreshToken.revoked == False,
+                RefreshToken.expires_at > now,
             )
+            .values(revoked=True)
+            .returning(RefreshToken.user_id, RefreshToken.expires_at)
+            .execution_options(synchronize_session=False)
         )
-        db_token = db_token.scalar_one_or_none()
-        if not db_token or db_token.expires_at < datetime.utcnow():
+        claimed = result.first()
+        if claimed is None:
+            await db.rollback()
             logger.warning("Invalid or expired refresh token during rotation.")
             return None, None, None
-        user = await db.get(User, db_token.user_id)
-        db_token.revoked = True
+        user = await get_user_by_id(db, claimed.user_id)
         new_refresh_token = create_refresh_token()
         new_db_token = RefreshToken(
             user_id=user.id,
             token_hash=hash_token(new_refresh_token),
-            expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+            expires_at=now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
         )
         db.add(new_db_token)
         await db.commit()
+        await refresh_token_revocations.add(token_hash_val, claimed.expires_at)
+        registry = await permission_registry.ensure_fresh(db)
         new_access_token = create_access_token(
-            data={"sub": user.username, "role": user.role},
+            data={
+                "sub": user.username,
+                "role": user.role,
+                **build_rbac_claims(user, registry),
+            },
             expires_delta=timedelta(minutes=30),
         )
+        _rotate_latency.observe(time.perf_counter() - started)
         logger.info(f"Rotated refresh token for user: {user.username}")
         return new_access_token, new_refresh_token, user
     except Exception as e:
@@ -107,14 +164,23 @@ async def rotate_refresh_token(refresh_token, db, User):
 async def revoke_refresh_token(refresh_token, db):
     try:
         token_hash_val = hash_token(refresh_token)
+        if await refresh_token_revocations.is_revoked(token_hash_val):
+            logger.info("Refresh token already revoked")
+            return 1
         result = await db.execute(
             update(RefreshToken)
             .where(RefreshToken.token_hash == token_hash_val)
             .values(revoked=True)
+            .returning(RefreshToken.user_id, RefreshToken.expires_at)
+            .execution_options(synchronize_session=False)
         )
+        revoked = result.first()
         await db.commit()
-        logger.info(f"Revoked refresh token: {refresh_token}")
-        return result.rowcount
+        if revoked is None:
+            return 0
+        await refresh_token_revocations.add(token_hash_val, revoked.expires_at)
+        logger.info(f"Revoked refresh token for user id: {revoked.user_id}")
+        return 1
     except Exception as e:
         logger.error(f"Error revoking refresh token: {e}", exc_info=True)
         raise
@@ -0,0 +1,51 @@
+"""
+Conversation access checks.
+Routes only need to know who owns a conversation, so the check selects
+Conversation.user_id alone instead of loading the row and its messages.
+Conversations never change owner and are not deleted, so owners are kept in
+a bounded in-process map; unknown ids are not cached, so a conversation
+created by another replica is found on its first request there.
+"""
+
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.modules.chat.models import Conversation
+from ai_content_platform.app.shared.cache import TTLCache
+from ai_content_platform.app.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+conversation_owners = TTLCache(
+    maxsize=settings.CONVERSATION_OWNER_CACHE_MAXSIZE,
+    ttl=settings.CONVERSATION_OWNER_CACHE_TTL_SECONDS,
+    name="conversation_owners",
+)
+
+
+def remember_owner(conversation_id: int, user_id: int) -> None:
+    conversation_owners.set(conversation_id, user_id)
+
+
+async def conversation_owner(db: AsyncSession, conversation_id: int) -> Optional[int]:
+    """User id owning the conversation, or None if it does not exist."""
+    owner = conversation_owners.get(conversation_id)
+    if owner is not None:
+        return owner
+    owner = await db.scalar(
+        select(Conversation.user_id).where(Conversation.id == conversation_id)
+    )
+    if owner is not None:
+        remember_owner(conversation_id, owner)
+    return owner
+
+
+async def require_conversation_access(
+    db: AsyncSession, conversation_id: int, user
+) -> None:
+    """404 unless the conversation exists and belongs to user."""
+    if await conversation_owner(db, conversation_id) != user.id:
+        logger.warning(f"Conversation not found: {conversation_id} for user: {user.id}")
+        raise HTTPException(404, "Conversation not found")
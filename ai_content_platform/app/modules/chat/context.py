@@ -0,0 +1,236 @@
+"""
+Context assembly for chat replies.
+load_context() returns what a reply prompt needs (the conversation owner,
+its stored summary, the last N messages and any keyword matches) for at
+most one database round trip:
+
+- a miss runs one statement: the conversation row outer-joined to a UNION
+  ALL of its last messages and its keyword matches;
+- a hit on the hot context cache only queries keyword matches, if any.
+
+The hot cache keeps, per conversation, the owner, summary and a ring buffer
+of the latest CHAT_CONTEXT_BUFFER_SIZE messages. add_message and the summary
+updater write through to it; nothing else changes messages. A load that
+raced with a write does not seed the cache, so a buffer never misses a
+message. The cache is per process: with several API replicas, set
+CHAT_CONTEXT_CACHE_ENABLED=false.
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import func, literal, or_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.modules.chat.models import Conversation, Message
+from ai_content_platform.app.shared.cache import TTLCache
+from ai_content_platform.app.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+MAX_MATCHES = 5
+
+
+@dataclass(frozen=True)
+class ContextMessage:
+    id: int
+    sender: str
+    content: str
+    created_at: Optional[datetime] = None
+
+
+@dataclass
+class ConversationContext:
+    conversation_id: int
+    user_id: int
+    summary: str = ""
+    recent: List[ContextMessage] = field(default_factory=list)
+    matches: List[str] = field(default_factory=list)
+
+
+class _Buffer:
+    __slots__ = ("user_id", "summary", "messages", "complete")
+
+    def __init__(self, user_id, summary, messages, size, complete):
+        self.user_id = user_id
+        self.summary = summary
+        self.messages = deque(messages, maxlen=size)
+        # True while the buffer holds the whole conversation
+        self.complete = complete
+
+    def covers(self, last_n: int) -> bool:
+        return self.complete or last_n <= len(self.messages)
+
+
+class HotContextCache:
+    def __init__(self, maxsize: int, ttl: int, buffer_size: int, enabled=True):
+        self.enabled = enabled
+        self.buffer_size = buffer_size
+        self._buffers = TTLCache(maxsize=maxsize, ttl=ttl, name="chat_context")
+        # Per-conversation write counters, so a load can tell it raced a write
+        self._writes = TTLCache(maxsize=maxsize, ttl=ttl, name="chat_context_writes")
+
+    def get(self, conversation_id: int, last_n: int) -> Optional[_Buffer]:
+        if not self.enabled:
+            return None
+        buffer = self._buffers.get(conversation_id)
+        return buffer if buffer is not None and buffer.covers(last_n) else None
+
+    def generation(self, conversation_id: int) -> int:
+        return self._writes.get(conversation_id, 0)
+
+    def seed(self, generation: int, context: ConversationContext, complete: bool):
+        if not self.enabled or self.generation(context.conversation_id) != generation:
+            return
+        self._buffers.set(
+            context.conversation_id,
+            _Buffer(
+                context.user_id,
+                context.summary,
+                context.recent,
+                self.buffer_size,
+                complete,
+            ),
+        )
+
+    def _written(self, conversation_id: int):
+        self._writes.set(conversation_id, self.generation(conversation_id) + 1)
+
+    def append(self, message: Message):
+        if not self.enabled:
+            return
+        self._written(message.conversation_id)
+        buffer = self._buffers.get(message.conversation_id)
+        if buffer is None:
+            return
+        if len(buffer.messages) == buffer.messages.maxlen:
+            buffer.complete = False
+        buffer.messages.append(
+            ContextMessage(
+                message.id, message.sender, message.content, message.created_at
+            )
+        )
+
+    def set_summary(self, conversation_id: int, summary: str):
+        if not self.enabled:
+            return
+        self._written(conversation_id)
+        buffer = self._buffers.get(conversation_id)
+        if buffer is not None:
+            buffer.summary = summary or ""
+
+    def stats(self) -> dict:
+        stats = self._buffers.stats()
+        stats.update(enabled=self.enabled, buffer_size=self.buffer_size)
+        return stats
+
+
+chat_context = HotContextCache(
+    maxsize=settings.CHAT_CONTEXT_CACHE_MAXSIZE,
+    ttl=settings.CHAT_CONTEXT_CACHE_TTL_SECONDS,
+    buffer_size=settings.CHAT_CONTEXT_BUFFER_SIZE,
+    enabled=settings.CHAT_CONTEXT_CACHE_ENABLED,
+)
+
+
+def _keyword_filter(keywords: List[str]):
+    return or_(*(Message.content.icontains(kw, autoescape=True) for kw in keywords))
+
+
+def _matches_query(conversation_id: int, keywords: List[str]):
+    """Distinct matching message contents, most recent first."""
+    newest = func.max(Message.id)
+    return (
+        select(
+            Message.conversation_id,
+            literal("match").label("kind"),
+            newest.label("id"),
+            literal("").label("sender"),
+            Message.content,
+            func.max(Message.created_at).label("created_at"),
+        )
+        .where(Message.conversation_id == conversation_id, _keyword_filter(keywords))
+        .group_by(Message.conversation_id, Message.content)
+        .order_by(newest.desc())
+        .limit(MAX_MATCHES)
+    )
+
+
+async def load_context(
+    db: AsyncSession,
+    conversation_id: int,
+    last_n: int = 10,
+    keywords: Optional[List[str]] = None,
+) -> Optional[ConversationContext]:
+    """Context for a reply, or None if the conversation does not exist."""
+    keywords = [kw for kw in keywords or [] if kw]
+    buffer = chat_context.get(conversation_id, last_n)
+    if buffer is not None:
+        context = ConversationContext(
+            conversation_id,
+            buffer.user_id,
+            buffer.summary,
+            list(buffer.messages)[-last_n:] if last_n > 0 else [],
+        )
+        if keywords:
+            rows = await db.execute(_matches_query(conversation_id, keywords))
+            context.matches = [row.content for row in rows]
+        return context
+
+    generation = chat_context.generation(conversation_id)
+    fetch = max(last_n, chat_context.buffer_size if chat_context.enabled else 0)
+    recent = (
+        select(
+            Message.conversation_id,
+            literal("recent").label("kind"),
+            Message.id,
+            Message.sender,
+            Message.content,
+            Message.created_at,
+        )
+        .where(Message.conversation_id == conversation_id)
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(fetch)
+        .subquery()
+    )
+    parts = [select(recent)]
+    if keywords:
+        parts.append(select(_matches_query(conversation_id, keywords).subquery()))
+    messages = union_all(*parts).subquery()
+    rows = (
+        await db.execute(
+            select(
+                Conversation.user_id,
+                Conversation.summary,
+                messages.c.kind,
+                messages.c.id,
+                messages.c.sender,
+                messages.c.content,
+                messages.c.created_at,
+            )
+            .select_from(Conversation)
+            .outerjoin(messages, messages.c.conversation_id == Conversation.id)
+            .where(Conversation.id == conversation_id)
+        )
+    ).all()
+    if not rows:
+        return None
+    context = ConversationContext(
+        conversation_id, rows[0].user_id, rows[0].summary or ""
+    )
+    fetched = []
+    for row in rows:
+        if row.kind == "recent":
+            fetched.append(
+                ContextMessage(row.id, row.sender, row.content, row.created_at)
+            )
+        elif row.kind == "match":
+            context.matches.append((row.id, row.content))
+    fetched.sort(key=lambda m: (m.created_at or datetime.min, m.id))
+    context.matches = [content for _, content in sorted(context.matches, reverse=True)]
+    context.recent = fetched
+    chat_context.seed(generation, context, complete=len(fetched) < fetch)
+    context.recent = fetched[-last_n:] if last_n > 0 else []
+    return context
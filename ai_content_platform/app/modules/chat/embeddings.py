@@ -0,0 +1,219 @@
+"""
+Message embeddings for semantic chat retrieval (retrieval.py).
+The embedder is picked by CHAT_EMBEDDER:
+
+- "hashing" (default): signed feature hashing of word unigrams and bigrams
+  (stopwords dropped) into CHAT_EMBEDDING_DIM buckets. CPU only, no model files and no network,
+  so every deployment and test run has it;
+- "gemini": the provider's embedding model (CHAT_EMBEDDING_MODEL) through the
+  LLM gateway, for better recall at the price of an API call per batch.
+
+Vectors are L2-normalised, so cosine similarity is a dot product, and are
+stored as packed little-endian float32 in message_embeddings, keyed by
+embedder name so a switch never mixes vector spaces.
+
+Messages are embedded off the request path: the background worker runs
+embed_pending() every CHAT_EMBEDDING_INTERVAL_SECONDS. It follows a
+batch_checkpoints row per embedder and, like the usage rollups, leaves
+messages younger than CHAT_EMBEDDING_LAG_SECONDS for the next pass.
+"""
+
+import asyncio
+import hashlib
+import math
+import re
+import sys
+from array import array
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.database import AsyncSessionLocal
+from ai_content_platform.app.modules.chat.models import Message, MessageEmbedding
+from ai_content_platform.app.modules.content.llm_gateway import llm_gateway
+from ai_content_platform.app.modules.content.models import BatchCheckpoint
+from ai_content_platform.app.shared import metrics
+from ai_content_platform.app.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+CHECKPOINT_PREFIX = "message_embeddings:"
+_WORD = re.compile(r"\w+")
+# Too common to say anything about a message's topic
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from had has have how i if in "
+    "is it its me my no not of on or our so than that the their them then there "
+    "these they this to was we were what when which who why will with you your".split()
+)
+
+_embedded = metrics.counter("chat_messages_embedded_total")
+_embed_latency = metrics.latency("chat_embedding_batch_seconds")
+
+
+def normalize(vector: Sequence[float]) -> array:
+    norm = math.sqrt(sum(v * v for v in vector))
+    return array("f", (v / norm for v in vector) if norm else vector)
+
+
+def encode_vector(vector: array) -> bytes:
+    if sys.byteorder == "big":
+        vector = array("f", vector)
+        vector.byteswap()
+    return vector.tobytes()
+
+
+def decode_vector(blob: bytes) -> array:
+    vector = array("f")
+    vector.frombytes(blob)
+    if sys.byteorder == "big":
+        vector.byteswap()
+    return vector
+
+
+class HashingEmbedder:
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def _feature(token: str, dim: int) -> Tuple[int, float]:
+        digest = int.from_bytes(
+            hashlib.blake2b(token.encode(), digest_size=8).digest(), "big"
+        )
+        return digest % dim, 1.0 if digest >> 63 else -1.0
+
+    def embed_one(self, text: str) -> array:
+        words = [w for w in _WORD.findall((text or "").lower()) if w not in STOPWORDS]
+        counts: Dict[str, int] = {}
+        for token in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            counts[token] = counts.get(token, 0) + 1
+        vector = [0.0] * self.dim
+        for token, count in counts.items():
+            index, sign = self._feature(token, self.dim)
+            vector[index] += sign * (1.0 + math.log(count))
+        return normalize(vector)
+
+    async def embed(self, texts: List[str]) -> List[array]:
+        return [self.embed_one(text) for text in texts]
+
+
+class GeminiEmbedder:
+    def __init__(self, model: str, dim: int):
+        self.model = model
+        self.dim = dim
+        self.name = f"gemini-{model.rsplit('/', 1)[-1]}-{dim}"
+
+    async def embed(self, texts: List[str]) -> List[array]:
+        vectors = await llm_gateway.embed_texts(texts, self.model, self.dim)
+        return [normalize(vector) for vector in vectors]
+
+
+def get_embedder():
+    name = settings.CHAT_EMBEDDER
+    if name == "hashing":
+        return HashingEmbedder(settings.CHAT_EMBEDDING_DIM)
+    if name == "gemini":
+        return GeminiEmbedder(
+            settings.CHAT_EMBEDDING_MODEL, settings.CHAT_EMBEDDING_DIM
+        )
+    raise RuntimeError(f"No chat embedder named '{name}'")
+
+
+embedder = get_embedder()
+
+
+async def store_embeddings(db: AsyncSession, rows: List[dict]):
+    """Insert message_embeddings rows, skipping ones already stored."""
+    if not rows:
+        return
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(MessageEmbedding.__table__).values(rows)
+    await db.execute(
+        stmt.on_conflict_do_nothing(index_elements=["message_id", "embedder"])
+    )
+
+
+async def embed_pending(db: AsyncSession, batch_size: int = None) -> int:
+    """Embed and store the next batch of settled messages."""
+    batch_size = batch_size or settings.CHAT_EMBEDDING_BATCH_SIZE
+    started = asyncio.get_running_loop().time()
+    name = CHECKPOINT_PREFIX + embedder.name
+    try:
+        checkpoint = await db.get(BatchCheckpoint, name, with_for_update=True)
+        if checkpoint is None:
+            checkpoint = BatchCheckpoint(name=name, last_id=0)
+            db.add(checkpoint)
+        rows = (
+            await db.execute(
+                select(
+                    Message.id,
+                    Message.conversation_id,
+                    Message.content,
+                    Message.created_at,
+                )
+                # The index orders by created_at, so messages without one are
+                # never searched; leaving them out keeps the checkpoint moving
+                .where(Message.id > checkpoint.last_id, Message.created_at.isnot(None))
+                .order_by(Message.id)
+                .limit(batch_size)
+            )
+        ).all()
+        cutoff = datetime.utcnow() - timedelta(
+            seconds=settings.CHAT_EMBEDDING_LAG_SECONDS
+        )
+        settled = []
+        for row in rows:
+            if row.created_at > cutoff:
+                break
+            settled.append(row)
+        if settled:
+            vectors = await embedder.embed([row.content for row in settled])
+            await store_embeddings(
+                db,
+                [
+                    {
+                        "message_id": row.id,
+                        "embedder": embedder.name,
+                        "conversation_id": row.conversation_id,
+                        "vector": encode_vector(vector),
+                    }
+                    for row, vector in zip(settled, vectors)
+                ],
+            )
+            checkpoint.last_id = settled[-1].id
+            checkpoint.updated_at = datetime.utcnow()
+        await db.commit()
+        _embedded.inc(len(settled))
+        return len(settled)
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error embedding messages: {e}", exc_info=True)
+        raise
+    finally:
+        _embed_latency.observe(asyncio.get_running_loop().time() - started)
+
+
+async def run_message_embedder(interval: int = None):
+    """
+    Embedding loop for the background worker; a task in the worker's event
+    loop, so the gemini embedder shares the LLM gateway with the job workers.
+    """
+    if not settings.CHAT_RETRIEVAL_ENABLED:
+        logger.info("Chat retrieval is off; message embedder not started")
+        return
+    interval = interval or settings.CHAT_EMBEDDING_INTERVAL_SECONDS
+    batch_size = settings.CHAT_EMBEDDING_BATCH_SIZE
+    logger.info(f"Message embedder started: {embedder.name}, interval={interval}s")
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                # Catch up in batches, then wait for new messages
+                while await embed_pending(db, batch_size) >= batch_size:
+                    pass
+        except Exception as e:
+            logger.error(f"Message embedding failed: {e}", exc_info=True)
+        await asyncio.sleep(interval)
@@ -1,4 +1,16 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    Integer,
+    LargeBinary,
+    String,
+    ForeignKey,
+    DateTime,
+    Text,
+    Index,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ai_content_platform.app.database import Base
@@ -18,10 +30,21 @@ class Conversation(Base):
     # representing the conversation up to 'summary_msg_count'.
     summary = Column(Text, nullable=True)
     summary_msg_count = Column(Integer, default=0)
+    # Mirrors migration 0014_incremental_summaries: message_count is kept by
+    # add_message, summary_last_message_id is the last message the summary
+    # covers, and summary_version guards summary writes (optimistic locking)
+    message_count = Column(Integer, nullable=False, default=0)
+    summary_last_message_id = Column(Integer, nullable=True)
+    summary_version = Column(Integer, nullable=False, default=0)
 
     messages = relationship("Message", back_populates="conversation")
     token_usage = relationship("TokenUsage", back_populates="conversation")
 
+    # Mirrors migration 0005_keyset_pagination_indexes
+    __table_args__ = (
+        Index("ix_conversations_user_created_at_id", "user_id", "created_at", "id"),
+    )
+
 
 class Message(Base):
     __tablename__ = "messages"
@@ -33,13 +56,99 @@ class Message(Base):
 
     conversation = relationship("Conversation", back_populates="messages")
 
+    # Mirrors migration 0012_message_history_index
+    __table_args__ = (
+        Index(
+            "ix_messages_conversation_created_at_id",
+            "conversation_id",
+            "created_at",
+            "id",
+        ),
+    )
+
 
 class TokenUsage(Base):
+    """
+    Tokens spent by one LLM-backed operation. tokens_used is the total;
+    prompt/context/completion split it into the caller's own text, context
+    added around it (history, summary, retrieval) and the model's output.
+    estimated is set when the provider reported no usage and the counts come
+    from the local tokenizer estimate. Calls outside a conversation
+    (moderation, article generation) have no conversation_id.
+    """
+
     __tablename__ = "token_usage"
     id = Column(Integer, primary_key=True, autoincrement=True)
-    conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    # Mirrors migration 0009_token_usage_breakdown
+    purpose = Column(String, nullable=False, default="chat")
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    context_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    estimated = Column(Boolean, nullable=False, default=False)
     tokens_used = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Mirrors migration 0010_token_usage_rollups
+    model = Column(String, nullable=True)
 
     conversation = relationship("Conversation", back_populates="token_usage")
+
+
+class TokenUsageRollup(Base):
+    """
+    Token usage summed per hour or day bucket and (user, conversation, model,
+    purpose). Maintained by usage_rollups.py; 0 and "" stand for "none" so
+    the key columns can be unique.
+    """
+
+    __tablename__ = "token_usage_rollups"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    granularity = Column(String(4), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    user_id = Column(Integer, nullable=False, default=0)
+    conversation_id = Column(Integer, nullable=False, default=0)
+    model = Column(String, nullable=False, default="")
+    purpose = Column(String, nullable=False, default="")
+    requests = Column(Integer, nullable=False, default=0)
+    prompt_tokens = Column(BigInteger, nullable=False, default=0)
+    context_tokens = Column(BigInteger, nullable=False, default=0)
+    completion_tokens = Column(BigInteger, nullable=False, default=0)
+    tokens_used = Column(BigInteger, nullable=False, default=0)
+
+    # Mirrors migration 0010_token_usage_rollups
+    __table_args__ = (
+        UniqueConstraint(
+            "granularity",
+            "bucket_start",
+            "user_id",
+            "conversation_id",
+            "model",
+            "purpose",
+            name="uq_token_usage_rollups_cell",
+        ),
+    )
+
+
+class MessageEmbedding(Base):
+    """
+    A message's embedding as packed little-endian float32, one row per
+    embedder so switching embedders never mixes vector spaces. Written by
+    the message embedder (chat/embeddings.py).
+    """
+
+    __tablename__ = "message_embeddings"
+    message_id = Column(Integer, ForeignKey("messages.id"), primary_key=True)
+    embedder = Column(String, primary_key=True)
+    conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=False)
+    vector = Column(LargeBinary, nullable=False)
+
+    # Mirrors migration 0013_message_embeddings
+    __table_args__ = (
+        Index(
+            "ix_message_embeddings_conversation_embedder_message",
+            "conversation_id",
+            "embedder",
+            "message_id",
+        ),
+    )
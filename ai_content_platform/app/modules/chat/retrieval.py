@@ -0,0 +1,225 @@
+"""
+Semantic retrieval memory for chat replies.
+related_messages() embeds the new prompt (embeddings.py) and returns the
+conversation's most similar earlier messages by cosine similarity, so
+relevant history reaches the prompt without the client naming keywords.
+
+Each conversation's vectors are held in an in-process index: a float32
+matrix of its latest CHAT_RETRIEVAL_MAX_MESSAGES messages plus the
+(created_at, id) of the newest one. A lookup reads only messages past that
+key, a range scan of the (conversation_id, created_at, id) index, joined to
+their stored embeddings. Stored messages are never embedded on the request
+path: the index stops at the first message the background embedder has not
+reached, and picks it up on a later lookup. Those are the newest few
+messages, which the prompt carries as recent history anyway. The new prompt
+itself is embedded per reply (an API call with CHAT_EMBEDDER=gemini), so its
+vector is cached by text and the call is bounded by
+CHAT_RETRIEVAL_EMBED_TIMEOUT_SECONDS. Scoring is one matrix-vector product
+with numpy (listed in requirements.txt) and a pure-Python loop without it,
+so the work per reply is bounded by CHAT_RETRIEVAL_MAX_MESSAGES however long
+the conversation. The index is per process and only ever grows by new
+messages, so several replicas each keep their own copy.
+
+Retrieval is best effort: if it fails, the reply goes ahead without it.
+"""
+
+import asyncio
+import heapq
+import operator
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import and_, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.modules.chat.context import ConversationContext
+from ai_content_platform.app.modules.chat.embeddings import decode_vector, embedder
+from ai_content_platform.app.modules.chat.models import Message, MessageEmbedding
+from ai_content_platform.app.shared.cache import TTLCache
+from ai_content_platform.app.shared.logging import get_logger
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = get_logger(__name__)
+
+
+class _Vectors:
+    __slots__ = ("ids", "rows", "last_key")
+
+    def __init__(self):
+        self.ids: List[int] = []
+        # (n, dim) float32 matrix with numpy, else a list of float32 arrays
+        self.rows = None if np is not None else []
+        self.last_key: Optional[Tuple[datetime, int]] = None
+
+    def extend(self, ids: List[int], vectors: list, max_rows: int):
+        if np is not None:
+            block = np.asarray(vectors, dtype=np.float32)
+            rows = block if self.rows is None else np.vstack((self.rows, block))
+        else:
+            rows = self.rows + vectors
+        ids = self.ids + ids
+        self.ids, self.rows = ids[-max_rows:], rows[-max_rows:]
+
+    def top(self, query, k: int, exclude: set) -> List[Tuple[float, int]]:
+        if not self.ids:
+            return []
+        if np is not None:
+            scores = self.rows @ np.asarray(query, dtype=np.float32)
+            if exclude:
+                mask = np.fromiter((i in exclude for i in self.ids), bool)
+                scores[mask] = -np.inf
+            count = min(k, len(scores))
+            best = np.argpartition(-scores, count - 1)[:count]
+            return [(float(scores[i]), self.ids[i]) for i in best]
+        scored = (
+            (sum(map(operator.mul, row, query)), message_id)
+            for message_id, row in zip(self.ids, self.rows)
+            if message_id not in exclude
+        )
+        return heapq.nlargest(k, scored)
+
+
+class VectorIndex:
+    def __init__(self, maxsize: int, ttl: int, max_rows: int, enabled=True):
+        self.enabled = enabled
+        self.max_rows = max_rows
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl, name="chat_vectors")
+
+    async def vectors(self, db: AsyncSession, conversation_id: int) -> _Vectors:
+        """The conversation's vectors, up to its latest embedded message."""
+        entry = self._entries.get(conversation_id)
+        if entry is None:
+            entry = _Vectors()
+        key = tuple_(Message.created_at, Message.id)
+        stmt = (
+            select(Message.id, Message.created_at, MessageEmbedding.vector)
+            .outerjoin(
+                MessageEmbedding,
+                and_(
+                    MessageEmbedding.message_id == Message.id,
+                    MessageEmbedding.embedder == embedder.name,
+                ),
+            )
+            .where(
+                Message.conversation_id == conversation_id,
+                Message.created_at.isnot(None),
+            )
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(self.max_rows)
+        )
+        if entry.last_key is not None:
+            stmt = stmt.where(key > tuple_(*(literal(v) for v in entry.last_key)))
+        rows = list(reversed((await db.execute(stmt)).all()))
+        for position, row in enumerate(rows):
+            if row.vector is None:
+                rows = rows[:position]
+                break
+        # Another request may have extended the entry meanwhile
+        if entry.last_key is not None:
+            rows = [r for r in rows if (r.created_at, r.id) > entry.last_key]
+        if rows:
+            entry.extend(
+                [row.id for row in rows],
+                [decode_vector(row.vector) for row in rows],
+                self.max_rows,
+            )
+            entry.last_key = (rows[-1].created_at, rows[-1].id)
+        self._entries.set(conversation_id, entry)
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        stats = self._entries.stats()
+        stats.update(
+            enabled=self.enabled,
+            embedder=embedder.name,
+            max_rows=self.max_rows,
+            vectorised=np is not None,
+        )
+        return stats
+
+
+vector_index = VectorIndex(
+    maxsize=settings.CHAT_RETRIEVAL_CACHE_MAXSIZE,
+    ttl=settings.CHAT_RETRIEVAL_CACHE_TTL_SECONDS,
+    max_rows=settings.CHAT_RETRIEVAL_MAX_MESSAGES,
+    enabled=settings.CHAT_RETRIEVAL_ENABLED,
+)
+_query_vectors = TTLCache(
+    maxsize=settings.CHAT_RETRIEVAL_QUERY_CACHE_MAXSIZE,
+    ttl=settings.CHAT_RETRIEVAL_CACHE_TTL_SECONDS,
+    name="chat_query_vectors",
+)
+
+
+async def embed_query(text: str):
+    """The prompt's vector, from the cache or a time-bounded embed call."""
+    key = (embedder.name, text)
+    vector = _query_vectors.get(key)
+    if vector is None:
+        (vector,) = await asyncio.wait_for(
+            embedder.embed([text]), settings.CHAT_RETRIEVAL_EMBED_TIMEOUT_SECONDS
+        )
+        _query_vectors.set(key, vector)
+    return vector
+
+
+async def related_messages(
+    db: AsyncSession,
+    conversation_id: int,
+    text: str,
+    exclude: Iterable[int] = (),
+    k: int = None,
+) -> List[str]:
+    """Contents of the k messages most similar to text, best first."""
+    k = k or settings.CHAT_RETRIEVAL_TOP_K
+    entry = await vector_index.vectors(db, conversation_id)
+    if not entry.ids:
+        return []
+    query = await embed_query(text)
+    best = [
+        (score, message_id)
+        for score, message_id in entry.top(query, k, set(exclude))
+        if score >= settings.CHAT_RETRIEVAL_MIN_SCORE
+    ]
+    if not best:
+        return []
+    contents = dict(
+        (
+            await db.execute(
+                select(Message.id, Message.content).where(
+                    Message.id.in_([message_id for _, message_id in best])
+                )
+            )
+        ).all()
+    )
+    return [contents[i] for _, i in sorted(best, reverse=True) if i in contents]
+
+
+async def add_related(db: AsyncSession, context: ConversationContext, prompt: str):
+    """Append semantic matches to context.matches, after any keyword matches."""
+    if not vector_index.enabled:
+        return
+    try:
+        related = await related_messages(
+            db,
+            context.conversation_id,
+            prompt,
+            exclude=[m.id for m in context.recent],
+        )
+    except Exception as e:
+        logger.warning(
+            f"Semantic retrieval failed for conversation {context.conversation_id}: {e}"
+        )
+        return
+    seen = set(context.matches) | {m.content for m in context.recent}
+    for content in related:
+        if content not in seen:
+            seen.add(content)
+            context.matches.append(content)
@@ -1,10 +1,17 @@
+import asyncio
+from contextlib import aclosing
 from starlette.background import BackgroundTasks
 from fastapi.responses import StreamingResponse
-from ai_content_platform.app.modules.chat import services
+from ai_content_platform.app.modules.chat import retrieval, services
+from ai_content_platform.app.modules.chat.access import require_conversation_access
+from ai_content_platform.app.modules.chat.context import load_context
+from ai_content_platform.app.modules.content.llm_quota import llm_quota
+from ai_content_platform.app.modules.content.llm_usage import UsageMeter
 from ai_content_platform.app.modules.chat.schemas import (
     ConversationCreate,
     ConversationOut,
     MessageCreate,
+    MessageFieldsOut,
     conversation_to_out,
     TokenUsageOut,
 )
@@ -13,10 +20,12 @@ from ai_content_platform.app.shared.dependencies import (
     get_current_user,
     require_permission,
 )
-from typing import List
+from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from ai_content_platform.app.config import settings
 from ai_content_platform.app.shared.logging import get_logger
+from ai_content_platform.app.shared.pagination import PageParams, set_next_cursor
 
 logger = get_logger(__name__)
 
@@ -52,12 +61,18 @@ async def start_conversation(
     dependencies=[Depends(require_permission("view_chat"))],
 )
 async def list_conversations(
-    db: AsyncSession = Depends(get_db), user=Depends(get_current_user)
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
 ):
     logger.info(f"List conversations endpoint called for user: {user.username}")
     try:
-        conversations = await services.get_user_conversations(db, user_id=user.id)
-        return [conversation_to_out(conv) for conv in conversations]
+        result = await services.get_user_conversations(
+            db, user_id=user.id, cursor=page.cursor, limit=page.limit
+        )
+        set_next_cursor(response, result)
+        return [conversation_to_out(conv) for conv in result.items]
     except Exception as e:
         logger.error(f"Error in list_conversations: {e}", exc_info=True)
         raise
@@ -109,47 +124,70 @@ async def stream_message(
         f"Stream message endpoint called for user: {user.id}, conversation_id: {conversation_id}"
     )
     try:
-        conv = await services.get_conversation(db, conversation_id)
-        if not conv or conv.user_id != user.id:
-            logger.warning(
-                f"Conversation not found: {conversation_id} for user: {user.id}"
-            )
-            raise HTTPException(404, "Conversation not found")
-        # Add user message
-        user_msg = await services.add_message(
-            db, conversation_id, sender="user", content=msg.content
-        )
         # Parse keywords
         keywords = (
             [k.strip() for k in retrieval_keywords.split(",") if k.strip()]
             if retrieval_keywords
             else []
         )
+        # Owner, summary, last messages and keyword matches in one lookup;
+        # taken before the new message so it only appears once in the prompt
+        context = await load_context(db, conversation_id, last_n, keywords)
+        if not context or context.user_id != user.id:
+            logger.warning(
+                f"Conversation not found: {conversation_id} for user: {user.id}"
+            )
+            raise HTTPException(404, "Conversation not found")
+        # Book the user's LLM budget before anything is stored (429 if spent)
+        reservation = await llm_quota.reserve(user, msg.content)
+        try:
+            # Earlier messages similar to this one, beyond any keyword matches
+            await retrieval.add_related(db, context, msg.content)
+            # Add user message
+            user_msg = await services.add_message(
+                db, conversation_id, sender="user", content=msg.content
+            )
+        except Exception:
+            # No reply will be generated, so give the estimate back
+            await llm_quota.settle(reservation, UsageMeter())
+            raise
 
         # Streaming generator with safeguards
         MAX_RESPONSE_CHARS = 4000  # hard limit to prevent memory blowup
+        usage = UsageMeter()
 
         async def ai_stream_accum():
             full_response = ""
             incomplete = False
             try:
-                async for chunk in services.stream_ai_response(
-                    db,
-                    conversation_id,
-                    msg.content,
-                    last_n=last_n,
-                    use_summary=use_summary,
-                    retrieval_keywords=keywords,
-                ):
-                    if len(full_response) + len(chunk) > MAX_RESPONSE_CHARS:
-                        # Truncate and stop streaming
-                        full_response += chunk[
-                            : MAX_RESPONSE_CHARS - len(full_response)
-                        ]
-                        incomplete = True
-                        break
-                    full_response += chunk
-                    yield chunk
+                # aclosing ends the upstream stream (and meters it) on break
+                async with aclosing(
+                    services.stream_ai_response(
+                        db,
+                        conversation_id,
+                        msg.content,
+                        last_n=last_n,
+                        use_summary=use_summary,
+                        retrieval_keywords=keywords,
+                        usage=usage,
+                        context=context,
+                    )
+                ) as chunks:
+                    async for chunk in chunks:
+                        if len(full_response) + len(chunk) > MAX_RESPONSE_CHARS:
+                            # Truncate and stop streaming
+                            full_response += chunk[
+                                : MAX_RESPONSE_CHARS - len(full_response)
+                            ]
+                            incomplete = True
+                            break
+                        full_response += chunk
+                        yield chunk
+            except (asyncio.CancelledError, GeneratorExit):
+                # Client disconnected; the upstream LLM stream is closed with us
+                incomplete = True
+                logger.info(f"Client disconnected from stream {conversation_id}")
+                raise
             except Exception as e:
                 incomplete = True
                 logger.error(f"Error in ai_stream_accum: {e}", exc_info=True)
@@ -157,42 +195,44 @@ async def stream_message(
             finally:
                 ai_stream_accum.full_response = full_response
                 ai_stream_accum.incomplete = incomplete
+                # Shielded: Starlette skips the background task when the
+                # client disconnects, but the reply and its tokens are kept
+                await asyncio.shield(save_ai_response(full_response, incomplete))
 
         ai_stream_accum.full_response = ""
         ai_stream_accum.incomplete = False
 
-        async def save_ai_response_and_summary_bg():
-            # Create a new DB session for the background task
-            async for db_bg in get_db():
-                try:
+        async def save_ai_response(full_response: str, incomplete: bool):
+            # A new DB session; the request's may be closed by now
+            try:
+                async for db_bg in get_db():
                     # Mark message as incomplete if needed
-                    meta_content = ai_stream_accum.full_response
-                    if ai_stream_accum.incomplete:
+                    meta_content = full_response
+                    if incomplete:
                         meta_content = "[INCOMPLETE] " + meta_content
                     await services.add_message(
                         db_bg, conversation_id, sender="assistant", content=meta_content
                     )
                     await services.track_token_usage(
-                        db_bg,
-                        conversation_id,
-                        user.id,
-                        tokens=len(msg.content) + len(ai_stream_accum.full_response),
+                        db_bg, conversation_id, user.id, usage, prompt=msg.content
                     )
-                    # Only summarize if response is complete
-                    if not ai_stream_accum.incomplete:
-                        await services.update_conversation_summary(
-                            db_bg, conversation_id
-                        )
+            except Exception as e:
+                logger.error(f"Error in save_ai_response: {e}", exc_info=True)
+            finally:
+                await llm_quota.settle(reservation, usage)
+
+        async def update_summary_bg():
+            # Only summarize if response is complete
+            if ai_stream_accum.incomplete:
+                return
+            async for db_bg in get_db():
+                try:
+                    await services.update_conversation_summary(db_bg, conversation_id)
                 except Exception as e:
-                    logger.error(
-                        f"Error in save_ai_response_and_summary_bg: {e}", exc_info=True
-                    )
-                finally:
-                    await db_bg.close()
-                break
+                    logger.error(f"Error in update_summary_bg: {e}", exc_info=True)
 
         background_tasks = BackgroundTasks()
-        background_tasks.add_task(save_ai_response_and_summary_bg)
+        background_tasks.add_task(update_summary_bg)
         logger.info(f"Streaming response for conversation_id: {conversation_id}")
         return StreamingResponse(
             ai_stream_accum(), media_type="text/plain", background=background_tasks
@@ -204,25 +244,56 @@ async def stream_message(
 
 @chat_router.get(
     "/conversations/{conversation_id}/messages/",
-    response_model=List[MessageCreate],
+    response_model=List[MessageFieldsOut],
+    response_model_exclude_unset=True,
     dependencies=[Depends(require_permission("view_chat"))],
 )
 async def get_messages(
     conversation_id: int,
+    response: Response,
+    before: Optional[int] = Query(
+        None, description="Return messages older than this message id"
+    ),
+    after: Optional[int] = Query(
+        None, description="Return messages newer than this message id"
+    ),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated subset of id, sender, content, snippet, created_at",
+    ),
     db: AsyncSession = Depends(get_db),
     user=Depends(get_current_user),
 ):
+    """
+    Messages in chronological order, latest page first. X-Next-Cursor holds
+    the message id to pass as `before` (or `after`, when reading forwards)
+    for the next page.
+    """
     logger.info(
         f"Get messages endpoint called for user: {user.id}, conversation_id: {conversation_id}"
     )
     try:
-        conv = await services.get_conversation(db, conversation_id)
-        if not conv or conv.user_id != user.id:
-            logger.warning(
-                f"Conversation not found: {conversation_id} for user: {user.id}"
-            )
-            raise HTTPException(404, "Conversation not found")
-        return await services.get_conversation_messages(db, conversation_id)
+        selected = [f.strip() for f in (fields or "").split(",") if f.strip()] or None
+        if selected:
+            unknown = set(selected) - set(services.MESSAGE_FIELDS)
+            if unknown:
+                raise HTTPException(
+                    400, f"Unknown message fields: {', '.join(sorted(unknown))}"
+                )
+        await require_conversation_access(db, conversation_id, user)
+        page = await services.get_conversation_messages(
+            db, conversation_id, limit, before, after, selected
+        )
+        set_next_cursor(response, page)
+        if selected is None:
+            return [
+                MessageFieldsOut(
+                    id=m.id, sender=m.sender, content=m.content, created_at=m.created_at
+                )
+                for m in page.items
+            ]
+        return [MessageFieldsOut(**item) for item in page.items]
     except Exception as e:
         logger.error(f"Error in get_messages: {e}", exc_info=True)
         raise
@@ -242,20 +313,12 @@ async def get_token_usage(
         f"Get token usage endpoint called for user: {user.id}, conversation_id: {conversation_id}"
     )
     try:
-        conv = await services.get_conversation(db, conversation_id)
-        if not conv or conv.user_id != user.id:
-            logger.warning(
-                f"Conversation not found: {conversation_id} for user: {user.id}"
-            )
-            raise HTTPException(404, "Conversation not found")
+        await require_conversation_access(db, conversation_id, user)
         usage_records = await services.get_token_usage(db, conversation_id)
         logger.info(
             f"Token usage records fetched for conversation_id: {conversation_id}"
         )
-        return [
-            TokenUsageOut(tokens_used=u.tokens_used, created_at=u.created_at)
-            for u in usage_records
-        ]
+        return [TokenUsageOut.model_validate(u) for u in usage_records]
     except Exception as e:
         logger.error(f"Error in get_token_usage: {e}", exc_info=True)
         raise
@@ -20,6 +20,17 @@ class MessageOut(MessageBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class MessageFieldsOut(BaseModel):
+    """A message projected to the requested `fields`; unset ones are omitted."""
+
+    id: Optional[int] = None
+    sender: Optional[str] = None
+    content: Optional[str] = None
+    snippet: Optional[str] = None
+    created_at: Optional[datetime] = None
+    model_config = ConfigDict(from_attributes=True)
+
+
 class ConversationBase(BaseModel):
     title: Optional[str] = None
 
@@ -38,6 +49,11 @@ class ConversationOut(ConversationBase):
 
 class TokenUsageOut(BaseModel):
     tokens_used: int
+    purpose: str = "chat"
+    prompt_tokens: int = 0
+    context_tokens: int = 0
+    completion_tokens: int = 0
+    estimated: bool = False
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
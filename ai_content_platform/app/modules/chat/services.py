@@ -1,16 +1,27 @@
+import asyncio
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, literal, tuple_, update
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from ai_content_platform.app.modules.chat.models import (
     Conversation,
     Message,
     TokenUsage,
 )
-from ai_content_platform.app.modules.chat.models import TokenUsage
-from ai_content_platform.app.modules.chat.gemini_service import gemini_service
+from ai_content_platform.app.modules.chat import retrieval
+from ai_content_platform.app.modules.chat.access import remember_owner
+from ai_content_platform.app.modules.chat.context import (
+    ConversationContext,
+    chat_context,
+    load_context,
+)
+from ai_content_platform.app.modules.content.llm_gateway import llm_gateway
+from ai_content_platform.app.modules.content.llm_usage import UsageMeter
 from typing import List, Optional
 from fastapi import HTTPException
 from ai_content_platform.app.shared.logging import get_logger
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.shared.pagination import Page, created_at_key, fetch_page
 
 logger = get_logger(__name__)
 
@@ -24,13 +35,9 @@ async def start_conversation(
         db.add(conv)
         await db.commit()
         await db.refresh(conv)
-        # Eagerly reload with relationships
-        result = await db.execute(
-            select(Conversation)
-            .options(selectinload(Conversation.messages))
-            .where(Conversation.id == conv.id)
-        )
-        conv = result.scalar_one()
+        # A new conversation has no messages to load
+        set_committed_value(conv, "messages", [])
+        remember_owner(conv.id, user_id)
         logger.info(
             f"Conversation started for user: {user_id}, conversation_id: {conv.id}"
         )
@@ -49,8 +56,15 @@ async def add_message(
     try:
         msg = Message(conversation_id=conversation_id, sender=sender, content=content)
         db.add(msg)
+        # Counted in the same transaction, so summaries never need COUNT(*)
+        await db.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(message_count=Conversation.message_count + 1)
+        )
         await db.commit()
         await db.refresh(msg)
+        chat_context.append(msg)
         logger.info(
             f"Message added to conversation {conversation_id}, message_id: {msg.id}"
         )
@@ -64,18 +78,23 @@ async def add_message(
 
 
 async def get_conversation(
-    db: AsyncSession, conversation_id: int
+    db: AsyncSession,
+    conversation_id: int,
+    messages_limit: int = settings.PAGE_SIZE_DEFAULT,
 ) -> Optional[Conversation]:
+    """
+    The conversation with only its latest `messages_limit` messages loaded;
+    page through the rest with get_conversation_messages.
+    """
     logger.info(f"Fetching conversation {conversation_id}")
     try:
-        result = await db.execute(
-            select(Conversation)
-            .options(selectinload(Conversation.messages))
-            .where(Conversation.id == conversation_id)
+        conversation = await db.get(Conversation, conversation_id)
+        if conversation is None:
+            return None
+        page = await get_conversation_messages(
+            db, conversation_id, limit=messages_limit
         )
-        conversation = result.scalar_one_or_none()
-        # Force load messages to avoid lazy loading
-        _ = getattr(conversation, "messages", None)
+        set_committed_value(conversation, "messages", page.items)
         return conversation
     except Exception as e:
         logger.error(
@@ -84,19 +103,26 @@ async def get_conversation(
         raise
 
 
-async def get_user_conversations(db: AsyncSession, user_id: int) -> List[Conversation]:
-    logger.info(f"Fetching conversations for user {user_id}")
+async def get_user_conversations(
+    db: AsyncSession,
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = settings.PAGE_SIZE_DEFAULT,
+) -> Page:
+    """
+    One page of the user's conversations, newest first. Messages are not
+    loaded; fetch them per conversation.
+    """
+    logger.info(f"Fetching conversations for user {user_id}, limit={limit}")
     try:
-        result = await db.execute(
-            select(Conversation)
-            .options(selectinload(Conversation.messages))
-            .where(Conversation.user_id == user_id)
+        return await fetch_page(
+            db,
+            select(Conversation).where(Conversation.user_id == user_id),
+            (Conversation.created_at, Conversation.id),
+            cursor,
+            limit,
+            created_at_key,
         )
-        conversations = result.scalars().all()
-        # Force load messages for each conversation
-        for conv in conversations:
-            _ = getattr(conv, "messages", None)
-        return conversations
     except Exception as e:
         logger.error(
             f"Error fetching conversations for user {user_id}: {e}", exc_info=True
@@ -104,21 +130,76 @@ async def get_user_conversations(db: AsyncSession, user_id: int) -> List[Convers
         raise
 
 
+MESSAGE_FIELDS = ("id", "sender", "content", "snippet", "created_at")
+
+
+def _message_columns(fields: List[str]) -> list:
+    # The id is always selected; it is the cursor for the next page
+    columns = [Message.id]
+    for name in fields:
+        if name == "snippet":
+            snippet = func.substr(
+                Message.content, 1, settings.CHAT_MESSAGE_SNIPPET_CHARS
+            )
+            columns.append(snippet.label("snippet"))
+        elif name != "id":
+            columns.append(getattr(Message, name))
+    return columns
+
+
+def _message_key(conversation_id: int, message_id: int):
+    """(created_at, id) of a cursor message, compared as a row value."""
+    created_at = (
+        select(Message.created_at)
+        .where(Message.id == message_id, Message.conversation_id == conversation_id)
+        .scalar_subquery()
+    )
+    return tuple_(created_at, literal(message_id))
+
+
 async def get_conversation_messages(
-    db: AsyncSession, conversation_id: int, limit: Optional[int] = None
-) -> List[Message]:
+    db: AsyncSession,
+    conversation_id: int,
+    limit: int = settings.PAGE_SIZE_DEFAULT,
+    before: Optional[int] = None,
+    after: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+) -> Page:
+    """
+    One page of messages in chronological order: the latest `limit`, the
+    `limit` just older than message `before`, or the `limit` just newer than
+    message `after` (both together bound a range read forwards from `after`).
+    next_cursor is the message id to pass as the same parameter for the
+    following page. Each page is a range scan of the
+    (conversation_id, created_at, id) index, however long the conversation.
+    With `fields`, only those columns are selected and items are dicts;
+    "snippet" is the first CHAT_MESSAGE_SNIPPET_CHARS characters of content.
+    """
     logger.info(f"Fetching messages for conversation {conversation_id}")
     try:
-        stmt = (
-            select(Message)
-            .where(Message.conversation_id == conversation_id)
-            .order_by(Message.created_at.desc())
-        )
-        if limit is not None:
-            stmt = stmt.limit(limit)
-        result = await db.execute(stmt)
-        messages = result.scalars().all()
-        return list(reversed(messages))  # Return in chronological order
+        key = tuple_(Message.created_at, Message.id)
+        stmt = select(Message) if fields is None else select(*_message_columns(fields))
+        stmt = stmt.where(Message.conversation_id == conversation_id)
+        if after is not None:
+            stmt = stmt.where(key > _message_key(conversation_id, after))
+        if before is not None:
+            stmt = stmt.where(key < _message_key(conversation_id, before))
+        forwards = after is not None
+        order = [Message.created_at, Message.id]
+        if not forwards:
+            order = [column.desc() for column in order]
+        result = await db.execute(stmt.order_by(*order).limit(limit + 1))
+        rows = result.scalars().all() if fields is None else result.all()
+        next_cursor = str(rows[limit - 1].id) if len(rows) > limit else None
+        rows = list(rows[:limit])
+        if fields is not None:
+            rows = [
+                {name: value for name, value in row._mapping.items() if name in fields}
+                for row in rows
+            ]
+        if not forwards:
+            rows.reverse()  # Return in chronological order
+        return Page(items=rows, next_cursor=next_cursor)
     except Exception as e:
         logger.error(
             f"Error fetching messages for conversation {conversation_id}: {e}",
@@ -147,129 +228,219 @@ async def get_summary_memory(db: AsyncSession, conversation_id: int) -> str:
 
 
 # Background summary update logic
+SUMMARY_SENDERS = ("assistant", "user")
+SUMMARY_MAX_CHARS = 1000
+FIRST_SUMMARY_PROMPT = (
+    "Summarize the following conversation between user and assistant in a "
+    "concise way for future context.\n\n"
+)
+CHUNK_SUMMARY_PROMPT = (
+    "Summarize this part of a conversation between user and assistant, "
+    "keeping facts, decisions and open questions.\n\n"
+)
+MERGE_SUMMARY_PROMPT = (
+    "Merge these consecutive summaries of one conversation into a single "
+    "concise summary, in order.\n\n"
+)
+
+
+def _transcript(messages) -> str:
+    return "\n".join(f"{m.sender.capitalize()}: {m.content}" for m in messages)
+
+
+def _chunk_messages(messages, max_messages: int, max_chars: int) -> List[list]:
+    """Consecutive runs of at most max_messages messages and ~max_chars."""
+    chunks, current, size = [], [], 0
+    for message in messages:
+        length = len(message.content or "")
+        if current and (len(current) >= max_messages or size + length > max_chars):
+            chunks.append(current)
+            current, size = [], 0
+        current.append(message)
+        size += length
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def summarize_messages(
+    summary: Optional[str], messages, usage: Optional[UsageMeter] = None
+) -> str:
+    """
+    Fold messages into an existing summary (or start one). A delta that fits
+    one chunk (CHAT_SUMMARY_CHUNK_MESSAGES / CHAT_SUMMARY_CHUNK_CHARS) costs
+    one call. Longer ones are summarised hierarchically: chunks concurrently
+    (bounded by the LLM gateway), then their summaries merged
+    CHAT_SUMMARY_FANOUT at a time until one call can fold them in.
+    """
+
+    async def generate(prompt: str) -> str:
+        # Conversation summaries never repeat; keep them out of the LLM cache
+        return await llm_gateway.generate_text(prompt, cache=False, usage=usage)
+
+    chunks = _chunk_messages(
+        messages,
+        settings.CHAT_SUMMARY_CHUNK_MESSAGES,
+        settings.CHAT_SUMMARY_CHUNK_CHARS,
+    )
+    if len(chunks) == 1:
+        new = _transcript(chunks[0])
+    else:
+        parts = await asyncio.gather(
+            *(generate(CHUNK_SUMMARY_PROMPT + _transcript(c)) for c in chunks)
+        )
+        fanout = max(2, settings.CHAT_SUMMARY_FANOUT)
+        while len(parts) > fanout:
+            groups = [parts[i : i + fanout] for i in range(0, len(parts), fanout)]
+            parts = await asyncio.gather(
+                *(generate(MERGE_SUMMARY_PROMPT + "\n\n".join(g)) for g in groups)
+            )
+        new = "Summaries of the new messages, in order:\n" + "\n\n".join(parts)
+    if summary:
+        prompt = (
+            f"Existing summary:\n{summary}\n\n"
+            f"New messages:\n{new}\n\n"
+            "Update the summary to include the new messages, keeping it concise "
+            "for future context."
+        )
+    else:
+        prompt = FIRST_SUMMARY_PROMPT + new
+    return (await generate(prompt))[:SUMMARY_MAX_CHARS]
+
+
 async def update_conversation_summary(
     db: AsyncSession, conversation_id: int, threshold: int = 10
-):
+) -> bool:
+    """
+    Extend the stored summary with the messages after its watermark
+    (summary_last_message_id) once message_count crosses the next multiple
+    of `threshold`. Reads are a counter lookup and a range scan of the new
+    messages only (at most CHAT_SUMMARY_MAX_MESSAGES per pass; the rest go
+    on the next one). No row lock is held during the LLM calls: the write is
+    conditional on summary_version, and a summary that lost a race with a
+    concurrent update is discarded. Returns True if the summary changed.
+    """
     logger.info(f"Updating conversation summary for conversation {conversation_id}")
     try:
-        # Lock the conversation row for update to prevent concurrent summary
-        # updates
-        conv_result = await db.execute(
-            select(Conversation)
-            .where(Conversation.id == conversation_id)
-            .with_for_update()
-        )
-        conversation = conv_result.scalars().first()
-        if not conversation:
+        state = (
+            await db.execute(
+                select(
+                    Conversation.user_id,
+                    Conversation.summary,
+                    Conversation.summary_msg_count,
+                    Conversation.summary_last_message_id,
+                    Conversation.summary_version,
+                    Conversation.message_count,
+                ).where(Conversation.id == conversation_id)
+            )
+        ).first()
+        if state is None:
             logger.error(f"Conversation not found: {conversation_id}")
             raise HTTPException(status_code=404, detail="Conversation not found")
-        last_msg_count = conversation.summary_msg_count or 0
-        # Count total messages
-        total_count_result = await db.execute(
-            select(Message).where(
-                Message.conversation_id == conversation_id,
-                Message.sender.in_(["assistant", "user"]),
-            )
-        )
-        total_count = total_count_result.scalars().all()
-        msg_count = len(total_count)
-
+        summarized = state.summary_msg_count or 0
+        new_messages = []
         # Only update summary if message count crosses threshold or summary is
         # missing
         if (
-            not conversation.summary
-            or msg_count // threshold > last_msg_count // threshold
+            not state.summary
+            or state.message_count // threshold > summarized // threshold
         ):
-            # Fetch only new messages (unsummarized)
-            new_msgs_result = await db.execute(
-                select(Message)
+            stmt = (
+                select(Message.id, Message.sender, Message.content)
                 .where(
                     Message.conversation_id == conversation_id,
-                    Message.sender.in_(["assistant", "user"]),
+                    Message.sender.in_(SUMMARY_SENDERS),
                 )
-                .order_by(Message.created_at.asc())
-                .offset(last_msg_count)
+                .order_by(Message.created_at, Message.id)
+                .limit(settings.CHAT_SUMMARY_MAX_MESSAGES)
             )
-            new_messages = new_msgs_result.scalars().all()
-
-            if not conversation.summary:
-                # First summary: summarize all messages
-                prompt = (
-                    "Summarize the following conversation between user and assistant in a concise way for future context. "
-                    "Format: {role: ..., content: ...} list.\n"
-                    + str(
-                        [{"role": m.sender, "content": m.content} for m in total_count]
-                    )
-                )
-                summary = await gemini_service.generate_text(prompt)
-            else:
-                # Incremental summary: extend existing summary with new
-                # messages
-                prompt = (
-                    f"Existing summary:\n{conversation.summary}\n\n"
-                    f"New messages:\n{str([{'role': m.sender, 'content': m.content} for m in new_messages])}\n\n"
-                    "Update the summary to include the new messages, keeping it concise for future context."
+            if state.summary_last_message_id is not None:
+                stmt = stmt.where(
+                    tuple_(Message.created_at, Message.id)
+                    > _message_key(conversation_id, state.summary_last_message_id)
                 )
-                summary = await gemini_service.generate_text(prompt)
-            summary = summary[:1000]
-            conversation.summary = summary
-            conversation.summary_msg_count = msg_count
-            db.add(conversation)
-            await db.commit()
-            await db.refresh(conversation)
-        logger.info(f"Conversation summary updated for conversation {conversation_id}")
-    except Exception as e:
-        logger.error(
-            f"Error updating conversation summary for {conversation_id}: {e}",
-            exc_info=True,
-        )
-        raise
-
+            new_messages = (await db.execute(stmt)).all()
+        # End the read transaction before the slow LLM calls
+        await db.commit()
+        if not new_messages:
+            return False
 
-async def get_retrieval_context(
-    db: AsyncSession, conversation_id: int, keywords: List[str]
-) -> List[str]:
-    logger.info(
-        f"Fetching retrieval context for conversation {conversation_id} with keywords: {keywords}"
-    )
-    try:
-        # Search for messages containing keywords, deduplicate by content
-        context_set = set()
-        for kw in keywords:
-            result = await db.execute(
-                select(Message).where(
-                    Message.conversation_id == conversation_id,
-                    Message.content.ilike(f"%{kw}%"),
-                )
+        usage = UsageMeter()
+        summary = await summarize_messages(state.summary, new_messages, usage)
+        result = await db.execute(
+            update(Conversation)
+            .where(
+                Conversation.id == conversation_id,
+                Conversation.summary_version == state.summary_version,
+            )
+            .values(
+                summary=summary,
+                summary_msg_count=summarized + len(new_messages),
+                summary_last_message_id=new_messages[-1].id,
+                summary_version=state.summary_version + 1,
+            )
+        )
+        await db.commit()
+        # The tokens were spent whether or not the summary is kept
+        await track_token_usage(
+            db, conversation_id, state.user_id, usage, purpose="summary"
+        )
+        if result.rowcount == 0:
+            logger.info(
+                f"Summary of conversation {conversation_id} changed concurrently; "
+                "discarding this one"
             )
-            for m in result.scalars().all():
-                context_set.add(m.content)
-        return list(context_set)[:5]  # Limit to top 5 relevant messages
+            return False
+        chat_context.set_summary(conversation_id, summary)
+        logger.info(f"Conversation summary updated for conversation {conversation_id}")
+        return True
     except Exception as e:
         logger.error(
-            f"Error fetching retrieval context for conversation {conversation_id}: {e}",
+            f"Error updating conversation summary for {conversation_id}: {e}",
             exc_info=True,
         )
         raise
 
 
 async def track_token_usage(
-    db: AsyncSession, conversation_id: int, user_id: int, tokens: int
-):
+    db: AsyncSession,
+    conversation_id: Optional[int],
+    user_id: Optional[int],
+    usage: UsageMeter,
+    purpose: str = "chat",
+    prompt: Optional[str] = None,
+) -> Optional[TokenUsage]:
+    """
+    Store the tokens metered for one operation. Pass the caller's own prompt
+    to split the input into prompt and context tokens. Nothing is stored if
+    no upstream call was made (e.g. the answer came from the LLM cache).
+    """
     logger.info(
-        f"Tracking token usage for conversation {conversation_id}, user {user_id}, tokens {tokens}"
+        f"Tracking token usage for conversation {conversation_id}, user {user_id}, "
+        f"{purpose}: {usage.total_tokens} tokens"
     )
+    if not usage.calls:
+        return None
     try:
-        usage = TokenUsage(
-            conversation_id=conversation_id, user_id=user_id, tokens_used=tokens
+        prompt_tokens, context_tokens = usage.split_input(prompt)
+        record = TokenUsage(
+            conversation_id=conversation_id,
+            user_id=user_id,
+            purpose=purpose,
+            prompt_tokens=prompt_tokens,
+            context_tokens=context_tokens,
+            completion_tokens=usage.output_tokens,
+            estimated=usage.estimated,
+            tokens_used=usage.total_tokens,
+            model=usage.model,
         )
-        db.add(usage)
+        db.add(record)
         await db.commit()
-        await db.refresh(usage)
+        await db.refresh(record)
         logger.info(
-            f"Token usage tracked for conversation {conversation_id}, usage_id: {usage.id}"
+            f"Token usage tracked for conversation {conversation_id}, usage_id: {record.id}"
         )
-        return usage
+        return record
     except Exception as e:
         logger.error(
             f"Error tracking token usage for conversation {conversation_id}: {e}",
@@ -286,26 +457,27 @@ async def stream_ai_response(
     last_n: int = 10,
     use_summary: bool = True,
     retrieval_keywords: Optional[List[str]] = None,
+    usage: Optional[UsageMeter] = None,
+    context: Optional[ConversationContext] = None,
 ):
     """
     Async generator yielding streaming response chunks from Gemini.
     Context window includes last N messages, summary memory, and retrieval-based context.
+    Pass a context already loaded with load_context() to skip the lookup.
+    Tokens spent are recorded on `usage` when the stream ends or is closed.
     """
     logger.info(f"Streaming AI response for conversation {conversation_id}")
     try:
-        # Last N messages
-        last_messages = await get_conversation_messages(
-            db, conversation_id, limit=last_n
-        )
-        last_context = [f"{m.sender.capitalize()}: {m.content}" for m in last_messages]
+        if context is None:
+            context = await load_context(
+                db, conversation_id, last_n, retrieval_keywords
+            )
+            await retrieval.add_related(db, context, prompt)
+        last_context = [f"{m.sender.capitalize()}: {m.content}" for m in context.recent]
         # Summary memory (incremental, stored in DB, pure read)
-        summary = await get_summary_memory(db, conversation_id) if use_summary else ""
+        summary = context.summary if use_summary else ""
         # Retrieval-based context
-        retrieval_context = []
-        if retrieval_keywords:
-            retrieval_context = await get_retrieval_context(
-                db, conversation_id, retrieval_keywords
-            )
+        retrieval_context = context.matches
         # Build full context
         context_parts = []
         if summary:
@@ -316,7 +488,9 @@ async def stream_ai_response(
             context_parts.append("Relevant context:\n" + "\n".join(retrieval_context))
         full_context = "\n\n".join(context_parts)
         full_prompt = f"{full_context}\n\nUser: {prompt}"
-        async for chunk in gemini_service.generate_streaming_text(full_prompt):
+        async for chunk in llm_gateway.generate_streaming_text(
+            full_prompt, usage=usage
+        ):
             yield chunk
     except Exception as e:
         logger.error(
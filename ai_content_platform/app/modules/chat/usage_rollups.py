@@ -0,0 +1,222 @@
+"""
+Pre-aggregated token usage for analytics.
+token_usage holds one row per LLM-backed operation. roll_up_usage() folds new
+rows into token_usage_rollups: one row per hour and per day bucket for each
+(user, conversation, model, purpose) seen, upserted with INSERT ... ON
+CONFLICT DO UPDATE so the sums only ever grow by the new rows. The position
+reached is a batch_checkpoints row, locked and advanced in the same
+transaction as the upserts, so every usage row is counted exactly once even
+if two rollers run.
+
+Rows younger than USAGE_ROLLUP_LAG_SECONDS are left for the next pass, so a
+slow transaction that took a lower id commits before the rollup moves past
+it. The background worker runs a pass every USAGE_ROLLUP_INTERVAL_SECONDS.
+
+usage_totals() answers analytics from the rollups; its cost depends on the
+number of buckets and groups in range, not on how much usage was recorded.
+"""
+
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.database import AsyncSessionLocal
+from ai_content_platform.app.modules.chat.models import TokenUsage, TokenUsageRollup
+from ai_content_platform.app.modules.content.models import BatchCheckpoint
+from ai_content_platform.app.shared import metrics
+from ai_content_platform.app.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+CHECKPOINT_NAME = "token_usage_rollups"
+GRANULARITIES = ("hour", "day")
+GROUP_COLUMNS = {
+    "bucket": TokenUsageRollup.bucket_start,
+    "user": TokenUsageRollup.user_id,
+    "conversation": TokenUsageRollup.conversation_id,
+    "model": TokenUsageRollup.model,
+    "purpose": TokenUsageRollup.purpose,
+}
+# Columns of uq_token_usage_rollups_cell, in _cells() key order
+KEY_COLUMNS = (
+    "granularity",
+    "bucket_start",
+    "user_id",
+    "conversation_id",
+    "model",
+    "purpose",
+)
+SUM_COLUMNS = (
+    "requests",
+    "prompt_tokens",
+    "context_tokens",
+    "completion_tokens",
+    "tokens_used",
+)
+# Rows per multi-row INSERT; keeps SQLite under its bound-parameter limit
+UPSERT_CHUNK = 500
+
+_rolled = metrics.counter("token_usage_rolled_up_total")
+_rollup_latency = metrics.latency("token_usage_rollup_batch_seconds")
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    moment = moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0) if granularity == "day" else moment
+
+
+def _cells(rows) -> Dict[Tuple, List[int]]:
+    cells = defaultdict(lambda: [0] * len(SUM_COLUMNS))
+    for row in rows:
+        values = (
+            1,
+            row.prompt_tokens or 0,
+            row.context_tokens or 0,
+            row.completion_tokens or 0,
+            row.tokens_used or 0,
+        )
+        for granularity in GRANULARITIES:
+            key = (
+                granularity,
+                bucket_start(row.created_at, granularity),
+                row.user_id or 0,
+                row.conversation_id or 0,
+                row.model or "",
+                row.purpose or "",
+            )
+            sums = cells[key]
+            for i, value in enumerate(values):
+                sums[i] += value
+    return cells
+
+
+async def _upsert(db: AsyncSession, cells: Dict[Tuple, List[int]]):
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    table = TokenUsageRollup.__table__
+    records = [
+        {**dict(zip(KEY_COLUMNS, key)), **dict(zip(SUM_COLUMNS, sums))}
+        for key, sums in cells.items()
+    ]
+    for start in range(0, len(records), UPSERT_CHUNK):
+        stmt = dialect.insert(table).values(records[start : start + UPSERT_CHUNK])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(KEY_COLUMNS),
+            set_={name: table.c[name] + stmt.excluded[name] for name in SUM_COLUMNS},
+        )
+        await db.execute(stmt)
+
+
+async def roll_up_usage(db: AsyncSession, batch_size: int = None) -> int:
+    """Fold the next batch of settled usage rows into the rollups."""
+    batch_size = batch_size or settings.USAGE_ROLLUP_BATCH_SIZE
+    started = asyncio.get_running_loop().time()
+    try:
+        checkpoint = await db.get(
+            BatchCheckpoint, CHECKPOINT_NAME, with_for_update=True
+        )
+        if checkpoint is None:
+            checkpoint = BatchCheckpoint(name=CHECKPOINT_NAME, last_id=0)
+            db.add(checkpoint)
+        rows = (
+            await db.execute(
+                select(
+                    TokenUsage.id,
+                    TokenUsage.user_id,
+                    TokenUsage.conversation_id,
+                    TokenUsage.model,
+                    TokenUsage.purpose,
+                    TokenUsage.prompt_tokens,
+                    TokenUsage.context_tokens,
+                    TokenUsage.completion_tokens,
+                    TokenUsage.tokens_used,
+                    TokenUsage.created_at,
+                )
+                # Rows without a timestamp have no bucket; leaving them out
+                # lets the checkpoint move past them instead of stalling
+                .where(
+                    TokenUsage.id > checkpoint.last_id,
+                    TokenUsage.created_at.isnot(None),
+                )
+                .order_by(TokenUsage.id)
+                .limit(batch_size)
+            )
+        ).all()
+        cutoff = datetime.utcnow() - timedelta(
+            seconds=settings.USAGE_ROLLUP_LAG_SECONDS
+        )
+        settled = []
+        for row in rows:
+            if row.created_at > cutoff:
+                break
+            settled.append(row)
+        if settled:
+            await _upsert(db, _cells(settled))
+            checkpoint.last_id = settled[-1].id
+            checkpoint.updated_at = datetime.utcnow()
+        await db.commit()
+        _rolled.inc(len(settled))
+        return len(settled)
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error rolling up token usage: {e}", exc_info=True)
+        raise
+    finally:
+        _rollup_latency.observe(asyncio.get_running_loop().time() - started)
+
+
+async def usage_totals(
+    db: AsyncSession,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    group_by: Sequence[str] = (),
+    granularity: str = "day",
+    user_id: Optional[int] = None,
+) -> List[dict]:
+    """
+    Summed usage over [start, end), optionally grouped by any of
+    GROUP_COLUMNS. Bounds are rounded down to the granularity's buckets.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    unknown = set(group_by) - set(GROUP_COLUMNS)
+    if unknown:
+        raise ValueError(f"Cannot group usage by: {', '.join(sorted(unknown))}")
+    keys = [GROUP_COLUMNS[name].label(name) for name in group_by]
+    sums = [
+        func.coalesce(func.sum(getattr(TokenUsageRollup, name)), 0).label(name)
+        for name in SUM_COLUMNS
+    ]
+    stmt = select(*keys, *sums).where(TokenUsageRollup.granularity == granularity)
+    if start is not None:
+        stmt = stmt.where(
+            TokenUsageRollup.bucket_start >= bucket_start(start, granularity)
+        )
+    if end is not None:
+        stmt = stmt.where(TokenUsageRollup.bucket_start < end)
+    if user_id is not None:
+        stmt = stmt.where(TokenUsageRollup.user_id == user_id)
+    if keys:
+        stmt = stmt.group_by(*keys).order_by(*keys)
+    result = await db.execute(stmt)
+    return [dict(row._mapping) for row in result.all()]
+
+
+async def run_usage_rollups(interval: int = None):
+    """Rollup loop for the background worker; a task in the worker's event loop."""
+    interval = interval or settings.USAGE_ROLLUP_INTERVAL_SECONDS
+    batch_size = settings.USAGE_ROLLUP_BATCH_SIZE
+    logger.info(f"Token usage rollups started, interval={interval}s")
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                # Catch up in batches, then wait for new usage
+                while await roll_up_usage(db, batch_size) >= batch_size:
+                    pass
+        except Exception as e:
+            logger.error(f"Token usage rollup failed: {e}", exc_info=True)
+        await asyncio.sleep(interval)
@@ -0,0 +1,317 @@
+"""
+Batch summarisation for articles whose summary is NULL.
+Candidates are read in keyset pages of (id, content). Each page is packed
+into LLM requests: short articles share a request (up to
+SUMMARY_PACK_MAX_ARTICLES and SUMMARY_PACK_MAX_CHARS of content, answered as
+a JSON object keyed by article id), long ones go alone, truncated to the
+budget. Packs run concurrently (bounded here and by the LLM gateway) and a
+page's summaries are written with one bulk UPDATE before the checkpoint
+advances past it, so an interrupted run resumes at the next page. Articles
+left without a summary hold the checkpoint just below the first of them, so
+the next run retries them; a page's tokens are stored as TokenUsage rows
+(purpose "summary") as soon as the page is written.
+
+Run from the admin endpoint (POST /admin/articles/summaries/backfill) or:
+
+    python -m ai_content_platform.app.modules.content.batch_summaries \
+        --concurrency 4 --limit 10000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import Integer, Text, bindparam, column, update, values
+from sqlalchemy.future import select
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.database import AsyncSessionLocal
+from ai_content_platform.app.modules.chat.services import track_token_usage
+from ai_content_platform.app.modules.content.llm_gateway import llm_gateway
+from ai_content_platform.app.modules.content.llm_usage import UsageMeter
+from ai_content_platform.app.modules.content.models import Article, BatchCheckpoint
+from ai_content_platform.app.shared import metrics
+from ai_content_platform.app.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+CHECKPOINT_NAME = "article_summaries"
+PACK_PROMPT = (
+    "Summarize each of the following articles in 2-3 sentences. Reply with a "
+    'JSON object mapping each article id (as a string) to its summary, e.g. {"12": '
+    '"..."}, and nothing else.\n'
+)
+SINGLE_PROMPT = "Summarize the following article in 2-3 sentences: "
+
+_pack_latency = metrics.latency("summary_batch_request_seconds")
+_summarized = metrics.counter("summary_batch_articles_total")
+
+
+@dataclass
+class BatchReport:
+    status: str = "running"
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    checkpoint: int = 0
+    articles: int = 0
+    summarized: int = 0
+    failed: int = 0
+    llm_requests: int = 0
+    usage: UsageMeter = field(default_factory=UsageMeter)
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        report = asdict(self)
+        del report["usage"]
+        end = self.finished_at or datetime.utcnow()
+        elapsed = round((end - self.started_at).total_seconds(), 1)
+        input_tokens = self.usage.input_tokens
+        output_tokens = self.usage.output_tokens
+        report.update(
+            elapsed_seconds=elapsed,
+            articles_per_second=(
+                round(self.summarized / elapsed, 2) if elapsed else None
+            ),
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            tokens_estimated=self.usage.estimated,
+            estimated_cost_usd=round(
+                input_tokens / 1000 * settings.LLM_COST_PER_1K_INPUT_TOKENS
+                + output_tokens / 1000 * settings.LLM_COST_PER_1K_OUTPUT_TOKENS,
+                4,
+            ),
+        )
+        return report
+
+
+def pack_articles(
+    articles: List[Tuple[int, str]], max_chars: int, max_articles: int
+) -> List[List[Tuple[int, str]]]:
+    """Group (id, content) pairs into requests, keeping page order."""
+    packs, current, size = [], [], 0
+    for article_id, content in articles:
+        content = content[:max_chars]
+        if current and (
+            size + len(content) > max_chars or len(current) >= max_articles
+        ):
+            packs.append(current)
+            current, size = [], 0
+        current.append((article_id, content))
+        size += len(content)
+    if current:
+        packs.append(current)
+    return packs
+
+
+def _pack_prompt(pack: List[Tuple[int, str]]) -> str:
+    blocks = [f"[article {article_id}]\n{content}" for article_id, content in pack]
+    return PACK_PROMPT + "\n\n".join(blocks)
+
+
+def _parse_pack_reply(reply: str, pack: List[Tuple[int, str]]) -> Dict[int, str]:
+    text = reply.strip()
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    wanted = {article_id for article_id, _ in pack}
+    return {
+        int(key): str(value).strip()
+        for key, value in data.items()
+        if str(key).isdigit() and int(key) in wanted and str(value).strip()
+    }
+
+
+async def _summarize_pack(
+    pack, report: BatchReport, usage: UsageMeter
+) -> Dict[int, str]:
+    started = time.perf_counter()
+    try:
+        if len(pack) == 1:
+            article_id, content = pack[0]
+            prompt = SINGLE_PROMPT + content
+            reply = await llm_gateway.generate_text(prompt, usage=usage)
+            summaries = {article_id: reply.strip()} if reply.strip() else {}
+        else:
+            prompt = _pack_prompt(pack)
+            reply = await llm_gateway.generate_text(
+                prompt,
+                config={"response_mime_type": "application/json"},
+                usage=usage,
+            )
+            summaries = _parse_pack_reply(reply, pack)
+        report.llm_requests += 1
+    except Exception as e:
+        logger.warning(f"Summary request for {len(pack)} articles failed: {e}")
+        return {}
+    finally:
+        _pack_latency.observe(time.perf_counter() - started)
+    missing = [item for item in pack if item[0] not in summaries]
+    if missing and len(pack) > 1:
+        # The model skipped or mangled some entries; retry those one by one
+        for item in missing:
+            summaries.update(await _summarize_pack([item], report, usage))
+    return summaries
+
+
+async def write_summaries(db, summaries: Dict[int, str]) -> int:
+    """Bulk-update summaries that are still NULL; returns rows changed."""
+    if not summaries:
+        return 0
+    now = datetime.utcnow()
+    articles = Article.__table__
+    if db.bind.dialect.name == "postgresql":
+        rows = values(
+            column("id", Integer), column("summary", Text), name="new_summaries"
+        ).data(list(summaries.items()))
+        stmt = (
+            update(articles)
+            .where(articles.c.id == rows.c.id, articles.c.summary.is_(None))
+            .values(summary=rows.c.summary, updated_at=now)
+        )
+        result = await db.execute(stmt)
+    else:
+        # SQLite cannot name the columns of a VALUES list; executemany instead
+        stmt = (
+            update(articles)
+            .where(articles.c.id == bindparam("b_id"), articles.c.summary.is_(None))
+            .values(summary=bindparam("b_summary"), updated_at=now)
+        )
+        result = await db.execute(
+            stmt,
+            [{"b_id": k, "b_summary": v} for k, v in summaries.items()],
+        )
+    await db.commit()
+    return result.rowcount
+
+
+async def _checkpoint(db, last_id: Optional[int] = None) -> int:
+    row = await db.get(BatchCheckpoint, CHECKPOINT_NAME)
+    if last_id is None:
+        return row.last_id if row else 0
+    if row is None:
+        row = BatchCheckpoint(name=CHECKPOINT_NAME)
+        db.add(row)
+    row.last_id = last_id
+    row.updated_at = datetime.utcnow()
+    await db.commit()
+    return last_id
+
+
+async def summarize_missing(
+    concurrency: int = None,
+    limit: Optional[int] = None,
+    restart: bool = False,
+    report: Optional[BatchReport] = None,
+    session_factory=AsyncSessionLocal,
+) -> BatchReport:
+    """Summarise articles with a NULL summary, resuming from the checkpoint."""
+    concurrency = concurrency or settings.SUMMARY_BATCH_CONCURRENCY
+    report = report or BatchReport()
+    slots = asyncio.Semaphore(concurrency)
+
+    async def bounded(pack, usage):
+        async with slots:
+            return await _summarize_pack(pack, report, usage)
+
+    try:
+        async with session_factory() as db:
+            last_id = 0 if restart else await _checkpoint(db)
+            report.checkpoint = last_id
+            first_failed = None
+            while limit is None or report.articles < limit:
+                page_size = settings.SUMMARY_BATCH_PAGE_SIZE
+                if limit is not None:
+                    page_size = min(page_size, limit - report.articles)
+                rows = (
+                    await db.execute(
+                        select(Article.id, Article.content)
+                        .where(Article.summary.is_(None), Article.id > last_id)
+                        .order_by(Article.id)
+                        .limit(page_size)
+                    )
+                ).all()
+                # End the read transaction before the slow LLM calls
+                await db.commit()
+                if not rows:
+                    break
+                packs = pack_articles(
+                    [(r.id, r.content or "") for r in rows],
+                    settings.SUMMARY_PACK_MAX_CHARS,
+                    settings.SUMMARY_PACK_MAX_ARTICLES,
+                )
+                summaries = {}
+                usage = UsageMeter()
+                for result in await asyncio.gather(*(bounded(p, usage) for p in packs)):
+                    summaries.update(result)
+                written = await write_summaries(db, summaries)
+                await track_token_usage(db, None, None, usage, purpose="summary")
+                report.usage.merge(usage)
+                report.articles += len(rows)
+                report.summarized += written
+                report.failed += len(rows) - len(summaries)
+                _summarized.inc(written)
+                if first_failed is None:
+                    first_failed = next(
+                        (r.id for r in rows if r.id not in summaries), None
+                    )
+                # Keep paging past failures, but only checkpoint below them
+                last_id = rows[-1].id
+                report.checkpoint = await _checkpoint(
+                    db, last_id if first_failed is None else first_failed - 1
+                )
+                logger.info(
+                    f"Summary backfill: {report.summarized}/{report.articles} "
+                    f"articles, checkpoint {report.checkpoint}"
+                )
+        report.status = "finished"
+    except Exception as e:
+        logger.error(f"Summary backfill failed: {e}", exc_info=True)
+        report.status = "failed"
+        report.error = str(e)
+        raise
+    finally:
+        report.finished_at = datetime.utcnow()
+    return report
+
+
+# Admin endpoint runs one backfill at a time in the API process
+
+_current: Optional[Tuple[asyncio.Task, BatchReport]] = None
+
+
+def start_backfill(concurrency: int = None, limit: int = None, restart=False):
+    """Start a backfill task; returns None if one is already running."""
+    global _current
+    if _current is not None and not _current[0].done():
+        return None
+    report = BatchReport()
+    task = asyncio.create_task(
+        summarize_missing(concurrency, limit, restart, report=report)
+    )
+    # Failures are recorded on the report
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    _current = (task, report)
+    return report
+
+
+def backfill_status() -> Optional[BatchReport]:
+    return _current[1] if _current else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarise articles missing one")
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument(
+        "--restart", action="store_true", help="ignore the saved checkpoint"
+    )
+    args = parser.parse_args()
+    result = asyncio.run(summarize_missing(args.concurrency, args.limit, args.restart))
+    print(json.dumps(result.to_dict(), default=str, indent=2))
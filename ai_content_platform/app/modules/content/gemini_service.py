@@ -1,39 +1,130 @@
-from google import genai
+"""
+Gemini client built on the SDK's native async API (client.aio), so LLM calls
+never block the event loop. Streaming forwards each text delta as the API
+emits it; when the consumer stops early (e.g. the HTTP client disconnects and
+the response task is cancelled) the upstream stream is closed with it. Token
+usage is recorded on the caller's UsageMeter, if one is passed, including for
+streams that stop early.
+"""
+
 import asyncio
+import httpx
+from typing import AsyncIterator, List, Optional
+from google import genai
+from google.genai import types
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.modules.content.llm_usage import UsageMeter
+from ai_content_platform.app.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_MODEL = "models/gemini-2.5-flash"
+DEFAULT_EMBEDDING_MODEL = "models/text-embedding-004"
 
 
 class GeminiService:
-    def __init__(self, api_key: str):
-        self.client = genai.Client(api_key=api_key)
+    """
+    Thin wrapper over one genai.Client. Pass `http_client` to share a pooled
+    httpx.AsyncClient; callers should normally go through the LLM gateway
+    (llm_gateway.py) rather than instantiating this directly.
+    """
 
-    async def generate_streaming_text(
-        self, prompt: str, model: str = "models/gemini-2.5-flash"
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
     ):
+        self.client = genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(
+                base_url=base_url or settings.GEMINI_BASE_URL or None,
+                httpx_async_client=http_client,
+            ),
+        )
+
+    async def generate_streaming_text(
+        self,
+        prompt: str,
+        model: str = DEFAULT_MODEL,
+        usage: Optional[UsageMeter] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Yield text chunks as Gemini produces them.
+        """
         try:
-            response = self.client.models.generate_content(model=model, contents=prompt)
-            if hasattr(response, "text") and response.text:
-                # Simulate async streaming by yielding chunks with a small
-                # delay
-                for chunk in response.text.split("."):
-                    chunk = chunk.strip()
-                    if chunk:
-                        # Simulate network/streaming delay
-                        await asyncio.sleep(0.02)
-                        yield chunk + "."
-            else:
-                raise ValueError("Invalid response from Gemini API.")
+            stream = await self.client.aio.models.generate_content_stream(
+                model=model, contents=prompt
+            )
+        except Exception as e:
+            raise RuntimeError(f"GeminiService streaming error: {str(e)}")
+        received = []
+        # Usage counts are cumulative; the last chunk carrying them wins
+        usage_metadata = None
+        try:
+            async for chunk in stream:
+                usage_metadata = (
+                    getattr(chunk, "usage_metadata", None) or usage_metadata
+                )
+                if chunk.text:
+                    received.append(chunk.text)
+                    yield chunk.text
+        except asyncio.CancelledError:
+            logger.info("Gemini stream cancelled by consumer")
+            raise
         except Exception as e:
             raise RuntimeError(f"GeminiService streaming error: {str(e)}")
+        finally:
+            await stream.aclose()
+            if usage is not None:
+                usage.record(prompt, "".join(received), usage_metadata, model)
+        if not received:
+            raise RuntimeError(
+                "GeminiService streaming error: Invalid response from Gemini API."
+            )
 
-    async def generate_text(self, prompt: str, model: str = "models/gemini-2.5-flash"):
+    async def generate_text(
+        self,
+        prompt: str,
+        model: str = DEFAULT_MODEL,
+        config: Optional[dict] = None,
+        usage: Optional[UsageMeter] = None,
+    ):
         """
-        Non-streaming LLM call for summary generation.
+        Non-streaming LLM call for summary generation. `config` is passed to
+        the SDK as GenerateContentConfig (temperature, max_output_tokens, ...).
         """
         try:
-            response = self.client.models.generate_content(model=model, contents=prompt)
+            response = await self.client.aio.models.generate_content(
+                model=model, contents=prompt, config=config
+            )
+            if usage is not None:
+                usage.record(
+                    prompt,
+                    getattr(response, "text", None) or "",
+                    getattr(response, "usage_metadata", None),
+                    model,
+                )
             if hasattr(response, "text") and response.text:
                 return response.text
             else:
                 raise ValueError("Invalid response from Gemini API.")
         except Exception as e:
             raise RuntimeError(f"GeminiService error: {str(e)}")
+
+    async def embed_texts(
+        self,
+        texts: List[str],
+        model: str = DEFAULT_EMBEDDING_MODEL,
+        dimensions: Optional[int] = None,
+    ) -> List[List[float]]:
+        """One embedding vector per text, in order."""
+        try:
+            response = await self.client.aio.models.embed_content(
+                model=model,
+                contents=texts,
+                config=types.EmbedContentConfig(output_dimensionality=dimensions),
+            )
+            return [list(embedding.values) for embedding in response.embeddings]
+        except Exception as e:
+            raise RuntimeError(f"GeminiService embedding error: {str(e)}")
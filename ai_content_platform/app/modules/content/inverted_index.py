@@ -0,0 +1,391 @@
+"""
+In-process inverted index over article titles, bodies and tag names.
+Meant for single-process deployments on SQLite (SEARCH_BACKEND=memory): the
+index is built at startup, kept current by the content service write paths
+(and, every SEARCH_INDEX_REFRESH_SECONDS, by a catch-up on articles the job
+workers wrote in their own process) and scored with BM25. Each term's
+posting list is a pair of int32 arrays (document numbers and weighted term
+frequencies), so a posting costs 8 bytes rather than a Python object.
+
+Snapshots are a single binary file. Restoring memory-maps it and points the
+posting lists at slices of the mapping, so a restart costs one pass over the
+vocabulary instead of a full rebuild; a list is copied out only when it is
+next written to. Writes made while the process was down are caught up from
+the database by updated_at.
+"""
+
+import asyncio
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import sys
+from array import array
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.database import AsyncSessionLocal
+from ai_content_platform.app.modules.content.models import Article
+from ai_content_platform.app.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+TOKEN_RE = re.compile(r"\w+")
+# Term-frequency weights per field; title > tags > body, as in the SQL backends
+FIELD_WEIGHTS = {"title": 3, "tags": 2, "content": 1}
+# Exact tag names are indexed as unscored terms under this prefix for filtering
+TAG_TERM = "\x00tag:"
+BM25_K1, BM25_B = 1.2, 0.75
+MAX_PREFIX_EXPANSIONS = 50
+SNAPSHOT_MAGIC = b"AIIDX001"
+# How far behind the watermark a catch-up looks for late commits
+CATCH_UP_OVERLAP = timedelta(minutes=1)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_RE.findall((text or "").lower())
+
+
+class _Postings:
+    """Document numbers (ascending) and term frequencies for one term."""
+
+    __slots__ = ("docs", "tfs")
+
+    def __init__(self, docs=None, tfs=None):
+        self.docs = array("i") if docs is None else docs
+        self.tfs = array("i") if tfs is None else tfs
+
+    def append(self, docno: int, tf: int):
+        if not isinstance(self.docs, array):
+            # Restored from a snapshot: still a read-only view of the mapping
+            self.docs, self.tfs = array("i", self.docs), array("i", self.tfs)
+        self.docs.append(docno)
+        self.tfs.append(tf)
+
+
+class InvertedIndex:
+    """
+    BM25 index keyed by internal document numbers. Updating an article
+    tombstones its old document and appends a new one; compact() drops
+    tombstones once they outnumber live documents.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._doc_ids = array("i")  # docno -> article id
+        self._doc_lens = array("i")  # docno -> weighted length
+        self._alive = bytearray()  # docno -> 1 while current
+        self._docnos: Dict[int, int] = {}  # article id -> live docno
+        # article id -> updated_at of the indexed version (not in snapshots)
+        self._versions: Dict[int, datetime] = {}
+        self._postings: Dict[str, _Postings] = {}
+        self._total_len = 0
+        self._mapping = None
+        self.watermark: Optional[datetime] = None
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._docnos)
+
+    @property
+    def dead(self) -> int:
+        return len(self._doc_ids) - len(self._docnos)
+
+    def version(self, article_id: int) -> Optional[datetime]:
+        """updated_at of the indexed version, if the index knows it."""
+        return self._versions.get(article_id)
+
+    # Writes
+
+    def add(
+        self,
+        article_id: int,
+        title: str,
+        content: str,
+        tags: Sequence[str] = (),
+        updated_at: Optional[datetime] = None,
+    ):
+        self.remove(article_id)
+        counts = Counter()
+        for field, text in (("title", title), ("content", content)):
+            for term in tokenize(text):
+                counts[term] += FIELD_WEIGHTS[field]
+        for tag in tags:
+            for term in tokenize(tag):
+                counts[term] += FIELD_WEIGHTS["tags"]
+        length = sum(counts.values())
+        for tag in {t.lower() for t in tags}:
+            counts[TAG_TERM + tag] = 0
+        docno = len(self._doc_ids)
+        self._doc_ids.append(article_id)
+        self._doc_lens.append(length)
+        self._alive.append(1)
+        self._docnos[article_id] = docno
+        if updated_at:
+            self._versions[article_id] = updated_at
+        self._total_len += length
+        for term, tf in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = _Postings()
+            postings.append(docno, tf)
+        if updated_at and (self.watermark is None or updated_at > self.watermark):
+            self.watermark = updated_at
+
+    def add_article(self, article):
+        """Index an Article whose tags are loaded."""
+        self.add(
+            article.id,
+            article.title,
+            article.content,
+            [tag.name for tag in article.tags],
+            article.updated_at,
+        )
+
+    def remove(self, article_id: int):
+        self._versions.pop(article_id, None)
+        docno = self._docnos.pop(article_id, None)
+        if docno is None:
+            return
+        self._alive[docno] = 0
+        self._total_len -= self._doc_lens[docno]
+        if self.dead > max(len(self._docnos), settings.SEARCH_INDEX_COMPACT_MIN):
+            self.compact()
+
+    def compact(self):
+        """Renumber live documents and drop tombstoned postings."""
+        remap = array("i", [-1]) * len(self._doc_ids)
+        doc_ids, doc_lens = array("i"), array("i")
+        for docno, alive in enumerate(self._alive):
+            if alive:
+                remap[docno] = len(doc_ids)
+                doc_ids.append(self._doc_ids[docno])
+                doc_lens.append(self._doc_lens[docno])
+        postings = {}
+        for term, old in self._postings.items():
+            new = _Postings()
+            for docno, tf in zip(old.docs, old.tfs):
+                if remap[docno] >= 0:
+                    new.docs.append(remap[docno])
+                    new.tfs.append(tf)
+            if new.docs:
+                postings[term] = new
+        self._doc_ids, self._doc_lens = doc_ids, doc_lens
+        self._alive = bytearray(b"\x01") * len(doc_ids)
+        self._docnos = {article_id: i for i, article_id in enumerate(doc_ids)}
+        self._postings = postings
+        self._mapping = None
+
+    # Reads
+
+    def expand(self, prefix: str) -> List[str]:
+        """Vocabulary terms starting with `prefix`, for fuzzy matching."""
+        matches = [
+            term
+            for term in self._postings
+            if term.startswith(prefix) and not term.startswith(TAG_TERM)
+        ]
+        return sorted(matches, key=len)[:MAX_PREFIX_EXPANSIONS]
+
+    def _tagged(self, tags: Iterable[str]) -> Optional[set]:
+        allowed = None
+        for tag in {t.strip().lower() for t in tags if t.strip()}:
+            postings = self._postings.get(TAG_TERM + tag)
+            docs = set(postings.docs) if postings else set()
+            allowed = docs if allowed is None else allowed & docs
+        return allowed
+
+    def search(
+        self,
+        groups: Sequence[Sequence[str]],
+        limit: int,
+        tags: Iterable[str] = (),
+        after: Optional[Tuple[float, int]] = None,
+    ) -> List[Tuple[float, int]]:
+        """
+        Top `limit` (score, article id) pairs, best first. A document must
+        contain a term from every group; scores sum BM25 over matched terms.
+        `after` continues from the last pair of a previous page.
+        """
+        live = len(self._docnos)
+        if not groups or not live:
+            return []
+        allowed = self._tagged(tags)
+        avg_len = self._total_len / live or 1.0
+        scores: Dict[int, float] = {}
+        matched: Dict[int, int] = {}
+        for group in groups:
+            hit = set()
+            for term in set(group):
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                df = len(postings.docs)
+                idf = math.log(1 + (live - df + 0.5) / (df + 0.5))
+                for docno, tf in zip(postings.docs, postings.tfs):
+                    if not self._alive[docno]:
+                        continue
+                    if allowed is not None and docno not in allowed:
+                        continue
+                    norm = 1 - BM25_B + BM25_B * self._doc_lens[docno] / avg_len
+                    scores[docno] = scores.get(docno, 0.0) + idf * tf * (
+                        BM25_K1 + 1
+                    ) / (tf + BM25_K1 * norm)
+                    hit.add(docno)
+            for docno in hit:
+                matched[docno] = matched.get(docno, 0) + 1
+        results = (
+            (score, self._doc_ids[docno])
+            for docno, score in scores.items()
+            if matched[docno] == len(groups)
+        )
+        if after is not None:
+            results = (pair for pair in results if pair < after)
+        return heapq.nlargest(limit, results)
+
+    # Snapshots
+
+    def snapshot(self, path: str):
+        """Write the index to `path` atomically."""
+        if self.dead:
+            self.compact()
+        terms, docs, tfs = [], array("i"), array("i")
+        for term, postings in self._postings.items():
+            terms.append([term, len(docs), len(postings.docs)])
+            docs.extend(postings.docs)
+            tfs.extend(postings.tfs)
+        header = json.dumps(
+            {
+                "byteorder": sys.byteorder,
+                "documents": len(self._doc_ids),
+                "postings": len(docs),
+                "watermark": self.watermark.isoformat() if self.watermark else None,
+                "terms": terms,
+            }
+        ).encode()
+        header += b" " * (-len(header) % 8)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            for part in (self._doc_ids, self._doc_lens, docs, tfs):
+                f.write(part.tobytes())
+        os.replace(tmp, path)
+        logger.info(f"Search index snapshot written: {len(self)} articles, {path}")
+
+    def restore(self, path: str) -> bool:
+        """Map a snapshot written by snapshot(); False if missing or unusable."""
+        try:
+            with open(path, "rb") as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return False
+        try:
+            if mapping[:8] != SNAPSHOT_MAGIC:
+                raise ValueError("bad magic")
+            size = int.from_bytes(mapping[8:16], "little")
+            header = json.loads(mapping[16 : 16 + size])
+            if header["byteorder"] != sys.byteorder:
+                raise ValueError("snapshot written on a different byte order")
+            n, p = header["documents"], header["postings"]
+            ints = memoryview(mapping)[16 + size :].cast("i")
+            if len(ints) != 2 * n + 2 * p:
+                raise ValueError("truncated snapshot")
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring search index snapshot {path}: {e}")
+            return False
+        self.clear()
+        self._doc_ids = array("i", ints[:n])
+        self._doc_lens = array("i", ints[n : 2 * n])
+        self._alive = bytearray(b"\x01") * n
+        self._docnos = {article_id: i for i, article_id in enumerate(self._doc_ids)}
+        self._total_len = sum(self._doc_lens)
+        docs, tfs = ints[2 * n : 2 * n + p], ints[2 * n + p :]
+        for term, offset, count in header["terms"]:
+            self._postings[term] = _Postings(
+                docs[offset : offset + count], tfs[offset : offset + count]
+            )
+        if header["watermark"]:
+            self.watermark = datetime.fromisoformat(header["watermark"])
+        self._mapping = mapping
+        logger.info(f"Search index restored from {path}: {n} articles")
+        return True
+
+
+article_index = InvertedIndex()
+
+
+def index_enabled() -> bool:
+    return settings.SEARCH_BACKEND == "memory"
+
+
+async def warm_article_index(db):
+    """
+    Restore the snapshot (when configured) and catch up from the database, or
+    build the index from scratch. Called once at startup.
+    """
+    path = settings.SEARCH_INDEX_SNAPSHOT_PATH
+    if path and article_index.restore(path):
+        # Drop articles deleted while we were down; changed and new ones are
+        # caught up below since updated_at defaults to now
+        current = set((await db.execute(select(Article.id))).scalars().all())
+        for article_id in list(article_index._docnos):
+            if article_id not in current:
+                article_index.remove(article_id)
+    else:
+        article_index.clear()
+    await catch_up_article_index(db)
+    article_index.ready = True
+    logger.info(f"Search index ready: {len(article_index)} articles")
+
+
+async def catch_up_article_index(db) -> int:
+    """
+    Index articles written since the watermark by other processes, such as
+    the generation job workers. Rows are re-read from CATCH_UP_OVERLAP before
+    the watermark, since a slow commit can land behind a newer one; articles
+    whose indexed version is at least as new as the row are skipped, so the
+    overlap only re-adds what changed. Returns how many articles were
+    (re)indexed.
+    """
+    watermark = article_index.watermark
+    stmt = select(Article).options(selectinload(Article.tags))
+    if watermark is not None:
+        stmt = stmt.where(Article.updated_at >= watermark - CATCH_UP_OVERLAP)
+    rows = await db.stream_scalars(
+        stmt.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+    )
+    added = 0
+    async for article in rows:
+        indexed = article_index.version(article.id)
+        if indexed and article.updated_at and indexed >= article.updated_at:
+            continue
+        article_index.add_article(article)
+        added += 1
+    return added
+
+
+async def refresh_article_index(interval: int = None):
+    """
+    Catch the index up every SEARCH_INDEX_REFRESH_SECONDS for the life of the
+    API process. Articles are only deleted through the API, which removes
+    them itself, so catching up on writes is enough.
+    """
+    interval = interval or settings.SEARCH_INDEX_REFRESH_SECONDS
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with AsyncSessionLocal() as db:
+                added = await catch_up_article_index(db)
+            if added:
+                logger.info(f"Search index caught up on {added} articles")
+        except Exception as e:
+            logger.error(f"Search index catch-up failed: {e}", exc_info=True)
@@ -0,0 +1,234 @@
+"""
+Background jobs for AI article generation.
+The API only records a GenerationJob row and publishes a GENERATE_ARTICLE
+event on the `content_jobs` Redis stream, then returns the job id; the LLM
+calls and article insert happen in the content job workers started by
+worker.py. Clients poll GET /content/jobs/{id} or follow its SSE feed.
+
+Workers run as a task in the background worker's event loop, which they
+share (and so the LLM gateway) with its other loops, and run up to
+CONTENT_JOB_WORKERS jobs concurrently. Messages are acknowledged once the job
+reaches a terminal state; messages left pending by a dead worker are
+reclaimed after CONTENT_JOB_CLAIM_IDLE_SECONDS and the job is retried until
+CONTENT_JOB_MAX_ATTEMPTS.
+
+The caller's LLM budget reservation (llm_quota.py) travels with the message
+and is settled by the worker once the job has run.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+import redis
+import redis.asyncio as aioredis
+from sqlalchemy.ext.asyncio import AsyncSession
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.database import AsyncSessionLocal
+from ai_content_platform.app.events.publishers import publish_event
+from ai_content_platform.app.modules.chat.services import track_token_usage
+from ai_content_platform.app.modules.content import services
+from ai_content_platform.app.modules.content.llm_quota import Reservation, llm_quota
+from ai_content_platform.app.modules.content.llm_usage import UsageMeter
+from ai_content_platform.app.modules.content.models import GenerationJob
+from ai_content_platform.app.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+JOB_STREAM = "content_jobs"
+JOB_GROUP = "content_jobs_workers"
+GENERATE_ARTICLE = "GENERATE_ARTICLE"
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+
+async def enqueue_generation(
+    db: AsyncSession,
+    user_id: Optional[int],
+    title: str,
+    content: str,
+    summary: Optional[str] = None,
+    tag_names: Optional[List[str]] = None,
+    reservation: Optional[Reservation] = None,
+) -> GenerationJob:
+    job = GenerationJob(
+        id=str(uuid.uuid4()),
+        user_id=user_id,
+        status="queued",
+        title=title,
+        content=content,
+        summary=summary,
+        tag_names=json.dumps(tag_names or []),
+        attempts=0,
+        created_at=datetime.utcnow(),
+    )
+    db.add(job)
+    await db.commit()
+    payload = {"job_id": job.id}
+    if reservation is not None:
+        payload["reservation"] = reservation.to_dict()
+    try:
+        # publish_event uses the blocking Redis client
+        await asyncio.to_thread(publish_event, JOB_STREAM, GENERATE_ARTICLE, payload)
+    except Exception as e:
+        logger.error(f"Could not enqueue generation job {job.id}: {e}", exc_info=True)
+        job.status = "failed"
+        job.error = "Could not enqueue job"
+        job.finished_at = datetime.utcnow()
+        await db.commit()
+        raise
+    logger.info(f"Queued generation job {job.id}: {title}")
+    return job
+
+
+async def get_job(db: AsyncSession, job_id: str) -> Optional[GenerationJob]:
+    return await db.get(GenerationJob, job_id)
+
+
+async def _finish(db: AsyncSession, job_id: str, **fields) -> GenerationJob:
+    job = await db.get(GenerationJob, job_id)
+    for name, value in fields.items():
+        setattr(job, name, value)
+    job.finished_at = datetime.utcnow()
+    await db.commit()
+    return job
+
+
+async def run_generation_job(
+    job_id: str,
+    session_factory=AsyncSessionLocal,
+    reservation: Optional[Reservation] = None,
+) -> Optional[GenerationJob]:
+    """
+    Generate and store the article for one job. Jobs that already finished
+    are returned untouched, so redelivered messages are harmless.
+    """
+    async with session_factory() as db:
+        job = await db.get(GenerationJob, job_id)
+        if job is None or job.status in TERMINAL_STATUSES:
+            return job
+        if job.attempts >= settings.CONTENT_JOB_MAX_ATTEMPTS:
+            logger.error(f"Generation job {job_id} gave up after {job.attempts} tries")
+            return await _finish(db, job_id, status="failed", error="Too many attempts")
+        job.status = "running"
+        job.attempts += 1
+        job.started_at = datetime.utcnow()
+        user_id = job.user_id
+        await db.commit()
+        usage = UsageMeter()
+        try:
+            article = await services.ai_generate_article(
+                db,
+                job.title,
+                job.content,
+                job.summary,
+                json.loads(job.tag_names or "[]"),
+                usage=usage,
+            )
+        except Exception as e:
+            logger.error(f"Generation job {job_id} failed: {e}", exc_info=True)
+            await db.rollback()
+            # Tokens spent before the failure are still billed
+            await track_token_usage(db, None, user_id, usage, purpose="article")
+            await llm_quota.settle(reservation, usage)
+            return await _finish(db, job_id, status="failed", error=str(e)[:1000])
+        await track_token_usage(db, None, user_id, usage, purpose="article")
+        await llm_quota.settle(reservation, usage)
+        job = await _finish(db, job_id, status="succeeded", article_id=article.id)
+    logger.info(f"Generation job {job_id} produced article {article.id}")
+    try:
+        await asyncio.to_thread(
+            publish_event,
+            "content_events",
+            "CONTENT_GENERATED",
+            {"content_id": article.id, "job_id": job_id},
+        )
+    except Exception as e:
+        logger.warning(f"Could not publish CONTENT_GENERATED for job {job_id}: {e}")
+    return job
+
+
+async def watch_job(
+    job_id: str, session_factory=AsyncSessionLocal
+) -> AsyncIterator[GenerationJob]:
+    """
+    Yield the job each time its status changes, until it finishes or
+    CONTENT_JOB_SSE_MAX_SECONDS pass. Each poll uses a short-lived session.
+    """
+    deadline = time.monotonic() + settings.CONTENT_JOB_SSE_MAX_SECONDS
+    last = None
+    while True:
+        async with session_factory() as db:
+            job = await db.get(GenerationJob, job_id)
+        if job is None:
+            return
+        if job.status != last:
+            last = job.status
+            yield job
+        if job.status in TERMINAL_STATUSES or time.monotonic() >= deadline:
+            return
+        await asyncio.sleep(settings.CONTENT_JOB_SSE_POLL_SECONDS)
+
+
+# Worker
+
+
+async def _handle(conn, message_id: str, fields: dict):
+    try:
+        payload = json.loads(fields.get("payload") or "{}")
+        await run_generation_job(
+            payload["job_id"],
+            reservation=Reservation.from_dict(payload.get("reservation")),
+        )
+    except Exception as e:
+        # The job row records the failure; the message is not retried
+        logger.error(f"Content job message {message_id} failed: {e}", exc_info=True)
+    await conn.xack(JOB_STREAM, JOB_GROUP, message_id)
+
+
+async def consume_generation_jobs(conn, workers: int):
+    consumer = f"content_worker_{uuid.uuid4()}"
+    try:
+        await conn.xgroup_create(JOB_STREAM, JOB_GROUP, id="0", mkstream=True)
+    except redis.exceptions.ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+    logger.info(f"Content job worker {consumer} started, concurrency={workers}")
+    idle_ms = settings.CONTENT_JOB_CLAIM_IDLE_SECONDS * 1000
+    tasks = set()
+    last_claim = 0.0
+    while True:
+        free = workers - len(tasks)
+        if free <= 0:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            continue
+        messages = []
+        if time.monotonic() - last_claim > settings.CONTENT_JOB_CLAIM_IDLE_SECONDS:
+            last_claim = time.monotonic()
+            claimed = await conn.xautoclaim(
+                JOB_STREAM, JOB_GROUP, consumer, min_idle_time=idle_ms, count=free
+            )
+            messages = [(mid, fields) for mid, fields in claimed[1] if fields]
+        if not messages:
+            response = await conn.xreadgroup(
+                JOB_GROUP, consumer, {JOB_STREAM: ">"}, count=free, block=1000
+            )
+            for _, events in response or []:
+                messages.extend(events)
+        for message_id, fields in messages:
+            task = asyncio.create_task(_handle(conn, message_id, fields))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+
+async def run_content_job_workers(workers: int = None):
+    """Job loop for the background worker; a task in the worker's event loop."""
+    workers = workers or settings.CONTENT_JOB_WORKERS
+    conn = aioredis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    while True:
+        try:
+            await consume_generation_jobs(conn, workers)
+        except Exception as e:
+            logger.error(f"Content job worker crashed: {e}", exc_info=True)
+            await asyncio.sleep(5)
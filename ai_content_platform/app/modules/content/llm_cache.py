@@ -0,0 +1,125 @@
+"""
+LLM response cache.
+Non-streaming completions are cached under a digest of (model, normalised
+prompt, generation config), so re-summarising unchanged article content or
+re-asking for a moderation suggestion is answered without calling the
+provider. Prompt normalisation collapses whitespace only; any other change to
+the prompt (or to the content embedded in it) is a different key.
+
+The in-process tier is an LRU with TTL; the optional Redis tier is shared by
+all workers. Redis failures are logged and treated as misses.
+"""
+
+import hashlib
+import json
+from typing import Optional
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.shared.cache import TTLCache
+from ai_content_platform.app.shared.logging import get_logger
+from ai_content_platform.app.shared.utils import get_async_redis_connection
+
+logger = get_logger(__name__)
+
+REDIS_KEY_PREFIX = "llm_cache"
+
+
+def normalize_prompt(prompt: str) -> str:
+    return " ".join(prompt.split())
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache of completion text keyed by cache_key(). Responses larger
+    than max_entry_bytes are not stored.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: int,
+        max_entry_bytes: int,
+        redis_enabled: bool = False,
+        enabled: bool = True,
+    ):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes
+        self.redis_enabled = redis_enabled
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl, name="llm_responses")
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.redis_errors = 0
+        self.oversized = 0
+
+    @staticmethod
+    def cache_key(model: str, prompt: str, config: Optional[dict] = None) -> str:
+        material = json.dumps(
+            [model, normalize_prompt(prompt), config or {}],
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        text = self._local.get(key)
+        if text is not None or not self.redis_enabled:
+            return text
+        try:
+            text = await get_async_redis_connection().get(f"{REDIS_KEY_PREFIX}:{key}")
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"LLM cache Redis lookup failed: {e}")
+            return None
+        if text is None:
+            self.redis_misses += 1
+            return None
+        self.redis_hits += 1
+        self._local.set(key, text)
+        return text
+
+    async def set(self, key: str, text: str, ttl: Optional[int] = None) -> None:
+        if len(text.encode()) > self.max_entry_bytes:
+            self.oversized += 1
+            return
+        ttl = self.ttl if ttl is None else ttl
+        self._local.set(key, text, ttl)
+        if not self.redis_enabled or ttl <= 0:
+            return
+        try:
+            await get_async_redis_connection().set(
+                f"{REDIS_KEY_PREFIX}:{key}", text, ex=ttl
+            )
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"LLM cache Redis write failed: {e}")
+
+    def clear(self) -> None:
+        self._local.clear()
+
+    def __len__(self) -> int:
+        return len(self._local)
+
+    def stats(self) -> dict:
+        stats = self._local.stats()
+        stats.update(
+            {
+                "enabled": self.enabled,
+                "max_entry_bytes": self.max_entry_bytes,
+                "oversized": self.oversized,
+                "redis_enabled": self.redis_enabled,
+                "redis_hits": self.redis_hits,
+                "redis_misses": self.redis_misses,
+                "redis_errors": self.redis_errors,
+            }
+        )
+        return stats
+
+
+llm_cache = LLMResponseCache(
+    maxsize=settings.LLM_CACHE_MAXSIZE,
+    ttl=settings.LLM_CACHE_TTL_SECONDS,
+    max_entry_bytes=settings.LLM_CACHE_MAX_ENTRY_BYTES,
+    redis_enabled=settings.LLM_CACHE_REDIS_ENABLED,
+    enabled=settings.LLM_CACHE_ENABLED,
+)
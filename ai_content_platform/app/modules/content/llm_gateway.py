@@ -0,0 +1,294 @@
+"""
+Process-wide gateway for LLM calls.
+Every module talks to the model through `llm_gateway` instead of building its
+own GeminiService, so the process holds one pooled httpx client (bounded
+connections, keep-alive) and one set of limits per model:
+
+- a semaphore capping concurrent upstream calls (a stream holds its slot
+  until it finishes or is cancelled);
+- a token bucket capping the request rate below the provider's quota, so
+  bursts queue here instead of coming back as 429s;
+- single-flight for non-streaming calls: identical (model, prompt, config)
+  requests already in flight share one upstream call and its result;
+- the LLM response cache (llm_cache.py) in front of non-streaming calls.
+
+Pass a UsageMeter (llm_usage.py) as `usage` to learn the tokens a call spent.
+"""
+
+import asyncio
+import time
+from typing import AsyncIterator, Dict, List, Optional
+import httpx
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.modules.content.gemini_service import (
+    DEFAULT_EMBEDDING_MODEL,
+    DEFAULT_MODEL,
+    GeminiService,
+)
+from ai_content_platform.app.modules.content.llm_cache import (
+    LLMResponseCache,
+    llm_cache,
+)
+from ai_content_platform.app.modules.content.llm_usage import UsageMeter
+from ai_content_platform.app.shared import metrics
+from ai_content_platform.app.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class TokenBucket:
+    """
+    Allows `rate` acquisitions per second on average and bursts of up to
+    `capacity`. A non-positive rate disables the limit.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        # Waiters queue on the lock, so tokens are handed out in FIFO order
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class _ModelLimits:
+    __slots__ = ("semaphore", "bucket", "active")
+
+    def __init__(self, concurrency: int, rate: float, burst: int):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.bucket = TokenBucket(rate, burst)
+        self.active = 0
+
+
+class LLMGateway:
+    """
+    Owns the shared HTTP pool, per-model limits and in-flight call table.
+    asyncio primitives and the httpx pool are bound to the running event
+    loop, so they are (re)built lazily for whichever loop is current.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        max_connections: int = 20,
+        max_concurrency: int = 8,
+        requests_per_minute: float = 0,
+        burst: int = 1,
+        timeout: float = 60.0,
+        cache: Optional[LLMResponseCache] = None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.rate = requests_per_minute / 60
+        self.burst = burst
+        self.timeout = timeout
+        self.cache = cache
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._http: Optional[httpx.AsyncClient] = None
+        self._service: Optional[GeminiService] = None
+        self._limits: Dict[str, _ModelLimits] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.call_latency = metrics.latency("llm_call_seconds")
+        self.queue_wait = metrics.latency("llm_queue_wait_seconds")
+        self.coalesced = metrics.counter("llm_coalesced_total")
+
+    def _bind(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # A previous loop's client cannot be closed from here; drop it
+        self._loop = loop
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+            timeout=self.timeout,
+        )
+        self._service = GeminiService(self.api_key, self.base_url, self._http)
+        self._limits = {}
+        self._inflight = {}
+        logger.info(
+            f"LLM gateway started: {self.max_connections} connections, "
+            f"{self.max_concurrency} concurrent calls per model"
+        )
+
+    @property
+    def service(self) -> GeminiService:
+        self._bind()
+        return self._service
+
+    def _model_limits(self, model: str) -> _ModelLimits:
+        limits = self._limits.get(model)
+        if limits is None:
+            limits = self._limits[model] = _ModelLimits(
+                self.max_concurrency, self.rate, self.burst
+            )
+        return limits
+
+    async def _acquire(self, model: str) -> _ModelLimits:
+        limits = self._model_limits(model)
+        queued = time.perf_counter()
+        await limits.semaphore.acquire()
+        try:
+            await limits.bucket.acquire()
+        except BaseException:
+            limits.semaphore.release()
+            raise
+        limits.active += 1
+        self.queue_wait.observe(time.perf_counter() - queued)
+        return limits
+
+    def _release(self, limits: _ModelLimits):
+        limits.active -= 1
+        limits.semaphore.release()
+
+    async def _call(
+        self,
+        prompt: str,
+        model: str,
+        config: Optional[dict],
+        cache_key: Optional[str],
+        cache_ttl: Optional[int],
+        usage: Optional[UsageMeter],
+    ) -> str:
+        limits = await self._acquire(model)
+        started = time.perf_counter()
+        try:
+            text = await self._service.generate_text(
+                prompt, model=model, config=config, usage=usage
+            )
+        finally:
+            self.call_latency.observe(time.perf_counter() - started)
+            self._release(limits)
+        if cache_key is not None:
+            await self.cache.set(cache_key, text, cache_ttl)
+        return text
+
+    async def generate_text(
+        self,
+        prompt: str,
+        model: str = DEFAULT_MODEL,
+        config: Optional[dict] = None,
+        cache: bool = True,
+        cache_ttl: Optional[int] = None,
+        usage: Optional[UsageMeter] = None,
+    ) -> str:
+        """
+        Non-streaming completion, answered from the response cache when
+        possible (pass cache=False to always call the provider). Concurrent
+        identical requests share one upstream call; a caller that is
+        cancelled does not cancel the others. Only the caller that started
+        the upstream call has its usage recorded.
+        """
+        self._bind()
+        key = LLMResponseCache.cache_key(model, prompt, config)
+        use_cache = cache and self.cache is not None and self.cache.enabled
+        if use_cache:
+            text = await self.cache.get(key)
+            if text is not None:
+                return text
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(
+                self._call(
+                    prompt,
+                    model,
+                    config,
+                    key if use_cache else None,
+                    cache_ttl,
+                    usage,
+                )
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            self.coalesced.inc()
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved in case every waiter went away
+            task.exception()
+
+    async def generate_streaming_text(
+        self,
+        prompt: str,
+        model: str = DEFAULT_MODEL,
+        usage: Optional[UsageMeter] = None,
+    ) -> AsyncIterator[str]:
+        """Streaming completion; holds a concurrency slot until it ends."""
+        self._bind()
+        limits = await self._acquire(model)
+        started = time.perf_counter()
+        try:
+            async for chunk in self._service.generate_streaming_text(
+                prompt, model=model, usage=usage
+            ):
+                yield chunk
+        finally:
+            self.call_latency.observe(time.perf_counter() - started)
+            self._release(limits)
+
+    async def embed_texts(
+        self,
+        texts: List[str],
+        model: str = DEFAULT_EMBEDDING_MODEL,
+        dimensions: Optional[int] = None,
+    ) -> List[List[float]]:
+        """Embedding call under the same per-model limits as completions."""
+        self._bind()
+        limits = await self._acquire(model)
+        started = time.perf_counter()
+        try:
+            return await self._service.embed_texts(texts, model, dimensions)
+        finally:
+            self.call_latency.observe(time.perf_counter() - started)
+            self._release(limits)
+
+    def stats(self) -> dict:
+        return {
+            "max_connections": self.max_connections,
+            "max_concurrency_per_model": self.max_concurrency,
+            "requests_per_minute": round(self.rate * 60, 3),
+            "in_flight": {model: l.active for model, l in self._limits.items()},
+            "coalescing": len(self._inflight),
+        }
+
+    async def aclose(self):
+        if self._http is not None and self._loop is asyncio.get_running_loop():
+            await self._http.aclose()
+        self._loop = self._http = self._service = None
+
+
+llm_gateway = LLMGateway(
+    api_key=settings.GEMINI_API_KEY,
+    max_connections=settings.LLM_MAX_CONNECTIONS,
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+    burst=settings.LLM_RATE_LIMIT_BURST,
+    timeout=settings.LLM_TIMEOUT_SECONDS,
+    cache=llm_cache,
+)
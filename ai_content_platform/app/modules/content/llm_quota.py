@@ -0,0 +1,287 @@
+"""
+Per-user and per-role LLM budgets.
+Each user has a token budget and a request budget over a sliding window of
+LLM_QUOTA_WINDOW_SECONDS, taken from the most generous of their roles in
+LLM_QUOTA_ROLE_BUDGETS (LLM_QUOTA_USER_* otherwise). Roles listed in
+LLM_QUOTA_ROLE_POOLS also share one budget across all their users, so one
+group cannot starve the others.
+
+Before an LLM operation starts, reserve() books an estimate (the prompt's
+token count plus LLM_QUOTA_RESERVE_TOKENS for context and output) against
+every budget that applies, or raises 429 with Retry-After set to when enough
+of the window will have expired. settle() replaces the estimate with the
+tokens the operation actually spent. Both are single Lua scripts, so
+concurrent requests from any worker cannot overshoot a budget.
+
+Windows are kept in Redis per budget: a sorted set of reservation ids scored
+by start time and a hash of their token amounts plus a running total.
+Redis failures are logged and the request is allowed.
+"""
+
+import math
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from fastapi import HTTPException, status
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.modules.content.llm_usage import UsageMeter, count_tokens
+from ai_content_platform.app.shared import metrics
+from ai_content_platform.app.shared.logging import get_logger
+from ai_content_platform.app.shared.utils import get_async_redis_connection
+
+logger = get_logger(__name__)
+
+REDIS_KEY_PREFIX = "llm_quota"
+
+# KEYS: (window sorted set, amounts hash) per budget
+# ARGV: now_ms, window_ms, reservation id, tokens, then (token limit,
+# request limit) per budget; a limit of 0 is unlimited.
+# Returns 0 when booked, else the milliseconds until it would fit.
+RESERVE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local id = ARGV[3]
+local tokens = tonumber(ARGV[4])
+local wait = 0
+for i = 1, #KEYS / 2 do
+  local times, amounts = KEYS[2 * i - 1], KEYS[2 * i]
+  local token_limit = tonumber(ARGV[3 + 2 * i])
+  local request_limit = tonumber(ARGV[4 + 2 * i])
+  local expired = redis.call('ZRANGEBYSCORE', times, '-inf', now - window)
+  if #expired > 0 then
+    local freed = 0
+    for _, old in ipairs(expired) do
+      freed = freed + tonumber(redis.call('HGET', amounts, old) or '0')
+      redis.call('HDEL', amounts, old)
+    end
+    redis.call('ZREMRANGEBYSCORE', times, '-inf', now - window)
+    redis.call('HINCRBY', amounts, 'total', -freed)
+  end
+  local used = tonumber(redis.call('HGET', amounts, 'total') or '0')
+  if request_limit > 0 and redis.call('ZCARD', times) >= request_limit then
+    local oldest = redis.call('ZRANGE', times, 0, 0, 'WITHSCORES')
+    wait = math.max(wait, tonumber(oldest[2]) + window - now)
+  end
+  if token_limit > 0 and used + tokens > token_limit then
+    local fits_at = now + window
+    if tokens <= token_limit then
+      local entries = redis.call('ZRANGE', times, 0, -1, 'WITHSCORES')
+      for j = 1, #entries, 2 do
+        used = used - tonumber(redis.call('HGET', amounts, entries[j]) or '0')
+        if used + tokens <= token_limit then
+          fits_at = tonumber(entries[j + 1]) + window
+          break
+        end
+      end
+    end
+    wait = math.max(wait, fits_at - now)
+  end
+end
+if wait > 0 then
+  return wait
+end
+for i = 1, #KEYS / 2 do
+  local times, amounts = KEYS[2 * i - 1], KEYS[2 * i]
+  redis.call('ZADD', times, now, id)
+  redis.call('HSET', amounts, id, tokens)
+  redis.call('HINCRBY', amounts, 'total', tokens)
+  redis.call('PEXPIRE', times, window)
+  redis.call('PEXPIRE', amounts, window)
+end
+return 0
+"""
+
+# KEYS: as above; ARGV: reservation id, tokens actually spent
+SETTLE_SCRIPT = """
+for i = 1, #KEYS / 2 do
+  local amounts = KEYS[2 * i]
+  local booked = redis.call('HGET', amounts, ARGV[1])
+  if booked then
+    redis.call('HSET', amounts, ARGV[1], ARGV[2])
+    redis.call('HINCRBY', amounts, 'total', tonumber(ARGV[2]) - tonumber(booked))
+  end
+end
+return 0
+"""
+
+
+class Budget(NamedTuple):
+    tokens: int
+    requests: int
+
+    @property
+    def unlimited(self) -> bool:
+        return self.tokens <= 0 and self.requests <= 0
+
+
+def parse_budgets(spec: str) -> Dict[str, Budget]:
+    """Parse "role=tokens:requests,..." (0 means unlimited)."""
+    budgets = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        role, _, limits = item.partition("=")
+        tokens, _, requests = limits.partition(":")
+        budgets[role.strip()] = Budget(int(tokens or 0), int(requests or 0))
+    return budgets
+
+
+def _more_generous(a: Budget, b: Budget) -> Budget:
+    def pick(x, y):
+        return 0 if x <= 0 or y <= 0 else max(x, y)
+
+    return Budget(pick(a.tokens, b.tokens), pick(a.requests, b.requests))
+
+
+@dataclass
+class Reservation:
+    """A booked estimate; serialisable so a job worker can settle it."""
+
+    id: str
+    keys: List[str]
+    tokens: int
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> Optional["Reservation"]:
+        return cls(**data) if data else None
+
+
+class LLMQuota:
+    def __init__(
+        self,
+        enabled: bool,
+        window_seconds: int,
+        user_budget: Budget,
+        role_budgets: Dict[str, Budget],
+        role_pools: Dict[str, Budget],
+        reserve_tokens: int,
+    ):
+        self.enabled = enabled
+        self.window_seconds = window_seconds
+        self.user_budget = user_budget
+        self.role_budgets = role_budgets
+        self.role_pools = role_pools
+        self.reserve_tokens = reserve_tokens
+        self.errors = 0
+        self.rejected = metrics.counter("llm_quota_rejected_total")
+        self._client = None
+        self._scripts = {}
+
+    def _script(self, source: str):
+        """The script registered on the shared client; runs by EVALSHA."""
+        client = get_async_redis_connection()
+        if client is not self._client:
+            self._client, self._scripts = client, {}
+        script = self._scripts.get(source)
+        if script is None:
+            script = self._scripts[source] = client.register_script(source)
+        return script
+
+    def budgets_for(self, principal) -> List[Tuple[str, Budget]]:
+        """(subject, budget) pairs a request by principal is charged to."""
+        roles = set(getattr(principal, "roles", None) or ())
+        if getattr(principal, "role", None):
+            roles.add(principal.role)
+        per_user = None
+        for role in roles:
+            if role in self.role_budgets:
+                budget = self.role_budgets[role]
+                per_user = (
+                    budget if per_user is None else _more_generous(per_user, budget)
+                )
+        per_user = per_user or self.user_budget
+        subjects = [] if per_user.unlimited else [(f"user:{principal.id}", per_user)]
+        for role in sorted(roles):
+            pool = self.role_pools.get(role)
+            if pool and not pool.unlimited:
+                subjects.append((f"role:{role}", pool))
+        return subjects
+
+    async def reserve(self, principal, prompt: str = "") -> Optional[Reservation]:
+        """
+        Book the estimated cost of one operation or raise 429. Returns None
+        when no budget applies or quotas are off.
+        """
+        if not self.enabled or principal is None:
+            return None
+        subjects = self.budgets_for(principal)
+        if not subjects:
+            return None
+        tokens = count_tokens(prompt) + self.reserve_tokens
+        reservation = Reservation(str(uuid.uuid4()), [s for s, _ in subjects], tokens)
+        keys, limits = [], []
+        for subject, budget in subjects:
+            keys += [
+                f"{REDIS_KEY_PREFIX}:{subject}",
+                f"{REDIS_KEY_PREFIX}:{subject}:tokens",
+            ]
+            limits += [budget.tokens, budget.requests]
+        try:
+            wait_ms = await self._script(RESERVE_SCRIPT)(
+                keys=keys,
+                args=[
+                    int(time.time() * 1000),
+                    self.window_seconds * 1000,
+                    reservation.id,
+                    tokens,
+                    *limits,
+                ],
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"LLM quota check failed, allowing request: {e}")
+            return None
+        if wait_ms:
+            self.rejected.inc()
+            retry_after = max(1, math.ceil(int(wait_ms) / 1000))
+            logger.info(
+                f"LLM budget exceeded for user {principal.id}, retry in {retry_after}s"
+            )
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="LLM usage budget exceeded, retry later",
+                headers={"Retry-After": str(retry_after)},
+            )
+        return reservation
+
+    async def settle(
+        self, reservation: Optional[Reservation], usage: UsageMeter
+    ) -> None:
+        """Replace the booked estimate with the tokens actually spent."""
+        if reservation is None:
+            return
+        keys = []
+        for subject in reservation.keys:
+            keys += [
+                f"{REDIS_KEY_PREFIX}:{subject}",
+                f"{REDIS_KEY_PREFIX}:{subject}:tokens",
+            ]
+        try:
+            await self._script(SETTLE_SCRIPT)(
+                keys=keys, args=[reservation.id, usage.total_tokens]
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Could not settle LLM reservation {reservation.id}: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "window_seconds": self.window_seconds,
+            "rejected": self.rejected.value,
+            "errors": self.errors,
+        }
+
+
+llm_quota = LLMQuota(
+    enabled=settings.LLM_QUOTA_ENABLED,
+    window_seconds=settings.LLM_QUOTA_WINDOW_SECONDS,
+    user_budget=Budget(
+        settings.LLM_QUOTA_USER_TOKENS, settings.LLM_QUOTA_USER_REQUESTS
+    ),
+    role_budgets=parse_budgets(settings.LLM_QUOTA_ROLE_BUDGETS),
+    role_pools=parse_budgets(settings.LLM_QUOTA_ROLE_POOLS),
+    reserve_tokens=settings.LLM_QUOTA_RESERVE_TOKENS,
+)
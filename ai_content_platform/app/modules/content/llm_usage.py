@@ -0,0 +1,96 @@
+"""
+Token accounting for LLM calls.
+Callers that need to know what a call cost pass a UsageMeter down through the
+gateway (usage=...). GeminiService records every upstream call on it, using
+the provider's usage_metadata when the response carries it (for a stream,
+from the last chunk received) and a local estimate from count_tokens
+otherwise. Answers served from the LLM cache or shared with an identical
+in-flight call record nothing, since no tokens were spent on them.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.shared import metrics
+
+# Average characters per token for English text with Gemini's tokenizer
+CHARS_PER_TOKEN = 4
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+_input_tokens = metrics.counter("llm_input_tokens_total")
+_output_tokens = metrics.counter("llm_output_tokens_total")
+_estimated_calls = metrics.counter("llm_estimated_usage_total")
+
+
+@lru_cache(maxsize=settings.TOKEN_COUNT_CACHE_SIZE)
+def count_tokens(text: str) -> int:
+    """
+    Local estimate of the model's token count for text: one token per
+    punctuation mark and per CHARS_PER_TOKEN characters of each word.
+    Memoised, as the same prompt prefixes and messages are counted repeatedly.
+    """
+    return sum(-(-len(piece) // CHARS_PER_TOKEN) for piece in _PIECES.findall(text))
+
+
+@dataclass
+class UsageMeter:
+    """Tokens spent by one or more LLM calls."""
+
+    input_tokens: int = 0
+    output_tokens: int = 0
+    calls: int = 0
+    estimated: bool = False
+    model: Optional[str] = None
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def record(
+        self,
+        prompt: str,
+        completion: str,
+        usage_metadata=None,
+        model: Optional[str] = None,
+    ):
+        """
+        Add one upstream call. Thinking tokens are billed as output, so they
+        count towards output_tokens.
+        """
+        prompt_tokens = getattr(usage_metadata, "prompt_token_count", None)
+        output_tokens = getattr(usage_metadata, "candidates_token_count", None)
+        if prompt_tokens is None or output_tokens is None:
+            self.estimated = True
+            _estimated_calls.inc()
+        if prompt_tokens is None:
+            prompt_tokens = count_tokens(prompt)
+        if output_tokens is None:
+            output_tokens = count_tokens(completion) if completion else 0
+        output_tokens += getattr(usage_metadata, "thoughts_token_count", None) or 0
+        self.input_tokens += prompt_tokens
+        self.output_tokens += output_tokens
+        self.calls += 1
+        self.model = model or self.model
+        _input_tokens.inc(prompt_tokens)
+        _output_tokens.inc(output_tokens)
+
+    def split_input(self, prompt: Optional[str]) -> tuple:
+        """
+        (prompt_tokens, context_tokens): the part of the input spent on the
+        caller's own prompt and the part spent on context added around it.
+        Without a prompt the whole input counts as prompt.
+        """
+        if prompt is None:
+            return self.input_tokens, 0
+        prompt_tokens = min(count_tokens(prompt), self.input_tokens)
+        return prompt_tokens, self.input_tokens - prompt_tokens
+
+    def merge(self, other: "UsageMeter"):
+        """Add the calls recorded on another meter (metrics already counted)."""
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.calls += other.calls
+        self.estimated = self.estimated or other.estimated
+        self.model = other.model or self.model
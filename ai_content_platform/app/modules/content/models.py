@@ -7,6 +7,7 @@ from sqlalchemy import (
     Table,
     DateTime,
     Boolean,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -33,6 +34,9 @@ class Article(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     tags = relationship("Tag", secondary=article_tags, back_populates="articles")
 
+    # Mirrors migration 0005_keyset_pagination_indexes
+    __table_args__ = (Index("ix_articles_created_at_id", "created_at", "id"),)
+
 
 class Tag(Base):
     __tablename__ = "tags"
@@ -44,3 +48,38 @@ class Tag(Base):
             "name", name="uq_tag_name_case_insensitive", sqlite_on_conflict="IGNORE"
         ),
     )
+
+
+class BatchCheckpoint(Base):
+    """Resume position (last processed id) of a named batch job."""
+
+    __tablename__ = "batch_checkpoints"
+    name = Column(String, primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class GenerationJob(Base):
+    """
+    Queued AI article generation. Rows are written by the API and advanced
+    by the content job workers (jobs.py); status moves from "queued" to
+    "running" and ends in one of jobs.TERMINAL_STATUSES.
+    """
+
+    __tablename__ = "generation_jobs"
+    id = Column(String(36), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    status = Column(String, nullable=False, default="queued")
+    title = Column(String, nullable=False)
+    content = Column(Text, nullable=False)
+    summary = Column(Text, nullable=True)
+    tag_names = Column(Text, nullable=True)  # JSON list
+    article_id = Column(Integer, ForeignKey("articles.id"), nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    # Mirrors migration 0007_generation_jobs
+    __table_args__ = (Index("ix_generation_jobs_user_id", "user_id"),)
@@ -1,15 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+import asyncio
+import json
+from typing import List, Optional
 from ai_content_platform.app.shared.dependencies import get_db, require_permission
 from ai_content_platform.app.modules.content.schemas import (
     ArticleCreate,
     ArticleUpdate,
     ArticleOut,
+    ArticleSearchHit,
+    GenerationJobOut,
     TagCreate,
     TagOut,
 )
-from ai_content_platform.app.modules.content import services
+from ai_content_platform.app.modules.content import jobs, services
+from ai_content_platform.app.modules.content.llm_quota import llm_quota
+from ai_content_platform.app.modules.content.llm_usage import UsageMeter
+from ai_content_platform.app.modules.chat.services import track_token_usage
+from ai_content_platform.app.shared.pagination import PageParams, set_next_cursor
 from ai_content_platform.app.shared.logging import get_logger
 
 logger = get_logger(__name__)
@@ -102,10 +111,18 @@ async def delete_article(article_id: int, db: AsyncSession = Depends(get_db)):
     response_model=List[ArticleOut],
     dependencies=[Depends(require_permission("view_content"))],
 )
-async def list_articles(db: AsyncSession = Depends(get_db)):
-    logger.info("API: Listing all articles")
+async def list_articles(
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+):
+    logger.info("API: Listing articles")
     try:
-        return await services.list_articles(db)
+        result = await services.list_articles(db, page.cursor, page.limit)
+        set_next_cursor(response, result)
+        return result.items
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"API: Error listing articles: {e}", exc_info=True)
         raise HTTPException(500, "Failed to list articles")
@@ -130,10 +147,18 @@ async def create_tag(tag: TagCreate, db: AsyncSession = Depends(get_db)):
     response_model=List[TagOut],
     dependencies=[Depends(require_permission("view_content"))],
 )
-async def list_tags(db: AsyncSession = Depends(get_db)):
-    logger.info("API: Listing all tags")
+async def list_tags(
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+):
+    logger.info("API: Listing tags")
     try:
-        return await services.list_tags(db)
+        result = await services.list_tags(db, page.cursor, page.limit)
+        set_next_cursor(response, result)
+        return result.items
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"API: Error listing tags: {e}", exc_info=True)
         raise HTTPException(500, "Failed to list tags")
@@ -141,13 +166,23 @@ async def list_tags(db: AsyncSession = Depends(get_db)):
 
 @content_router.get(
     "/articles/search/",
-    response_model=List[ArticleOut],
+    response_model=List[ArticleSearchHit],
     dependencies=[Depends(require_permission("view_content"))],
 )
-async def search_articles(q: str, db: AsyncSession = Depends(get_db)):
+async def search_articles(
+    q: str,
+    response: Response,
+    tags: Optional[List[str]] = Query(None, description="Require all these tags"),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+):
     logger.info(f"API: Searching articles with query: {q}")
     try:
-        return await services.search_articles(db, q)
+        result = await services.search_articles(db, q, tags, page.cursor, page.limit)
+        set_next_cursor(response, result)
+        return [ArticleSearchHit.from_hit(hit) for hit in result.items]
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(
             f"API: Error searching articles with query '{q}': {e}", exc_info=True
@@ -155,35 +190,158 @@ async def search_articles(q: str, db: AsyncSession = Depends(get_db)):
         raise HTTPException(500, "Failed to search articles")
 
 
-# AI-powered content generation (permission-based)
+# AI-powered content generation (permission-based). Generation runs in the
+# content job workers; this returns the queued job.
 @content_router.post(
     "/articles/generate/",
-    response_model=ArticleOut,
-    dependencies=[Depends(require_permission("generate_content"))],
+    response_model=GenerationJobOut,
+    status_code=202,
 )
 async def generate_article_ai(
-    article: ArticleCreate, db: AsyncSession = Depends(get_db)
+    article: ArticleCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(require_permission("generate_content")),
 ):
     logger.info(f"API: AI generate article for title: {article.title}")
+    reservation = await llm_quota.reserve(
+        current_user, f"{article.title} {article.content}"
+    )
     try:
-        obj = await services.ai_generate_article(
-            db, article.title, article.content, article.summary, article.tag_names
+        return await jobs.enqueue_generation(
+            db,
+            current_user.id,
+            article.title,
+            article.content,
+            article.summary,
+            article.tag_names,
+            reservation,
         )
-        return obj
     except Exception as e:
-        logger.error(f"API: Error in AI generate article: {e}", exc_info=True)
-        raise HTTPException(500, "Failed to generate article with AI")
+        logger.error(f"API: Error queueing AI generate article: {e}", exc_info=True)
+        await llm_quota.settle(reservation, UsageMeter())
+        raise HTTPException(503, "Failed to queue article generation")
+
+
+@content_router.post("/articles/generate/stream")
+async def generate_article_ai_stream(
+    article: ArticleCreate,
+    current_user=Depends(require_permission("generate_content")),
+):
+    """
+    Server-sent events: `content` events carry article text as it is
+    generated, then `summary`, then `article` with the stored article (or
+    `error`). No article is stored if the client disconnects first, but the
+    tokens spent so far are always recorded.
+    """
+    logger.info(f"API: AI stream-generate article for title: {article.title}")
+    reservation = await llm_quota.reserve(
+        current_user, f"{article.title} {article.content}"
+    )
+    usage = UsageMeter()
+
+    async def record_usage():
+        try:
+            # A fresh session: the stream may have ended mid-write
+            async for db in get_db():
+                await track_token_usage(
+                    db, None, current_user.id, usage, purpose="article"
+                )
+        except Exception as e:
+            logger.error(f"API: Could not record article usage: {e}", exc_info=True)
+        finally:
+            await llm_quota.settle(reservation, usage)
+
+    async def events():
+        parts = {"content": [], "summary": []}
+        try:
+            async for kind, text in services.stream_article_generation(
+                article.title, article.content, usage=usage
+            ):
+                parts[kind].append(text)
+                yield f"event: {kind}\ndata: {json.dumps({'text': text})}\n\n"
+            # The request session is not held while the model streams
+            async for db in get_db():
+                obj = await services.create_article(
+                    db,
+                    article.title,
+                    "".join(parts["content"]).strip(),
+                    "".join(parts["summary"]),
+                    article.tag_names,
+                    flagged=True,
+                )
+                data = ArticleOut.model_validate(obj).model_dump_json()
+                yield f"event: article\ndata: {data}\n\n"
+        except Exception as e:
+            logger.error(
+                f"API: Error in AI stream-generate article: {e}", exc_info=True
+            )
+            detail = json.dumps({"detail": "Failed to generate article with AI"})
+            yield f"event: error\ndata: {detail}\n\n"
+        finally:
+            # Shielded: a client disconnect cancels the stream, but the
+            # tokens were spent and the reservation must be settled
+            await asyncio.shield(record_usage())
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _get_own_job(db: AsyncSession, job_id: str, current_user):
+    job = await jobs.get_job(db, job_id)
+    if not job or (
+        job.user_id != current_user.id and not current_user.has_role("admin")
+    ):
+        raise HTTPException(404, "Job not found")
+    return job
+
+
+@content_router.get("/jobs/{job_id}", response_model=GenerationJobOut)
+async def get_generation_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(require_permission("generate_content")),
+):
+    return await _get_own_job(db, job_id, current_user)
+
+
+@content_router.get("/jobs/{job_id}/events")
+async def generation_job_events(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(require_permission("generate_content")),
+):
+    """Server-sent events: one `status` event per job status change."""
+    await _get_own_job(db, job_id, current_user)
+    # Release the request session; watch_job polls with short-lived ones
+    await db.close()
+
+    async def events():
+        async for job in jobs.watch_job(job_id):
+            data = GenerationJobOut.model_validate(job).model_dump_json()
+            yield f"event: status\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # AI-powered summarization (permission-based)
-@content_router.post(
-    "/articles/{article_id}/summarize/",
-    dependencies=[Depends(require_permission("summarize_content"))],
-)
-async def summarize_article_ai(article_id: int, db: AsyncSession = Depends(get_db)):
+@content_router.post("/articles/{article_id}/summarize/")
+async def summarize_article_ai(
+    article_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(require_permission("summarize_content")),
+):
     logger.info(f"API: AI summarize article for article_id: {article_id}")
     try:
-        obj = await services.ai_summarize_article(db, article_id)
+        usage = UsageMeter()
+        obj = await services.ai_summarize_article(db, article_id, usage)
+        await track_token_usage(db, None, current_user.id, usage, purpose="summary")
         if not obj:
             logger.warning(f"API: Article not found for summarization: {article_id}")
             raise HTTPException(404, "Article not found")
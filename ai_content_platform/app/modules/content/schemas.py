@@ -42,3 +42,29 @@ class ArticleOut(ArticleBase):
     tags: List[TagOut] = []
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ArticleSearchHit(ArticleOut):
+    rank: float
+    # Content excerpt with matches wrapped in <mark></mark>
+    snippet: Optional[str] = None
+
+    @classmethod
+    def from_hit(cls, hit):
+        article = ArticleOut.model_validate(hit.article).model_dump()
+        return cls(**article, rank=hit.rank, snippet=hit.snippet)
+
+
+class GenerationJobOut(BaseModel):
+    id: str
+    # queued, running, succeeded or failed
+    status: str
+    title: str
+    article_id: Optional[int] = None
+    error: Optional[str] = None
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,355 @@
+"""
+Full-text article search.
+Postgres ranks a weighted, generated tsvector column (title > summary > content)
+through a GIN index and falls back to pg_trgm similarity on the title when a
+query has no lexical match. SQLite uses an FTS5 external-content table with
+bm25 ranking, so tests and small deployments run the same code path.
+SEARCH_BACKEND=memory scores with the in-process inverted index instead
+(content/inverted_index.py). The backend is picked from SEARCH_BACKEND, or from
+the session's dialect on "auto".
+
+Pages are keyset-paginated over (rank, id): the ranking query returns only
+ids and scores, and articles, tags and snippets are loaded for that page alone.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import (
+    Float,
+    Integer,
+    bindparam,
+    column,
+    func,
+    literal,
+    literal_column,
+    select,
+    table,
+    text,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.modules.content.models import Article, Tag, article_tags
+from ai_content_platform.app.modules.content.inverted_index import article_index
+from ai_content_platform.app.shared.pagination import (
+    Page,
+    decode_cursor,
+    keyset_page,
+    make_page,
+)
+from ai_content_platform.app.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+SNIPPET_START, SNIPPET_STOP = "<mark>", "</mark>"
+# bm25 column weights for (title, summary, content), matching the A/B/C
+# setweight classes of the Postgres vector
+SQLITE_BM25_WEIGHTS = (10.0, 4.0, 1.0)
+
+# Schema objects behind the search backends. Migration 0006 creates the same
+# objects; benchmarks and ad-hoc databases built with create_all use these.
+SEARCH_DDL: Dict[str, List[str]] = {
+    "postgresql": [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "ALTER TABLE articles ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(summary, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(content, '')), 'C')"
+        ") STORED",
+        "CREATE INDEX IF NOT EXISTS ix_articles_search_vector "
+        "ON articles USING gin (search_vector)",
+        "CREATE INDEX IF NOT EXISTS ix_articles_title_trgm "
+        "ON articles USING gin (title gin_trgm_ops)",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+        "title, summary, content, content='articles', content_rowid='id', "
+        "tokenize='porter unicode61')",
+        "CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN "
+        "INSERT INTO articles_fts(rowid, title, summary, content) "
+        "VALUES (new.id, new.title, new.summary, new.content); END",
+        "CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN "
+        "INSERT INTO articles_fts(articles_fts, rowid, title, summary, content) "
+        "VALUES ('delete', old.id, old.title, old.summary, old.content); END",
+        "CREATE TRIGGER IF NOT EXISTS articles_fts_au AFTER UPDATE ON articles BEGIN "
+        "INSERT INTO articles_fts(articles_fts, rowid, title, summary, content) "
+        "VALUES ('delete', old.id, old.title, old.summary, old.content); "
+        "INSERT INTO articles_fts(rowid, title, summary, content) "
+        "VALUES (new.id, new.title, new.summary, new.content); END",
+        "INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')",
+    ],
+}
+
+
+@dataclass
+class SearchHit:
+    article: Article
+    rank: float
+    snippet: Optional[str] = None
+
+    @property
+    def id(self) -> int:
+        return self.article.id
+
+
+def _terms(query: str) -> List[str]:
+    return re.findall(r"\w+", query.lower())
+
+
+def _with_tags(stmt, id_column, tags: Optional[Sequence[str]]):
+    """Keep only articles carrying every tag in `tags`."""
+    for name in {t.strip().lower() for t in tags or () if t.strip()}:
+        tagged = (
+            select(article_tags.c.article_id)
+            .join(Tag, Tag.id == article_tags.c.tag_id)
+            .where(Tag.name == name)
+        )
+        stmt = stmt.where(id_column.in_(tagged))
+    return stmt
+
+
+async def _load_articles(db: AsyncSession, ids: List[int]) -> Dict[int, Article]:
+    result = await db.execute(
+        select(Article).options(selectinload(Article.tags)).where(Article.id.in_(ids))
+    )
+    return {a.id: a for a in result.scalars().all()}
+
+
+class SqlSearch:
+    """
+    Ranking done by the database. Subclasses provide ranked()/fuzzy() selects
+    of (id, rank) and snippets() for a page of ids.
+    """
+
+    id_column = Article.id
+
+    async def _hits(
+        self, db: AsyncSession, query: str, rows: Sequence, fuzzy: bool = False
+    ) -> List[SearchHit]:
+        ids = [row.id for row in rows]
+        if not ids:
+            return []
+        articles = await _load_articles(db, ids)
+        snippets = await self.snippets(db, query, ids, fuzzy)
+        return [
+            SearchHit(articles[row.id], row.rank, snippets.get(row.id))
+            for row in rows
+            if row.id in articles
+        ]
+
+    async def search(
+        self,
+        db: AsyncSession,
+        query: str,
+        tags: Optional[Sequence[str]],
+        cursor: Optional[str],
+        limit: int,
+    ) -> Page:
+        ranked = _with_tags(self.ranked(query), self.id_column, tags).subquery()
+        stmt = keyset_page(
+            select(ranked.c.id, ranked.c.rank),
+            (ranked.c.rank, ranked.c.id),
+            cursor,
+            limit,
+        )
+        rows = (await db.execute(stmt)).all()
+        if not rows and cursor is None and settings.SEARCH_FUZZY_FALLBACK:
+            logger.info(f"No full-text match for '{query}', trying fuzzy match")
+            fuzzy = _with_tags(self.fuzzy(query), self.id_column, tags).subquery()
+            rows = (
+                await db.execute(
+                    select(fuzzy.c.id, fuzzy.c.rank)
+                    .order_by(fuzzy.c.rank.desc(), fuzzy.c.id.desc())
+                    .limit(limit)
+                )
+            ).all()
+            # Fuzzy suggestions are a single page; they cannot be continued
+            return Page(items=await self._hits(db, query, rows, fuzzy=True))
+        page = make_page(rows, limit, lambda row: (row.rank, row.id))
+        page.items = await self._hits(db, query, page.items)
+        return page
+
+
+class PostgresSearch(SqlSearch):
+    """tsvector/GIN ranking with a pg_trgm title fallback."""
+
+    vector = column("search_vector")
+
+    def _tsquery(self, query: str):
+        return func.websearch_to_tsquery("english", literal(query))
+
+    def ranked(self, query: str):
+        tsquery = self._tsquery(query)
+        return select(
+            Article.id.label("id"),
+            func.ts_rank(self.vector, tsquery).cast(Float).label("rank"),
+        ).where(self.vector.op("@@")(tsquery))
+
+    def fuzzy(self, query: str):
+        return select(
+            Article.id.label("id"),
+            func.similarity(Article.title, query).cast(Float).label("rank"),
+        ).where(Article.title.op("%")(query))
+
+    async def snippets(
+        self, db: AsyncSession, query: str, ids: List[int], fuzzy: bool = False
+    ) -> Dict[int, str]:
+        options = (
+            f"StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, "
+            f"MaxWords={settings.SEARCH_SNIPPET_WORDS}, MinWords=5, MaxFragments=2"
+        )
+        result = await db.execute(
+            select(
+                Article.id,
+                func.ts_headline(
+                    "english", Article.content, self._tsquery(query), options
+                ),
+            ).where(Article.id.in_(ids))
+        )
+        return dict(result.all())
+
+
+class SqliteSearch(SqlSearch):
+    """FTS5 bm25 ranking; fuzzy matching falls back to prefix queries."""
+
+    fts = table("articles_fts", column("rowid", Integer))
+    id_column = fts.c.rowid
+
+    def _match(self, query: str, prefix: bool = False) -> str:
+        suffix = "*" if prefix else ""
+        return " ".join(f'"{term}"{suffix}' for term in _terms(query))
+
+    def _ranked(self, match: str):
+        # bm25 is lower-is-better; negate so every backend ranks descending
+        return (
+            select(
+                self.id_column.label("id"),
+                (-func.bm25(literal_column("articles_fts"), *SQLITE_BM25_WEIGHTS))
+                .cast(Float)
+                .label("rank"),
+            )
+            .select_from(self.fts)
+            .where(text("articles_fts MATCH :match").bindparams(match=match))
+        )
+
+    def ranked(self, query: str):
+        return self._ranked(self._match(query))
+
+    def fuzzy(self, query: str):
+        return self._ranked(self._match(query, prefix=True))
+
+    async def snippets(
+        self, db: AsyncSession, query: str, ids: List[int], fuzzy: bool = False
+    ) -> Dict[int, str]:
+        result = await db.execute(
+            text(
+                "SELECT rowid, snippet(articles_fts, 2, :start, :stop, '…', :words) "
+                "FROM articles_fts WHERE articles_fts MATCH :match "
+                "AND rowid IN :ids"
+            ).bindparams(
+                bindparam("ids", value=ids, expanding=True),
+                start=SNIPPET_START,
+                stop=SNIPPET_STOP,
+                words=settings.SEARCH_SNIPPET_WORDS,
+                match=self._match(query, prefix=fuzzy),
+            )
+        )
+        return dict(result.all())
+
+
+class MemorySearch:
+    """BM25 over the in-process inverted index; the DB only loads the page."""
+
+    cursor_columns = (column("rank", Float), column("id", Integer))
+
+    async def search(
+        self,
+        db: AsyncSession,
+        query: str,
+        tags: Optional[Sequence[str]],
+        cursor: Optional[str],
+        limit: int,
+    ) -> Page:
+        terms = _terms(query)
+        after = decode_cursor(cursor, self.cursor_columns) if cursor else None
+        pairs = article_index.search([[t] for t in terms], limit + 1, tags or (), after)
+        fuzzy = False
+        if not pairs and cursor is None and settings.SEARCH_FUZZY_FALLBACK:
+            groups = [article_index.expand(t) for t in terms]
+            pairs = article_index.search(groups, limit, tags or ())
+            fuzzy = True
+        page = make_page(pairs, limit, lambda pair: pair)
+        if fuzzy:
+            page.next_cursor = None
+        ids = [article_id for _, article_id in page.items]
+        articles = await _load_articles(db, ids) if ids else {}
+        page.items = [
+            SearchHit(
+                articles[article_id],
+                score,
+                highlight(articles[article_id].content, terms, prefix=fuzzy),
+            )
+            for score, article_id in page.items
+            if article_id in articles
+        ]
+        return page
+
+
+def highlight(content: str, terms: Sequence[str], prefix: bool = False) -> str:
+    """Window of SEARCH_SNIPPET_WORDS words around the first matching term."""
+    words = (content or "").split()
+
+    def matches(word: str) -> bool:
+        tokens = _terms(word)
+        if prefix:
+            return any(token.startswith(term) for token in tokens for term in terms)
+        return any(token in terms for token in tokens)
+
+    first = next((i for i, word in enumerate(words) if matches(word)), 0)
+    start = max(0, first - settings.SEARCH_SNIPPET_WORDS // 4)
+    window = words[start : start + settings.SEARCH_SNIPPET_WORDS]
+    marked = [
+        f"{SNIPPET_START}{word}{SNIPPET_STOP}" if matches(word) else word
+        for word in window
+    ]
+    prefix_ellipsis = "… " if start else ""
+    suffix = " …" if start + len(window) < len(words) else ""
+    return prefix_ellipsis + " ".join(marked) + suffix
+
+
+BACKENDS = {
+    "postgresql": PostgresSearch(),
+    "sqlite": SqliteSearch(),
+    "memory": MemorySearch(),
+}
+
+
+def get_backend(db: AsyncSession):
+    name = settings.SEARCH_BACKEND
+    if name == "memory" and not article_index.ready:
+        # Still warming up: answer from the database meanwhile
+        name = "auto"
+    if name == "auto":
+        name = db.get_bind().dialect.name
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise RuntimeError(f"No article search backend for '{name}'")
+
+
+async def search_articles(
+    db: AsyncSession,
+    query: str,
+    tags: Optional[Sequence[str]] = None,
+    cursor: Optional[str] = None,
+    limit: int = settings.PAGE_SIZE_DEFAULT,
+) -> Page:
+    """
+    One page of SearchHits for `query`, best match first. When the first page
+    has no lexical match, a single page of fuzzy matches is returned instead.
+    """
+    if not _terms(query):
+        return Page()
+    return await get_backend(db).search(db, query, tags, cursor, limit)
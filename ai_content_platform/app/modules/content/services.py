@@ -2,14 +2,24 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from ai_content_platform.app.modules.content.models import Article, Tag
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
-import os
-from ai_content_platform.app.modules.content.gemini_service import GeminiService
+from typing import AsyncIterator, List, Optional, Tuple
+from ai_content_platform.app.modules.content.llm_gateway import llm_gateway
+from ai_content_platform.app.modules.content.llm_usage import UsageMeter
+from ai_content_platform.app.modules.content import search
+from ai_content_platform.app.modules.content.inverted_index import (
+    article_index,
+    index_enabled,
+)
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.shared.pagination import (
+    Page,
+    created_at_key,
+    fetch_page,
+    id_key,
+)
 from ai_content_platform.app.shared.logging import get_logger
 
 logger = get_logger(__name__)
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "your-gemini-api-key")
-gemini_service = GeminiService(api_key=GEMINI_API_KEY)
 
 
 async def create_article(
@@ -51,6 +61,8 @@ async def create_article(
         )
         result = await db.execute(stmt)
         article = result.scalars().first()
+        if index_enabled():
+            article_index.add_article(article)
         logger.info(f"Article created: {title}, id: {article.id}")
         return article
     except Exception as e:
@@ -111,8 +123,11 @@ async def update_article(db: AsyncSession, article_id: int, **kwargs):
             .where(Article.id == article.id)
         )
         result = await db.execute(stmt)
+        article = result.scalars().first()
+        if index_enabled():
+            article_index.add_article(article)
         logger.info(f"Article updated: {article_id}")
-        return result.scalars().first()
+        return article
     except Exception as e:
         logger.error(f"Error updating article {article_id}: {e}", exc_info=True)
         raise
@@ -127,6 +142,8 @@ async def delete_article(db: AsyncSession, article_id: int):
             return False
         await db.delete(article)
         await db.commit()
+        if index_enabled():
+            article_index.remove(article_id)
         logger.info(f"Article deleted: {article_id}")
         return True
     except Exception as e:
@@ -134,12 +151,26 @@ async def delete_article(db: AsyncSession, article_id: int):
         raise
 
 
-async def list_articles(db: AsyncSession):
-    logger.info("Listing all articles")
+async def list_articles(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = settings.PAGE_SIZE_DEFAULT,
+    flagged: Optional[bool] = None,
+) -> Page:
+    """One page of articles, newest first."""
+    logger.info(f"Listing articles, limit={limit}")
     try:
         stmt = select(Article).options(selectinload(Article.tags))
-        result = await db.execute(stmt)
-        return result.scalars().all()
+        if flagged is not None:
+            stmt = stmt.where(Article.flagged == flagged)
+        return await fetch_page(
+            db,
+            stmt,
+            (Article.created_at, Article.id),
+            cursor,
+            limit,
+            created_at_key,
+        )
     except Exception as e:
         logger.error(f"Error listing articles: {e}", exc_info=True)
         raise
@@ -159,29 +190,30 @@ async def create_tag(db: AsyncSession, name: str):
         raise
 
 
-async def list_tags(db: AsyncSession):
-    logger.info("Listing all tags")
+async def list_tags(
+    db: AsyncSession, cursor: Optional[str] = None, limit: int = settings.PAGE_SIZE_MAX
+) -> Page:
+    logger.info(f"Listing tags, limit={limit}")
     try:
-        result = await db.execute(select(Tag))
-        return result.scalars().all()
+        return await fetch_page(
+            db, select(Tag), (Tag.id,), cursor, limit, id_key, desc=False
+        )
     except Exception as e:
         logger.error(f"Error listing tags: {e}", exc_info=True)
         raise
 
 
-async def search_articles(db: AsyncSession, query: str):
-    logger.info(f"Searching articles with query: {query}")
+async def search_articles(
+    db: AsyncSession,
+    query: str,
+    tags: Optional[List[str]] = None,
+    cursor: Optional[str] = None,
+    limit: int = settings.PAGE_SIZE_DEFAULT,
+) -> Page:
+    """One page of ranked SearchHits; see content/search.py for the backends."""
+    logger.info(f"Searching articles with query: {query}, tags={tags}")
     try:
-        # Simple LIKE search; for production use FTS
-        stmt = (
-            select(Article)
-            .options(selectinload(Article.tags))
-            .where(
-                Article.title.ilike(f"%{query}%") | Article.content.ilike(f"%{query}%")
-            )
-        )
-        result = await db.execute(stmt)
-        return result.scalars().all()
+        return await search.search_articles(db, query, tags, cursor, limit)
     except Exception as e:
         logger.error(
             f"Error searching articles with query '{query}': {e}", exc_info=True
@@ -189,6 +221,80 @@ async def search_articles(db: AsyncSession, query: str):
         raise
 
 
+# The article and its summary come back from one streamed call, separated by
+# this marker, so the summary costs no extra round trip
+SUMMARY_MARKER = "<<<SUMMARY>>>"
+SUMMARY_INSTRUCTION = (
+    f"\n\nAfter the article, write a line containing only {SUMMARY_MARKER} "
+    "followed by a 2-3 sentence summary of the article."
+)
+
+
+def _marker_prefix_len(text: str) -> int:
+    """Length of the longest suffix of text that starts SUMMARY_MARKER."""
+    for size in range(min(len(text), len(SUMMARY_MARKER) - 1), 0, -1):
+        if text.endswith(SUMMARY_MARKER[:size]):
+            return size
+    return 0
+
+
+def _article_prompt(title: str, content: str) -> str:
+    return f"Generate a detailed article on the topic: '{title}'. Content: {content}"
+
+
+async def stream_article_generation(
+    title: str,
+    content: str,
+    prompt: Optional[str] = None,
+    usage: Optional[UsageMeter] = None,
+) -> AsyncIterator[Tuple[str, str]]:
+    """
+    Yield ("content", delta) pairs as the article body streams in, then one
+    ("summary", text) pair. Text that could be the start of the marker is
+    held back until the next delta decides it. If the model leaves out the
+    summary, it is requested separately. Tokens spent are recorded on usage.
+    """
+    prompt = prompt or _article_prompt(title, content)
+    pending, body, summary = "", [], None
+    async for delta in llm_gateway.generate_streaming_text(
+        prompt + SUMMARY_INSTRUCTION, usage=usage
+    ):
+        if summary is not None:
+            summary.append(delta)
+            continue
+        pending += delta
+        index = pending.find(SUMMARY_MARKER)
+        if index >= 0:
+            head, summary = pending[:index], [pending[index + len(SUMMARY_MARKER) :]]
+            pending = ""
+        else:
+            head = pending[: len(pending) - _marker_prefix_len(pending)]
+            pending = pending[len(head) :]
+        if head:
+            body.append(head)
+            yield "content", head
+    if pending:
+        body.append(pending)
+        yield "content", pending
+    article = "".join(body).strip()
+    yield "summary", await _ensure_summary(
+        title, article, "".join(summary or []), usage
+    )
+
+
+async def _ensure_summary(
+    title: str, article: str, summary: str, usage: Optional[UsageMeter]
+) -> str:
+    summary = summary.strip()
+    if not summary:
+        logger.warning(f"Generated article '{title}' came without a summary")
+        summary = await llm_gateway.generate_text(
+            f"Summarize the following article in 2-3 sentences: {article}",
+            usage=usage,
+        )
+    return summary
+
+
 async def ai_generate_article(
     db: AsyncSession,
     title: str,
@@ -196,19 +302,22 @@ async def ai_generate_article(
     summary: Optional[str],
     tag_names: Optional[List[str]] = None,
     prompt: Optional[str] = None,
+    usage: Optional[UsageMeter] = None,
 ):
     """
     Generate article content and summary using Gemini AI, then create the article.
-    Flagged=True for AI-generated content.
+    Flagged=True for AI-generated content. Nobody watches this call stream,
+    so it goes through the cached completion and is split at the marker.
     """
     logger.info(f"AI generate article called for title: {title}")
+    prompt = prompt or _article_prompt(title, content)
     try:
-        if not prompt:
-            prompt = f"Generate a detailed article on the topic: '{title}'. Content: {content}"
-        ai_content = await gemini_service.generate_text(prompt)
-        ai_summary = await gemini_service.generate_text(
-            f"Summarize the following article in 2-3 sentences: {ai_content}"
+        text = await llm_gateway.generate_text(
+            prompt + SUMMARY_INSTRUCTION, cache=True, usage=usage
         )
+        ai_content, _, ai_summary = text.partition(SUMMARY_MARKER)
+        ai_content = ai_content.strip()
+        ai_summary = await _ensure_summary(title, ai_content, ai_summary, usage)
         return await create_article(
             db, title, ai_content, ai_summary, tag_names, flagged=True
         )
@@ -219,7 +328,9 @@ async def ai_generate_article(
         raise
 
 
-async def ai_summarize_article(db: AsyncSession, article_id: int):
+async def ai_summarize_article(
+    db: AsyncSession, article_id: int, usage: Optional[UsageMeter] = None
+):
     logger.info(f"AI summarize article called for article_id: {article_id}")
     try:
         article = await get_article(db, article_id)
@@ -229,7 +340,7 @@ async def ai_summarize_article(db: AsyncSession, article_id: int):
         summary_prompt = (
             f"Summarize the following article in 2-3 sentences: {article.content}"
         )
-        ai_summary = await gemini_service.generate_text(summary_prompt)
+        ai_summary = await llm_gateway.generate_text(summary_prompt, usage=usage)
         article.summary = ai_summary
         await db.commit()
         await db.refresh(article)
@@ -1,6 +1,6 @@
 # Notification models
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index
 from ai_content_platform.app.database import Base
 
 
@@ -13,6 +13,11 @@ class Notification(Base):
     read = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # Mirrors migration 0005_keyset_pagination_indexes
+    __table_args__ = (
+        Index("ix_notifications_user_created_at_id", "user_id", "created_at", "id"),
+    )
+
 
 class InAppNotificationStore:
     """
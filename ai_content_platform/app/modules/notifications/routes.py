@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from ai_content_platform.app.modules.notifications.services import NotificationService
 from ai_content_platform.app.events.publishers import publish_event
@@ -8,9 +9,10 @@ from ai_content_platform.app.modules.notifications.schemas import (
     NotificationResponse,
     MarkReadRequest,
 )
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from ai_content_platform.app.shared.logging import get_logger
+from ai_content_platform.app.shared.pagination import set_next_cursor
 from ai_content_platform.app.shared.dependencies import require_permission
 
 logger = get_logger(__name__)
@@ -62,17 +64,21 @@ def send_notification(notification: NotificationCreate):
     summary="N2: Get User Notifications",
     description="""
     **N2: Get User Notifications**\n
-    Retrieve a list of in-app notifications for a specific user. Supports filtering for unread notifications and limiting the number of results.\n
-    - **user_id**: ID of the user\n    - **unread_only**: If true, returns only unread notifications\n    - **limit**: Maximum number of notifications to return (max 100)
+    Retrieve a list of in-app notifications for a specific user. Supports filtering for unread notifications and limiting the number of results. Results are newest first; when more remain, the `X-Next-Cursor` response header holds the cursor for the next page.\n
+    - **user_id**: ID of the user\n    - **unread_only**: If true, returns only unread notifications\n    - **limit**: Maximum number of notifications to return (max 100)\n    - **cursor**: Cursor from a previous page's `X-Next-Cursor` header
     """,
 )
-def get_user_notifications(
+async def get_user_notifications(
     user_id: int,
+    response: Response,
     unread_only: bool = Query(False, description="Filter only unread notifications"),
     limit: int = Query(
-        50, le=100, description="Maximum number of notifications to return"
+        50, ge=1, le=100, description="Maximum number of notifications to return"
     ),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from the X-Next-Cursor header"
+    ),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Get in-app notifications for a specific user.
@@ -80,14 +86,18 @@ def get_user_notifications(
     - **user_id**: ID of the user
     - **unread_only**: If true, returns only unread notifications
     - **limit**: Maximum number of notifications to return (max 100)
+    - **cursor**: Cursor for the next page
     """
     logger.info(
         f"API: Fetching notifications for user {user_id}, unread_only={unread_only}, limit={limit}"
     )
     try:
         service = NotificationService(db=db)
-        notifications = service.get_user_notifications(user_id, unread_only, limit)
-        return notifications
+        page = await service.get_user_notifications(user_id, unread_only, limit, cursor)
+        set_next_cursor(response, page)
+        return page.items
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(
             f"API: Error fetching notifications for user {user_id}: {e}", exc_info=True
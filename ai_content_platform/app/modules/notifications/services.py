@@ -3,8 +3,16 @@ from ai_content_platform.app.modules.notifications.models import (
     InAppNotificationStore,
 )
 from ai_content_platform.app.modules.users.models import User
+from ai_content_platform.app.shared.pagination import (
+    Page,
+    created_at_key,
+    keyset_page,
+    make_page,
+)
+from fastapi import HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import Optional, List, Dict
+from typing import Optional, Dict
 from ai_content_platform.app.shared.logging import get_logger
 
 logger = get_logger(__name__)
@@ -171,37 +179,51 @@ class NotificationService:
             )
             raise
 
-    def get_user_notifications(
-        self, user_id: int, unread_only: bool = False, limit: int = 50
-    ) -> List[Notification]:
+    async def get_user_notifications(
+        self,
+        user_id: int,
+        unread_only: bool = False,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Page:
         """
-        Get in-app notifications for a user.
-        First checks in-memory store, falls back to database.
+        Get one page of in-app notifications for a user, newest first, with a
+        keyset query on the (async) database session. The in-memory store
+        only holds what this process sent, so it is used only when there is
+        no database.
         """
         logger.info(
             f"Fetching notifications for user {user_id}, unread_only={unread_only}, limit={limit}"
         )
         try:
-            # Try in-memory store first (faster)
-            notifications = InAppNotificationStore.get_user_notifications(user_id)
-            if unread_only:
-                notifications = [n for n in notifications if not n.read]
-            if notifications:
-                return notifications[:limit]
-            # Fall back to database
             if not self.db:
-                return []
-            query = self.db.query(Notification).filter(
+                if cursor is not None:
+                    return Page()
+                # Unsaved entries have no key to build a cursor from; the
+                # store keeps them in send order
+                notifications = [
+                    n
+                    for n in InAppNotificationStore.get_user_notifications(user_id)
+                    if n.notif_type == "in_app" and not (unread_only and n.read)
+                ]
+                return Page(items=notifications[::-1][:limit])
+            stmt = select(Notification).where(
                 Notification.user_id == user_id, Notification.notif_type == "in_app"
             )
             if unread_only:
-                query = query.filter(Notification.read == False)
-            return query.order_by(Notification.created_at.desc()).limit(limit).all()
+                stmt = stmt.where(Notification.read == False)
+            stmt = keyset_page(
+                stmt, (Notification.created_at, Notification.id), cursor, limit
+            )
+            rows = (await self.db.execute(stmt)).scalars().all()
+            return make_page(rows, limit, created_at_key)
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(
                 f"Error fetching notifications for user {user_id}: {e}", exc_info=True
             )
-            return []
+            raise
 
     def mark_as_read(self, notification_id: int, user_id: int) -> bool:
         """Mark an in-app notification as read."""
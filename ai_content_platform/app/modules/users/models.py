@@ -3,7 +3,8 @@ SQLAlchemy User model.
 Defines the users table for authentication and profile management.
 """
 
-from sqlalchemy import Column, Integer, String
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, String
 from sqlalchemy.orm import relationship
 from ai_content_platform.app.modules.auth.models import user_roles
 from ai_content_platform.app.database import Base
@@ -27,3 +28,5 @@ class User(Base):
     # Notification preferences
     email_notifications = Column(Boolean, default=True)
     in_app_notifications = Column(Boolean, default=True)
+    # Mirrors migration 0011_user_created_at
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -0,0 +1,130 @@
+"""
+Bounded worker pool for password hashing.
+bcrypt deliberately costs ~hundreds of milliseconds per call; running it on the
+event loop stalls every other request (including streaming chat responses) on
+that worker. Hashing and verification are offloaded to a thread or process
+pool, with a cap on queued work so bursts are rejected with 429 instead of
+piling up behind the pool.
+"""
+
+import asyncio
+import atexit
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.shared import metrics
+from ai_content_platform.app.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Module-level so process-pool workers can rebuild it after import. Pinning the
+# rounds makes needs_update() flag hashes made with any other cost factor, so
+# changing BCRYPT_ROUNDS re-hashes passwords transparently on next login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+
+def _timed_hash(password: str):
+    started = time.perf_counter()
+    hashed = pwd_context.hash(password)
+    return hashed, time.perf_counter() - started
+
+
+def _timed_verify(plain_password: str, hashed_password: str):
+    started = time.perf_counter()
+    try:
+        ok = pwd_context.verify(plain_password, hashed_password)
+    except (ValueError, TypeError):
+        ok = False
+    return ok, time.perf_counter() - started
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt off the event loop with at most max_pending calls in flight.
+    """
+
+    def __init__(self, workers: int, max_pending: int, kind: str = "thread"):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.kind = kind
+        self._executor: Executor | None = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.hash_latency = metrics.latency("password_hash_seconds")
+        self.verify_latency = metrics.latency("password_verify_seconds")
+        self.queue_wait = metrics.latency("password_hash_queue_wait_seconds")
+        self.rejected = metrics.counter("password_hash_rejected_total")
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="pwhash"
+                )
+            logger.info(
+                f"Password hashing pool started: {self.kind} x{self.workers}, "
+                f"max_pending={self.max_pending}"
+            )
+        return self._executor
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def _submit(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected.inc()
+                logger.warning(
+                    f"Password hashing pool saturated ({self._pending} pending)"
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Authentication service busy, retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+        submitted = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, elapsed = await loop.run_in_executor(self.executor, fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+        self.queue_wait.observe(max(0.0, time.perf_counter() - submitted - elapsed))
+        return result, elapsed
+
+    async def hash(self, password: str) -> str:
+        hashed, elapsed = await self._submit(_timed_hash, password)
+        self.hash_latency.observe(elapsed)
+        return hashed
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        ok, elapsed = await self._submit(_timed_verify, plain_password, hashed_password)
+        self.verify_latency.observe(elapsed)
+        return ok
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    kind=settings.PASSWORD_HASH_EXECUTOR,
+)
+atexit.register(password_hasher.shutdown)
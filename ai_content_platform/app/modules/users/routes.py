@@ -3,7 +3,7 @@ User API routes: registration, profile, update, avatar upload.
 All endpoints use async SQLAlchemy and Pydantic schemas.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import selectinload
 from ai_content_platform.app.shared.dependencies import (
     get_current_user,
@@ -18,10 +18,18 @@ from ai_content_platform.app.modules.users.schemas import (
 from ai_content_platform.app.modules.users.services import (
     create_user,
     get_user_by_username,
-    get_password_hash,
+    get_password_hash_async,
 )
 from ai_content_platform.app.modules.users.models import User
 from ai_content_platform.app.modules.users.schemas import UserOut
+from ai_content_platform.app.modules.auth.principal import principal_cache
+from ai_content_platform.app.modules.auth.credential_cache import credential_cache
+from ai_content_platform.app.shared.pagination import (
+    PageParams,
+    fetch_page,
+    id_key,
+    set_next_cursor,
+)
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from ai_content_platform.app.shared.logging import get_logger
@@ -38,12 +46,27 @@ user_router = APIRouter(prefix="/users", tags=["users"])
     response_model=list[UserOut],
     dependencies=[Depends(require_permission("view_users"))],
 )
-async def list_users_endpoint(db: AsyncSession = Depends(get_db)):
-    logger.info("API: Listing all users")
+async def list_users_endpoint(
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+):
+    logger.info("API: Listing users")
     try:
-        result = await db.execute(select(User).options(selectinload(User.roles)))
-        users = result.scalars().all()
-        return [UserOut.model_validate(u) for u in users]
+        # users has no created_at, so pages follow the primary key
+        result = await fetch_page(
+            db,
+            select(User).options(selectinload(User.roles)),
+            (User.id,),
+            page.cursor,
+            page.limit,
+            id_key,
+            desc=False,
+        )
+        set_next_cursor(response, result)
+        return [UserOut.model_validate(u) for u in result.items]
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"API: Error listing users: {e}", exc_info=True)
         raise HTTPException(500, "Failed to list users")
@@ -74,16 +97,11 @@ async def get_profile(
 # Debug endpoint: Get current user's roles and permissions
 @user_router.get("/me/roles-permissions")
 async def get_my_roles_permissions(current_user=Depends(get_current_user)):
-    roles = [r.name for r in getattr(current_user, "roles", [])]
-    permissions = set()
-    for role in getattr(current_user, "roles", []):
-        for perm in getattr(role, "permissions", []):
-            permissions.add(perm.name)
     return {
-        "username": getattr(current_user, "username", None),
-        "roles": roles,
-        "permissions": list(permissions),
-        "role_field": getattr(current_user, "role", None),
+        "username": current_user.username,
+        "roles": sorted(current_user.roles),
+        "permissions": sorted(current_user.permissions),
+        "role_field": current_user.role,
     }
 
 
@@ -105,13 +123,16 @@ async def update_profile(
         if update.username:
             user.username = update.username
         if update.password:
-            user.hashed_password = get_password_hash(update.password)
+            user.hashed_password = await get_password_hash_async(update.password)
         if update.avatar:
             user.avatar = update.avatar
         if update.email:
             user.email = update.email
         await db.commit()
         await db.refresh(user)
+        await principal_cache.invalidate_user(current_user.username)
+        if update.password or update.username:
+            credential_cache.invalidate_user(current_user.username)
         return UserOut.model_validate(user)
     except HTTPException:
         raise
@@ -131,6 +152,8 @@ async def create_user_endpoint(user_in: UserCreate, db: AsyncSession = Depends(g
     try:
         user = await create_user(db, user_in)
         return UserOut.model_validate(user)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"API: Error creating user {user_in.username}: {e}", exc_info=True)
         raise HTTPException(500, "Failed to create user")
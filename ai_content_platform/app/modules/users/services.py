@@ -8,15 +8,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ai_content_platform.app.events.publishers import publish_event
 from sqlalchemy.future import select
 from ai_content_platform.app.modules.users.models import User
-from passlib.context import CryptContext
 from ai_content_platform.app.modules.auth.models import Role
 from ai_content_platform.app.shared.logging import get_logger
 from ai_content_platform.app.modules.users.models import user_roles
+from ai_content_platform.app.modules.users.password_hasher import (
+    password_hasher,
+    pwd_context,
+)
 
 logger = get_logger(__name__)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 
 def get_password_hash(password: str) -> str:
     """Hash a plain password using bcrypt."""
@@ -40,6 +41,25 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool without blocking the event loop."""
+    return await password_hasher.hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool without blocking the event loop."""
+    return await password_hasher.verify(plain_password, hashed_password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was made with a different scheme or cost factor."""
+    try:
+        return pwd_context.needs_update(hashed_password)
+    except Exception as e:
+        logger.error(f"Error checking password hash policy: {e}", exc_info=True)
+        return False
+
+
 async def get_user_by_username(db: AsyncSession, username: str):
     """Fetch a user by username from the DB."""
     logger.info(f"Fetching user by username: {username}")
@@ -78,7 +98,7 @@ async def create_user(db: AsyncSession, user_data):
         password = (
             user_data["password"] if isinstance(user_data, dict) else user_data.password
         )
-        hashed_password = get_password_hash(password)
+        hashed_password = await get_password_hash_async(password)
 
         # Create user instance (without roles yet)
         user = User(
@@ -7,6 +7,12 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from ai_content_platform.app.shared.utils import verify_access_token
 from ai_content_platform.app.modules.auth.models import Role
+from ai_content_platform.app.modules.auth.principal import (
+    Principal,
+    principal_cache,
+    token_cache_id,
+)
+from ai_content_platform.app.modules.auth.permissions import permission_registry
 from ai_content_platform.app.database import AsyncSessionLocal
 from ai_content_platform.app.modules.users.models import User
 from ai_content_platform.app.shared.logging import get_logger
@@ -36,7 +42,10 @@ async def get_current_user(
 ):
     """
     Dependency to extract and validate the current user from a JWT token.
-    Fetches the user from the DB with roles and permissions.
+    Returns a Principal (id, username, roles, permissions). Tokens carrying
+    current RBAC claims need no DB access while revocations are shared through
+    Redis; otherwise the principal cache is consulted and the user is loaded
+    with roles and permissions on a miss.
     """
     logger.info("Extracting current user from JWT token.")
     try:
@@ -55,6 +64,16 @@ async def get_current_user(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token: missing subject",
             )
+        registry = await permission_registry.ensure_fresh(db)
+        principal = Principal.from_claims(payload, registry)
+        if principal is not None and await principal_cache.trusts_claims(
+            username, payload.get("iat")
+        ):
+            return principal
+        token_id = token_cache_id(payload)
+        principal = await principal_cache.get(username, token_id)
+        if principal is not None and principal.rbac_version == registry.version:
+            return principal
         result = await db.execute(
             select(User)
             .where(User.username == username)
@@ -67,8 +86,10 @@ async def get_current_user(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found",
             )
+        principal = Principal.from_user(user, registry)
+        await principal_cache.set(principal, token_id)
         logger.info(f"Authenticated user: {username}")
-        return user
+        return principal
     except HTTPException:
         raise
     except Exception as e:
@@ -77,20 +98,17 @@ async def get_current_user(
 
 
 # RBAC: Get user permissions from roles
-async def get_user_permissions(current_user: User = Depends(get_current_user)):
+async def get_user_permissions(
+    current_user: Principal = Depends(get_current_user),
+):
     logger.info(
         f"Fetching permissions for user: {getattr(current_user, 'username', None)}"
     )
     try:
-        permissions = set()
-        if hasattr(current_user, "roles"):
-            for role in current_user.roles:
-                for perm in getattr(role, "permissions", []):
-                    permissions.add(perm.name)
-        return permissions
+        return current_user.permissions
     except Exception as e:
         logger.error(f"Error fetching user permissions: {e}", exc_info=True)
-        return set()
+        return frozenset()
 
 
 # RBAC: Require a specific permission
@@ -104,10 +122,13 @@ def require_permission(permission: str):
         else:
             logger.warning(f"Permission '{permission}' denied for user: {username}")
 
-    async def permission_checker(current_user: User = Depends(get_current_user)):
+    async def permission_checker(
+        current_user: Principal = Depends(get_current_user),
+    ):
         try:
-            user_permissions = await get_user_permissions(current_user)
-            if permission not in user_permissions:
+            if not permission_registry.allows(
+                current_user.permission_mask, permission
+            ):
                 _log_permission_check(current_user, False)
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN, detail="Permission denied"
@@ -126,16 +147,11 @@ def require_permission(permission: str):
 
 
 def require_role(required_role: str):
-    async def role_dependency(user: User = Depends(get_current_user)):
+    async def role_dependency(user: Principal = Depends(get_current_user)):
         try:
-            # Check user's roles via many-to-many relationship
-            user_roles_list = getattr(user, "roles", [])
-            has_role = any(
-                getattr(role, "name", None) == required_role for role in user_roles_list
-            )
-            if not has_role:
+            if required_role not in user.roles:
                 logger.warning(
-                    f"Role '{required_role}' required, but user has roles {[r.name for r in user_roles_list]}"
+                    f"Role '{required_role}' required, but user has roles {sorted(user.roles)}"
                 )
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,112 @@
+"""
+JWT signing and verification keys.
+HS* algorithms use SECRET_KEY. RS*/ES* algorithms use a private key for the
+active key id (only needed where tokens are issued) and a set of public keys
+indexed by key id, so any replica can verify tokens without sharing a secret and
+keys can be rotated by publishing the new public key before switching
+JWT_ACTIVE_KID. Keys are parsed once when this module is imported.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+from jose import jwk
+from jose.constants import ALGORITHMS
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+ASYMMETRIC_PREFIXES = ("RS", "ES")
+
+
+class KeyRing:
+    def __init__(
+        self,
+        algorithm: str,
+        signing_key=None,
+        verification_keys: Optional[Dict[str, object]] = None,
+        active_kid: Optional[str] = None,
+    ):
+        self.algorithm = algorithm
+        self.active_kid = active_kid
+        self._signing_key = signing_key
+        self._verification_keys = verification_keys or {}
+
+    @property
+    def asymmetric(self) -> bool:
+        return self.algorithm.startswith(ASYMMETRIC_PREFIXES)
+
+    @property
+    def headers(self) -> Optional[dict]:
+        return {"kid": self.active_kid} if self.active_kid else None
+
+    @property
+    def signing_key(self):
+        if self._signing_key is None:
+            raise RuntimeError(
+                f"No private key configured for {self.algorithm}; "
+                "this instance can verify tokens but not issue them"
+            )
+        return self._signing_key
+
+    def verification_key(self, kid: Optional[str]):
+        """Key for the token's kid header; symmetric rings have a single key."""
+        if not self.asymmetric:
+            return self._signing_key
+        if kid is None:
+            kid = self.active_kid
+        key = self._verification_keys.get(kid)
+        if key is None:
+            raise KeyError(f"Unknown JWT key id: {kid}")
+        return key
+
+    @property
+    def kids(self) -> list:
+        return sorted(self._verification_keys)
+
+
+def _read_public_keys(path: Path) -> Dict[str, str]:
+    """Read {kid: PEM} from a JSON file or a directory of <kid>.pem files."""
+    if path.is_dir():
+        return {p.stem: p.read_text() for p in sorted(path.glob("*.pem"))}
+    return json.loads(path.read_text())
+
+
+def load_key_ring(
+    algorithm: str = settings.ALGORITHM,
+    secret_key: str = settings.SECRET_KEY,
+    private_key_path: Optional[str] = settings.JWT_PRIVATE_KEY_PATH,
+    public_keys_path: Optional[str] = settings.JWT_PUBLIC_KEYS_PATH,
+    active_kid: Optional[str] = settings.JWT_ACTIVE_KID,
+) -> KeyRing:
+    if algorithm not in ALGORITHMS.SUPPORTED:
+        # python-jose has no EdDSA support; fail loudly instead of at first login
+        raise RuntimeError(f"Unsupported JWT algorithm: {algorithm}")
+    if not algorithm.startswith(ASYMMETRIC_PREFIXES):
+        return KeyRing(algorithm, signing_key=jwk.construct(secret_key, algorithm))
+
+    verification_keys = {}
+    if public_keys_path:
+        for kid, pem in _read_public_keys(Path(public_keys_path)).items():
+            verification_keys[kid] = jwk.construct(pem, algorithm)
+    signing_key = None
+    if private_key_path and os.path.exists(private_key_path):
+        signing_key = jwk.construct(Path(private_key_path).read_text(), algorithm)
+        if active_kid and active_kid not in verification_keys:
+            verification_keys[active_kid] = signing_key.public_key()
+    if not verification_keys:
+        raise RuntimeError(
+            f"{algorithm} requires JWT_PUBLIC_KEYS_PATH or JWT_PRIVATE_KEY_PATH"
+        )
+    if active_kid is None and len(verification_keys) == 1:
+        active_kid = next(iter(verification_keys))
+    logger.info(
+        f"Loaded JWT key ring: {algorithm}, active kid {active_kid}, "
+        f"{len(verification_keys)} verification key(s)"
+    )
+    return KeyRing(algorithm, signing_key, verification_keys, active_kid)
+
+
+key_ring = load_key_ring()
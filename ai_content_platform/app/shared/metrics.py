@@ -0,0 +1,94 @@
+"""
+Lightweight in-process metrics.
+Latency histograms and counters kept in memory and exposed on the admin health
+endpoint; no external metrics backend is required.
+"""
+
+import threading
+from collections import deque
+from typing import Dict
+
+
+class LatencyMetric:
+    """
+    Rolling latency summary: totals over the process lifetime plus percentiles
+    over the most recent samples.
+    """
+
+    def __init__(self, name: str, window: int = 1024):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+            self._samples.append(seconds)
+
+    def _percentile(self, ordered: list, pct: float) -> float:
+        if not ordered:
+            return 0.0
+        index = min(len(ordered) - 1, int(round(pct * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            ordered = sorted(self._samples)
+            count, total, maximum = self.count, self.total, self.max
+        return {
+            "count": count,
+            "avg_ms": round(total / count * 1000, 3) if count else 0.0,
+            "p50_ms": round(self._percentile(ordered, 0.50) * 1000, 3),
+            "p95_ms": round(self._percentile(ordered, 0.95) * 1000, 3),
+            "p99_ms": round(self._percentile(ordered, 0.99) * 1000, 3),
+            "max_ms": round(maximum * 1000, 3),
+        }
+
+
+class Counter:
+    def __init__(self, name: str):
+        self.name = name
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> int:
+        return self.value
+
+
+_registry: Dict[str, object] = {}
+_registry_lock = threading.Lock()
+
+
+def latency(name: str) -> LatencyMetric:
+    """Get or create the latency metric called name."""
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = LatencyMetric(name)
+        return metric
+
+
+def counter(name: str) -> Counter:
+    """Get or create the counter called name."""
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = Counter(name)
+        return metric
+
+
+def snapshot() -> dict:
+    """Current value of every registered metric, keyed by name."""
+    with _registry_lock:
+        metrics = dict(_registry)
+    return {name: metric.snapshot() for name, metric in sorted(metrics.items())}
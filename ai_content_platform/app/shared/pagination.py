@@ -0,0 +1,123 @@
+"""
+Keyset (cursor) pagination shared by the list endpoints.
+Pages are ordered by a unique key, usually (created_at, id), and the next page
+starts strictly after the last row of the previous one, so each page costs an
+index range scan of `limit` rows however deep the client has paged. Cursors are
+opaque URL-safe base64 JSON; list endpoints keep returning plain JSON arrays
+and put the cursor for the following page in the X-Next-Cursor header (absent
+on the last page).
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from ai_content_platform.app.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass
+class Page:
+    items: List[Any] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+class PageParams:
+    """FastAPI dependency for the `cursor` and `limit` query parameters."""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(
+            None, description="Opaque cursor from the X-Next-Cursor header"
+        ),
+        limit: int = Query(
+            settings.PAGE_SIZE_DEFAULT,
+            ge=1,
+            le=settings.PAGE_SIZE_MAX,
+            description="Maximum number of items to return",
+        ),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, datetime) else v for v in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> tuple:
+    """Decode a cursor into values typed like `columns`; 400 if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match the sort key")
+        return tuple(
+            (
+                datetime.fromisoformat(value)
+                if value is not None and column.type.python_type is datetime
+                else value
+            )
+            for column, value in zip(columns, values)
+        )
+    except (ValueError, TypeError, binascii.Error, json.JSONDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def keyset_page(stmt, columns: Sequence, cursor: Optional[str], limit: int, desc=True):
+    """
+    Order `stmt` by `columns` and restrict it to one page after `cursor`.
+    Selects limit + 1 rows so the caller can tell whether another page exists.
+    """
+    if cursor:
+        key = tuple_(*columns)
+        values = tuple_(*decode_cursor(cursor, columns))
+        stmt = stmt.where(key < values if desc else key > values)
+    order = [c.desc() for c in columns] if desc else list(columns)
+    return stmt.order_by(*order).limit(limit + 1)
+
+
+def make_page(rows: Sequence, limit: int, key: Callable[[Any], Sequence]) -> Page:
+    """Trim the extra look-ahead row and build the next cursor from the last item."""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return Page(items=rows)
+    items = rows[:limit]
+    return Page(items=items, next_cursor=encode_cursor(key(items[-1])))
+
+
+async def fetch_page(
+    db: AsyncSession,
+    stmt,
+    columns: Sequence,
+    cursor: Optional[str],
+    limit: int,
+    key: Callable[[Any], Sequence],
+    desc: bool = True,
+) -> Page:
+    result = await db.execute(keyset_page(stmt, columns, cursor, limit, desc))
+    return make_page(result.scalars().all(), limit, key)
+
+
+def set_next_cursor(response: Response, page: Page) -> None:
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+
+
+def created_at_key(obj) -> tuple:
+    """Cursor key for models ordered by (created_at, id)."""
+    return (obj.created_at, obj.id)
+
+
+def id_key(obj) -> tuple:
+    return (obj.id,)
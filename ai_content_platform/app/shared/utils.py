@@ -3,14 +3,20 @@ JWT and Auth Utilities
 Provides functions for creating and verifying JWT tokens using environment-based secrets.
 """
 
+import hashlib
 import secrets
 import os
+import time
 import redis
+import redis.asyncio as aioredis
 from dotenv import load_dotenv
 from fastapi import HTTPException, status
 from jose import JWTError, jwt
 from typing import Optional
 from datetime import datetime, timedelta
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.shared.cache import TTLCache
+from ai_content_platform.app.shared.jwt_keys import key_ring
 from ai_content_platform.app.shared.logging import get_logger
 
 logger = get_logger(__name__)
@@ -36,10 +42,34 @@ def get_redis_connection():
         raise
 
 
+_async_redis = None
+
+
+def get_async_redis_connection():
+    """
+    Return a shared asyncio Redis client for use inside request handlers.
+    The client keeps its own connection pool, so it is created once per process.
+    """
+    global _async_redis
+    if _async_redis is None:
+        redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        logger.info(f"Creating async Redis client for {redis_url}")
+        _async_redis = aioredis.Redis.from_url(redis_url, decode_responses=True)
+    return _async_redis
+
+
 SECRET_KEY = os.getenv("SECRET_KEY", "your_secret_key")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 
+# Recently verified access tokens -> decoded claims. Keyed by a digest of the
+# whole token, so a hit implies the exact bytes already passed signature checks.
+_verified_tokens = TTLCache(
+    maxsize=settings.ACCESS_TOKEN_CACHE_MAXSIZE,
+    ttl=settings.ACCESS_TOKEN_CACHE_MAX_TTL_SECONDS,
+    name="verified_access_tokens",
+)
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """
@@ -48,12 +78,19 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """
     try:
         to_encode = data.copy()
+        now = datetime.utcnow()
         if expires_delta:
-            expire = datetime.utcnow() + expires_delta
+            expire = now + expires_delta
         else:
-            expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+            expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        # iat/jti identify the token so per-token caches can key on it
+        to_encode.update({"exp": expire, "iat": now, "jti": secrets.token_hex(8)})
+        encoded_jwt = jwt.encode(
+            to_encode,
+            key_ring.signing_key,
+            algorithm=key_ring.algorithm,
+            headers=key_ring.headers,
+        )
         logger.info(f"Access token created for subject: {data.get('sub', 'unknown')}")
         return encoded_jwt
     except Exception as e:
@@ -64,19 +101,38 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 def verify_access_token(token: str):
     """
     Verify a JWT access token and return the payload if valid.
-    Returns None if the token is invalid or expired.
+    Tokens verified recently are served from an LRU until they expire, so
+    repeated requests with the same bearer token skip jwt.decode.
+    Raises 401 if the token is invalid or expired.
     """
+    cache_key = hashlib.sha256(token.encode()).digest()
+    if settings.ACCESS_TOKEN_CACHE_ENABLED:
+        payload = _verified_tokens.get(cache_key)
+        if payload is not None:
+            return payload
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        kid = jwt.get_unverified_header(token).get("kid")
+        payload = jwt.decode(
+            token, key_ring.verification_key(kid), algorithms=[key_ring.algorithm]
+        )
         username: str = payload.get("sub")
         if username is None:
             logger.warning("Invalid token: missing subject (sub)")
-            return HTTPException(
+            raise HTTPException(
                 status_code=401, detail="Invalid token: missing subject"
             )
-        logger.info(f"Access token verified for subject: {username}")
+        logger.debug(f"Access token verified for subject: {username}")
+        if settings.ACCESS_TOKEN_CACHE_ENABLED:
+            # Never cache past expiry; exp-less tokens use the cache's max TTL
+            exp = payload.get("exp")
+            ttl = settings.ACCESS_TOKEN_CACHE_MAX_TTL_SECONDS
+            if exp is not None:
+                ttl = min(ttl, float(exp) - time.time())
+            _verified_tokens.set(cache_key, payload, ttl=ttl)
         return payload
-    except JWTError as e:
+    except HTTPException:
+        raise
+    except (JWTError, KeyError) as e:
         logger.warning(f"Token expired or invalid: {e}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -92,6 +148,10 @@ def verify_access_token(token: str):
         )
 
 
+def verified_token_cache_stats() -> dict:
+    return _verified_tokens.stats()
+
+
 def create_refresh_token():
     """
     Create a secure random refresh token.
@@ -1,10 +1,44 @@
 # main.py or worker.py
 from ai_content_platform.app.events.subscriber import create_subscriber
+from ai_content_platform.app.modules.auth.refresh_tokens import (
+    run_refresh_token_sweeper,
+)
+from ai_content_platform.app.modules.chat.embeddings import run_message_embedder
+from ai_content_platform.app.modules.chat.usage_rollups import run_usage_rollups
+from ai_content_platform.app.modules.content.jobs import run_content_job_workers
+import asyncio
 import threading
 from ai_content_platform.app.shared.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Async background loops. The database engine, the shared async Redis client
+# and the LLM gateway are bound to the event loop that first uses them, so
+# these all run as tasks of one loop rather than each in its own thread.
+BACKGROUND_LOOPS = {
+    "refresh-token sweeper": run_refresh_token_sweeper,
+    "content job workers": run_content_job_workers,
+    "token usage rollups": run_usage_rollups,
+    "message embedder": run_message_embedder,
+}
+
+
+async def _supervise(name: str, run):
+    try:
+        await run()
+    except Exception as e:
+        logger.error(f"Background loop '{name}' stopped: {e}", exc_info=True)
+
+
+async def run_background_loops():
+    """Run every background loop as a task in the current event loop."""
+    await asyncio.gather(
+        *(
+            asyncio.create_task(_supervise(name, run), name=name)
+            for name, run in BACKGROUND_LOOPS.items()
+        )
+    )
+
 
 def start_all_subscribers():
     """Start subscribers for all streams in separate threads."""
@@ -20,7 +54,8 @@ def start_all_subscribers():
             logger.info(f"Started subscriber for {stream}")
         except Exception as e:
             logger.error(f"Failed to start subscriber for {stream}: {e}", exc_info=True)
-    # Keep main thread alive
+    # The async loops run in the main thread, which keeps the process alive
+    asyncio.run(run_background_loops())
     for thread in threads:
         thread.join()
 
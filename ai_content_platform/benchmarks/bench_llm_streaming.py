@@ -0,0 +1,182 @@
+"""
+Benchmark: concurrent Gemini streams against a local fake API server.
+
+Starts a fake Gemini endpoint (uvicorn in a background thread) that emits
+--tokens SSE chunks per request, --token-ms apart, then opens --concurrency
+streams at once and reports time-to-first-chunk p50/p99, total wall time and
+the worst event-loop stall seen by a 10ms ticker task. --compare-blocking
+also runs the old service behaviour (a synchronous generate_content call on
+the event loop, re-chunked afterwards) against the same server.
+Streams go through an LLMGateway (one pooled client, --concurrency slots);
+--distinct-prompts N also fires --concurrency non-streaming calls spread
+over N prompts and reports how many reached the server.
+
+    python -m ai_content_platform.benchmarks.bench_llm_streaming \
+        --concurrency 50 --tokens 40 --token-ms 25 --compare-blocking
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import statistics
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from ai_content_platform.app.modules.content.gemini_service import (
+    DEFAULT_MODEL,
+    GeminiService,
+)
+from ai_content_platform.app.modules.content.llm_gateway import LLMGateway
+
+TICK_SECONDS = 0.01
+
+
+def _chunk(text: str) -> dict:
+    return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}]}
+
+
+def fake_gemini(tokens: int, token_ms: float) -> FastAPI:
+    app = FastAPI()
+    app.state.requests = 0
+
+    @app.middleware("http")
+    async def count(request, call_next):
+        app.state.requests += 1
+        return await call_next(request)
+
+    @app.post("/v1beta/models/{model}:streamGenerateContent")
+    async def stream(model: str):
+        async def events():
+            for i in range(tokens):
+                await asyncio.sleep(token_ms / 1000)
+                yield f"data: {json.dumps(_chunk(f'token{i} '))}\r\n\r\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/v1beta/models/{model}:generateContent")
+    async def generate(model: str):
+        await asyncio.sleep(tokens * token_ms / 1000)
+        return _chunk(". ".join(f"token{i}" for i in range(tokens)) + ".")
+
+    return app
+
+
+def serve(app: FastAPI) -> str:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+async def blocking_stream(service: GeminiService, prompt: str):
+    """The pre-async implementation, kept here for comparison."""
+    response = service.client.models.generate_content(
+        model=DEFAULT_MODEL, contents=prompt
+    )
+    for chunk in response.text.split("."):
+        if chunk.strip():
+            await asyncio.sleep(0.02)
+            yield chunk.strip() + "."
+
+
+async def one_stream(stream) -> tuple:
+    started = time.perf_counter()
+    first = None
+    async for _ in stream:
+        if first is None:
+            first = time.perf_counter() - started
+    return first * 1000, (time.perf_counter() - started) * 1000
+
+
+async def ticker(stop: asyncio.Event, stalls: list):
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(TICK_SECONDS)
+        now = time.perf_counter()
+        stalls.append((now - last - TICK_SECONDS) * 1000)
+        last = now
+
+
+async def run(base_url: str, concurrency: int, blocking: bool) -> str:
+    service = GeminiService(api_key="bench", base_url=base_url)
+    gateway = LLMGateway(
+        api_key="bench",
+        base_url=base_url,
+        max_connections=concurrency,
+        max_concurrency=concurrency,
+    )
+    stop, stalls = asyncio.Event(), []
+    tick = asyncio.create_task(ticker(stop, stalls))
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            one_stream(
+                blocking_stream(service, f"prompt {i}")
+                if blocking
+                else gateway.generate_streaming_text(f"prompt {i}")
+            )
+            for i in range(concurrency)
+        )
+    )
+    wall = time.perf_counter() - started
+    stop.set()
+    await tick
+    await gateway.aclose()
+    ttfb = sorted(first for first, _ in results)
+    return (
+        f"ttfb p50={statistics.median(ttfb):8.1f}ms "
+        f"p99={ttfb[int(0.99 * (len(ttfb) - 1))]:8.1f}ms  "
+        f"wall={wall:6.2f}s  max_loop_stall={max(stalls, default=0):8.1f}ms"
+    )
+
+
+async def coalesce(app: FastAPI, base_url: str, concurrency: int, distinct: int):
+    gateway = LLMGateway(api_key="bench", base_url=base_url)
+    before = app.state.requests
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(gateway.generate_text(f"prompt {i % distinct}") for i in range(concurrency))
+    )
+    wall = time.perf_counter() - started
+    await gateway.aclose()
+    return (
+        f"{concurrency} calls over {distinct} prompts -> "
+        f"{app.state.requests - before} upstream requests, wall={wall:6.2f}s"
+    )
+
+
+async def main(args):
+    app = fake_gemini(args.tokens, args.token_ms)
+    base_url = serve(app)
+    print(
+        f"concurrency={args.concurrency} tokens={args.tokens} "
+        f"token_ms={args.token_ms}"
+    )
+    print(f"async    {await run(base_url, args.concurrency, False)}")
+    if args.compare_blocking:
+        print(f"blocking {await run(base_url, args.concurrency, True)}")
+    if args.distinct_prompts:
+        print(
+            "coalesce "
+            + await coalesce(app, base_url, args.concurrency, args.distinct_prompts)
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--token-ms", type=float, default=25.0)
+    parser.add_argument("--compare-blocking", action="store_true")
+    parser.add_argument("--distinct-prompts", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,95 @@
+"""
+Benchmark: login throughput vs. concurrent chat streams.
+
+Simulates N chat streams (each emitting a chunk every 20 ms) on one event loop
+while M concurrent logins verify bcrypt passwords, first inline on the event
+loop (the old behaviour) and then through the bounded hashing pool. Reports
+login throughput and how late stream chunks were delivered.
+
+Usage:
+    python -m ai_content_platform.benchmarks.bench_login_vs_streams \
+        --streams 50 --logins 40 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./bench.db")
+
+from ai_content_platform.app.modules.users.password_hasher import (  # noqa: E402
+    PasswordHasher,
+    pwd_context,
+)
+
+CHUNK_INTERVAL = 0.02
+
+
+async def chat_stream(stop: asyncio.Event, lags: list):
+    """Emit a chunk every CHUNK_INTERVAL and record how late each one was."""
+    loop = asyncio.get_running_loop()
+    expected = loop.time() + CHUNK_INTERVAL
+    while not stop.is_set():
+        await asyncio.sleep(max(0.0, expected - loop.time()))
+        lags.append(loop.time() - expected)
+        expected += CHUNK_INTERVAL
+
+
+async def run_logins(verify, hashed: str, logins: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            assert await verify("correct horse", hashed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(logins)))
+    return time.perf_counter() - started
+
+
+async def scenario(name, verify, hashed, args):
+    stop = asyncio.Event()
+    lags: list = []
+    streams = [
+        asyncio.create_task(chat_stream(stop, lags)) for _ in range(args.streams)
+    ]
+    elapsed = await run_logins(verify, hashed, args.logins, args.concurrency)
+    stop.set()
+    await asyncio.gather(*streams)
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    print(
+        f"{name:<12} logins/s={args.logins / elapsed:7.2f}  "
+        f"stream lag p50={statistics.median(lags_ms):7.2f}ms  "
+        f"p99={lags_ms[int(0.99 * (len(lags_ms) - 1))]:8.2f}ms  "
+        f"max={lags_ms[-1]:8.2f}ms"
+    )
+
+
+async def main(args):
+    hashed = pwd_context.hash("correct horse")
+
+    async def inline_verify(plain, hashed_password):
+        return pwd_context.verify(plain, hashed_password)
+
+    hasher = PasswordHasher(
+        workers=args.workers, max_pending=args.logins + 1, kind=args.executor
+    )
+    print(
+        f"streams={args.streams} logins={args.logins} "
+        f"concurrency={args.concurrency} pool={args.executor}x{args.workers}"
+    )
+    await scenario("inline", inline_verify, hashed, args)
+    await scenario("pool", hasher.verify, hashed, args)
+    hasher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--streams", type=int, default=50)
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,81 @@
+"""
+Benchmark: /auth/token requests per second with and without the
+verified-credential cache.
+
+Runs the FastAPI app in-process against a throwaway SQLite database, seeds one
+service-account user and hammers POST /auth/token with the same credentials.
+
+Usage:
+    python -m ai_content_platform.benchmarks.bench_token_endpoint \
+        --requests 200 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from pathlib import Path
+
+BENCH_DB = Path("./bench_token.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{BENCH_DB}"
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from ai_content_platform.app.database import Base, engine  # noqa: E402
+from ai_content_platform.app.main import app  # noqa: E402
+from ai_content_platform.app.modules.auth.models import Role  # noqa: E402
+from ai_content_platform.app.modules.auth.credential_cache import (  # noqa: E402
+    credential_cache,
+)
+
+CREDENTIALS = {"username": "svc_bench", "password": "bench-password"}
+
+
+async def setup():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Role).values(name="viewer"))
+
+
+async def run(client, requests: int, concurrency: int) -> float:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            response = await client.post("/auth/token", json=CREDENTIALS)
+            assert response.status_code == 200, response.text
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return requests / (time.perf_counter() - started)
+
+
+async def main(args):
+    await setup()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        response = await c.post(
+            "/auth/register",
+            json={**CREDENTIALS, "email": "svc@example.com", "role": "viewer"},
+        )
+        assert response.status_code == 200, response.text
+
+        credential_cache.enabled = False
+        cold = await run(c, args.requests, args.concurrency)
+        credential_cache.enabled = True
+        credential_cache.clear()
+        warm = await run(c, args.requests, args.concurrency)
+
+    print(f"requests={args.requests} concurrency={args.concurrency}")
+    print(f"without credential cache: {cold:8.1f} req/s")
+    print(f"with credential cache:    {warm:8.1f} req/s  ({warm / cold:.1f}x)")
+    await engine.dispose()
+    BENCH_DB.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    asyncio.run(main(parser.parse_args()))
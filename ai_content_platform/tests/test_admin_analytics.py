@@ -0,0 +1,83 @@
+import asyncio
+from datetime import datetime
+import pytest
+from sqlalchemy import event
+from ai_content_platform.app.modules.admin import analytics
+from ai_content_platform.app.modules.content.models import Article
+from ai_content_platform.app.modules.users.models import User
+from ai_content_platform.app.shared.cache import StaleWhileRevalidateCache
+from ai_content_platform.tests.conftest import AsyncTestingSessionLocal, engine
+
+
+@pytest.mark.asyncio
+async def test_counts_and_series_take_one_statement_each():
+    statements = []
+
+    def count(*args):
+        statements.append(args[2])
+
+    async with AsyncTestingSessionLocal() as db:
+        db.add(User(username="signup", email="signup@example.com", hashed_password="x"))
+        db.add(Article(title="Counted", content="Body", flagged=True))
+        await db.commit()
+
+        event.listen(engine.sync_engine, "before_cursor_execute", count)
+        try:
+            counts = await analytics.dashboard_counts(db)
+            series = await analytics.daily_series(db, days=3)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", count)
+
+    assert len(statements) == 2
+    assert set(counts) == {
+        "users",
+        "articles",
+        "flagged_articles",
+        "conversations",
+        "messages",
+        "ai_usage",
+    }
+    assert counts["users"] >= 1 and counts["flagged_articles"] >= 1
+    today = datetime.utcnow().date().isoformat()
+    assert [point["day"] for point in series["articles"]][-1] == today
+    assert len(series["signups"]) == 3 and series["signups"][0]["count"] == 0
+    assert series["signups"][-1]["count"] >= 1 and series["articles"][-1]["count"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_misses_share_one_load_and_stale_values_refresh_in_background():
+    cache = StaleWhileRevalidateCache(ttl=0.05, stale_ttl=10)
+    loads = []
+
+    async def load():
+        loads.append(1)
+        await asyncio.sleep(0.01)
+        return len(loads)
+
+    assert await asyncio.gather(*(cache.get("k", load) for _ in range(5))) == [1] * 5
+    assert await cache.get("k", load) == 1 and len(loads) == 1
+
+    await asyncio.sleep(0.06)
+    # Stale: answered immediately while one refresh runs
+    assert [await cache.get("k", load), await cache.get("k", load)] == [1, 1]
+    await asyncio.sleep(0.02)
+    assert await cache.get("k", load) == 2 and len(loads) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_the_stale_value():
+    cache = StaleWhileRevalidateCache(ttl=0, stale_ttl=10)
+
+    async def ok():
+        return "old"
+
+    async def broken():
+        raise RuntimeError("db down")
+
+    assert await cache.get("k", ok) == "old"
+    assert await cache.get("k", broken) == "old"
+    await asyncio.sleep(0)
+    assert await cache.get("k", broken) == "old"
+    assert cache.stats()["errors"] >= 1
+    with pytest.raises(RuntimeError):
+        await cache.get("other", broken)
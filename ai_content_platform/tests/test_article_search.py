@@ -0,0 +1,72 @@
+import pytest
+from ai_content_platform.app.modules.content import services
+from ai_content_platform.app.shared.pagination import NEXT_CURSOR_HEADER
+from ai_content_platform.tests.conftest import AsyncTestingSessionLocal
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_title_matches_and_filters_by_tag():
+    async with AsyncTestingSessionLocal() as db:
+        await services.create_article(
+            db, "Ocelot habitats", "Where wild cats live.", None, ["wildlife"]
+        )
+        await services.create_article(
+            db, "Field notes", "We finally saw an ocelot at dusk.", None, ["travel"]
+        )
+        page = await services.search_articles(db, "ocelot")
+        assert [hit.article.title for hit in page.items] == [
+            "Ocelot habitats",
+            "Field notes",
+        ]
+        assert page.items[0].rank > page.items[1].rank
+        assert "<mark>" in page.items[1].snippet
+
+        tagged = await services.search_articles(db, "ocelot", tags=["travel"])
+        assert [hit.article.title for hit in tagged.items] == ["Field notes"]
+
+        # No whole-word match: falls back to prefix/fuzzy matching
+        fuzzy = await services.search_articles(db, "ocelo")
+        assert {hit.article.title for hit in fuzzy.items} == {
+            "Ocelot habitats",
+            "Field notes",
+        }
+        assert fuzzy.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_pages_with_cursor(client):
+    async with AsyncTestingSessionLocal() as db:
+        for i in range(3):
+            await services.create_article(
+                db, f"Quokka report {i}", "Quokka sightings.", None, []
+            )
+
+    await client.post(
+        "/auth/register",
+        json={
+            "username": "erin_search",
+            "email": "erin_search@example.com",
+            "password": "string",
+            "role": "viewer",
+        },
+    )
+    response = await client.post(
+        "/auth/login", data={"username": "erin_search", "password": "string"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    first = await client.get(
+        "/content/articles/search/", params={"q": "quokka", "limit": 2}, headers=headers
+    )
+    assert first.status_code == 200
+    assert len(first.json()) == 2
+    cursor = first.headers[NEXT_CURSOR_HEADER]
+    second = await client.get(
+        "/content/articles/search/",
+        params={"q": "quokka", "limit": 2, "cursor": cursor},
+        headers=headers,
+    )
+    assert second.status_code == 200
+    ids = [a["id"] for a in first.json() + second.json()]
+    assert len(ids) == len(set(ids)) == 3
+    assert NEXT_CURSOR_HEADER not in second.headers
@@ -0,0 +1,207 @@
+import json
+import pytest
+from sqlalchemy.future import select
+from ai_content_platform.app.modules.auth.principal import Principal
+from ai_content_platform.app.modules.chat.models import TokenUsage
+from ai_content_platform.app.modules.content import routes as content_routes
+from ai_content_platform.app.modules.content import services
+from ai_content_platform.app.modules.content.gemini_service import GeminiService
+from ai_content_platform.app.modules.content.llm_quota import llm_quota
+from ai_content_platform.app.modules.content.schemas import ArticleCreate
+from ai_content_platform.app.modules.users.models import User
+from ai_content_platform.tests.conftest import AsyncTestingSessionLocal
+
+ARTICLE_CHUNKS = ["Tides rise <", "<< and fall.\n<<<SUM", "MARY>>>", " Tides move."]
+
+
+def _model(monkeypatch, chunks):
+    prompts = []
+
+    async def generate_streaming_text(self, prompt, **kwargs):
+        prompts.append(prompt)
+        for chunk in chunks:
+            yield chunk
+
+    async def generate_text(self, prompt, **kwargs):
+        prompts.append(prompt)
+        return "Separate summary."
+
+    monkeypatch.setattr(
+        GeminiService, "generate_streaming_text", generate_streaming_text
+    )
+    monkeypatch.setattr(GeminiService, "generate_text", generate_text)
+    return prompts
+
+
+async def _collect(title):
+    return [event async for event in services.stream_article_generation(title, "notes")]
+
+
+@pytest.mark.asyncio
+async def test_body_streams_and_summary_splits_off_at_marker(monkeypatch):
+    prompts = _model(
+        monkeypatch,
+        ARTICLE_CHUNKS + [" Daily."],
+    )
+    events = await _collect("Tides")
+    content = [text for kind, text in events if kind == "content"]
+    assert "".join(content) == "Tides rise <<< and fall.\n"
+    # The first delta is forwarded before the rest of the article arrives
+    assert content[0] == "Tides rise "
+    assert events[-1] == ("summary", "Tides move. Daily.")
+    assert len(prompts) == 1 and services.SUMMARY_MARKER in prompts[0]
+
+
+@pytest.mark.asyncio
+async def test_missing_marker_falls_back_to_a_summary_call(monkeypatch):
+    prompts = _model(monkeypatch, ["Only the ", "article."])
+    events = await _collect("No summary")
+    assert "".join(t for k, t in events if k == "content") == "Only the article."
+    assert events[-1] == ("summary", "Separate summary.")
+    assert prompts[-1].endswith("Only the article.")
+
+
+@pytest.mark.asyncio
+async def test_queued_generation_is_served_from_the_response_cache(monkeypatch):
+    prompts = []
+
+    async def generate_text(self, prompt, **kwargs):
+        prompts.append(prompt)
+        return "".join(ARTICLE_CHUNKS)
+
+    monkeypatch.setattr(GeminiService, "generate_text", generate_text)
+    async with AsyncTestingSessionLocal() as db:
+        first, second = [
+            await services.ai_generate_article(db, "Cached tides", "notes", None, [])
+            for _ in range(2)
+        ]
+    assert len(prompts) == 1 and services.SUMMARY_MARKER in prompts[0]
+    assert first.id != second.id
+    assert first.content == second.content == "Tides rise <<< and fall."
+    assert first.summary == "Tides move."
+
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_sends_content_summary_and_article(client, monkeypatch):
+    _model(monkeypatch, ARTICLE_CHUNKS)
+    await client.post(
+        "/auth/register",
+        json={
+            "username": "sse_writer",
+            "email": "sse_writer@example.com",
+            "password": "string",
+            "role": "creator",
+        },
+    )
+    response = await client.post(
+        "/auth/login", data={"username": "sse_writer", "password": "string"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = await client.post(
+        "/content/articles/generate/stream",
+        json={"title": "Streamed tides", "content": "notes", "tag_names": []},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        kind, data = block.split("\n")
+        events.append((kind[len("event: ") :], json.loads(data[len("data: ") :])))
+    assert [kind for kind, _ in events[-2:]] == ["summary", "article"]
+    assert "".join(d["text"] for k, d in events if k == "content") == (
+        "Tides rise <<< and fall.\n"
+    )
+    article = events[-1][1]
+    assert article["title"] == "Streamed tides"
+    assert article["summary"] == "Tides move."
+
+
+@pytest.fixture
+def settled(monkeypatch):
+    calls = []
+
+    async def reserve(principal, prompt=""):
+        return "reservation"
+
+    async def settle(reservation, usage):
+        calls.append((reservation, usage.calls))
+
+    monkeypatch.setattr(llm_quota, "reserve", reserve)
+    monkeypatch.setattr(llm_quota, "settle", settle)
+    return calls
+
+
+def _failing_model(monkeypatch):
+    async def generate_streaming_text(self, prompt, usage=None, **kwargs):
+        yield "Half an "
+        # The upstream call is metered even though the stream breaks
+        usage.record(prompt, "Half an article")
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(
+        GeminiService, "generate_streaming_text", generate_streaming_text
+    )
+
+
+async def _author(username):
+    async with AsyncTestingSessionLocal() as db:
+        user = User(
+            username=username, email=f"{username}@example.com", hashed_password="x"
+        )
+        db.add(user)
+        await db.commit()
+    return Principal(id=user.id, username=username)
+
+
+async def _usage_rows(user_id):
+    async with AsyncTestingSessionLocal() as db:
+        return (
+            (
+                await db.execute(
+                    select(TokenUsage).where(
+                        TokenUsage.user_id == user_id,
+                        TokenUsage.purpose == "article",
+                    )
+                )
+            )
+            .scalars()
+            .all()
+        )
+
+
+@pytest.mark.asyncio
+async def test_usage_is_recorded_when_the_stream_fails(monkeypatch, settled):
+    _failing_model(monkeypatch)
+    user = await _author("sse_failure")
+    response = await content_routes.generate_article_ai_stream(
+        ArticleCreate(title="Broken", content="notes", tag_names=[]),
+        current_user=user,
+    )
+    events = [event async for event in response.body_iterator]
+    assert events[-1].startswith("event: error")
+    assert settled == [("reservation", 1)]
+    assert [row.tokens_used > 0 for row in await _usage_rows(user.id)] == [True]
+
+
+@pytest.mark.asyncio
+async def test_usage_is_recorded_when_the_client_disconnects(monkeypatch, settled):
+    user = await _author("sse_disconnect")
+
+    async def metered(self, prompt, usage=None, **kwargs):
+        usage.record(prompt, "Tides rise")
+        yield "Tides rise "
+        yield "and fall."
+
+    monkeypatch.setattr(GeminiService, "generate_streaming_text", metered)
+    response = await content_routes.generate_article_ai_stream(
+        ArticleCreate(title="Abandoned", content="notes", tag_names=[]),
+        current_user=user,
+    )
+    first = await response.body_iterator.__anext__()
+    assert first.startswith("event: content")
+    # Starlette closes the body iterator when the client goes away
+    await response.body_iterator.aclose()
+    assert settled == [("reservation", 1)]
+    assert len(await _usage_rows(user.id)) == 1
@@ -0,0 +1,124 @@
+import json
+import re
+import pytest
+from sqlalchemy import func
+from sqlalchemy.future import select
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.modules.chat.models import TokenUsage
+from ai_content_platform.app.modules.content import batch_summaries
+from ai_content_platform.app.modules.content.gemini_service import GeminiService
+from ai_content_platform.app.modules.content.models import Article
+from ai_content_platform.tests.conftest import AsyncTestingSessionLocal
+
+
+def test_short_articles_share_requests_and_long_ones_go_alone():
+    articles = [(1, "a" * 10), (2, "b" * 10), (3, "c" * 100), (4, "d" * 10)]
+    packs = batch_summaries.pack_articles(articles, max_chars=50, max_articles=8)
+    assert [[i for i, _ in pack] for pack in packs] == [[1, 2], [3], [4]]
+    assert len(packs[1][0][1]) == 50
+    packs = batch_summaries.pack_articles(articles[:2], max_chars=50, max_articles=1)
+    assert len(packs) == 2
+
+
+@pytest.mark.asyncio
+async def test_backfill_packs_writes_in_bulk_and_checkpoints(monkeypatch):
+    requests = []
+
+    async def generate_text(self, prompt, **kwargs):
+        requests.append(prompt)
+        if prompt.startswith(batch_summaries.PACK_PROMPT):
+            ids = re.findall(r"\[article (\d+)\]", prompt)
+            # Drop one entry to exercise the one-by-one retry
+            return json.dumps({i: f"packed summary {i}" for i in ids[:-1]})
+        return "single summary"
+
+    monkeypatch.setattr(GeminiService, "generate_text", generate_text)
+    monkeypatch.setattr(settings, "SUMMARY_BATCH_PAGE_SIZE", 3)
+    async with AsyncTestingSessionLocal() as db:
+        articles = [
+            Article(title=f"Backfill {i}", content=f"Backfill body {i}.")
+            for i in range(5)
+        ]
+        db.add_all(articles)
+        await db.commit()
+        ids = [a.id for a in articles]
+
+    report = await batch_summaries.summarize_missing(
+        concurrency=2, restart=True, session_factory=AsyncTestingSessionLocal
+    )
+    assert report.status == "finished" and report.failed == 0
+    assert report.summarized == report.articles >= 5
+    assert report.checkpoint >= ids[-1]
+    assert report.llm_requests == len(requests)
+    assert report.to_dict()["estimated_cost_usd"] >= 0
+    async with AsyncTestingSessionLocal() as db:
+        summaries = dict(
+            (
+                await db.execute(
+                    select(Article.id, Article.summary).where(Article.id.in_(ids))
+                )
+            ).all()
+        )
+    assert all(summaries.values())
+    assert any(s.startswith("packed summary") for s in summaries.values())
+    assert "single summary" in summaries.values()
+
+    # Resuming from the checkpoint finds nothing left to do
+    again = await batch_summaries.summarize_missing(
+        session_factory=AsyncTestingSessionLocal
+    )
+    assert again.articles == 0 and again.checkpoint == report.checkpoint
+
+
+@pytest.mark.asyncio
+async def test_failed_articles_hold_the_checkpoint_and_usage_is_stored(monkeypatch):
+    failing = True
+
+    async def generate_text(self, prompt, usage=None, **kwargs):
+        if failing and "Unlucky body" in prompt:
+            raise RuntimeError("upstream error")
+        if usage is not None:
+            usage.record(prompt, "a summary")
+        return "a summary"
+
+    async def summary_usage_rows():
+        async with AsyncTestingSessionLocal() as db:
+            return await db.scalar(
+                select(func.count())
+                .select_from(TokenUsage)
+                .where(TokenUsage.purpose == "summary")
+            )
+
+    monkeypatch.setattr(GeminiService, "generate_text", generate_text)
+    monkeypatch.setattr(settings, "SUMMARY_BATCH_PAGE_SIZE", 2)
+    monkeypatch.setattr(settings, "SUMMARY_PACK_MAX_ARTICLES", 1)
+    async with AsyncTestingSessionLocal() as db:
+        articles = [
+            Article(title="Lucky", content="Lucky body."),
+            Article(title="Unlucky", content="Unlucky body."),
+            Article(title="Later", content="Later body."),
+            Article(title="Last", content="Last body."),
+        ]
+        db.add_all(articles)
+        await db.commit()
+        ids = [a.id for a in articles]
+    rows_before = await summary_usage_rows()
+
+    report = await batch_summaries.summarize_missing(
+        restart=True, session_factory=AsyncTestingSessionLocal
+    )
+    assert report.status == "finished" and report.failed == 1
+    # Later pages are still summarised, but the checkpoint stays below the failure
+    assert report.checkpoint == ids[1] - 1
+    assert report.usage.calls == report.llm_requests
+    assert await summary_usage_rows() > rows_before
+    async with AsyncTestingSessionLocal() as db:
+        stored = await db.get(Article, ids[3])
+        assert stored.summary == "a summary"
+
+    failing = False
+    again = await batch_summaries.summarize_missing(
+        session_factory=AsyncTestingSessionLocal
+    )
+    assert again.articles == 1 and again.summarized == 1
+    assert again.checkpoint == ids[1]
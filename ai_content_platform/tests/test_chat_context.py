@@ -0,0 +1,109 @@
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+from ai_content_platform.app.modules.chat import context as chat_context_module
+from ai_content_platform.app.modules.chat import services
+from ai_content_platform.app.modules.chat.context import HotContextCache, load_context
+from ai_content_platform.app.modules.chat.models import Conversation
+from ai_content_platform.app.modules.users.models import User
+from ai_content_platform.tests.conftest import AsyncTestingSessionLocal, engine
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_execute)
+
+
+@pytest.fixture
+def hot_cache(monkeypatch):
+    cache = HotContextCache(maxsize=10, ttl=60, buffer_size=3)
+    monkeypatch.setattr(chat_context_module, "chat_context", cache)
+    monkeypatch.setattr(services, "chat_context", cache)
+    return cache
+
+
+async def _conversation(db, name, messages):
+    user = User(username=name, email=f"{name}@example.com", hashed_password="x")
+    db.add(user)
+    await db.commit()
+    conv = Conversation(user_id=user.id, summary="Earlier: talked about llamas.")
+    db.add(conv)
+    await db.commit()
+    for sender, content in messages:
+        await services.add_message(db, conv.id, sender, content)
+    return conv
+
+
+@pytest.mark.asyncio
+async def test_miss_is_one_statement_and_hit_needs_none(hot_cache):
+    async with AsyncTestingSessionLocal() as db:
+        conv = await _conversation(
+            db,
+            "context_hit",
+            [
+                ("user", "Tell me about alpacas"),
+                ("ai", "Alpacas are smaller than llamas"),
+                ("user", "And their wool?"),
+                ("ai", "Alpaca fibre is soft"),
+            ],
+        )
+        with count_statements() as statements:
+            context = await load_context(db, conv.id, last_n=2, keywords=["alpaca"])
+        assert len(statements) == 1
+        assert context.user_id == conv.user_id
+        assert context.summary == "Earlier: talked about llamas."
+        assert [m.content for m in context.recent] == [
+            "And their wool?",
+            "Alpaca fibre is soft",
+        ]
+        assert context.matches == [
+            "Alpaca fibre is soft",
+            "Alpacas are smaller than llamas",
+            "Tell me about alpacas",
+        ]
+
+        # The buffer holds the last 3 messages; within that nothing is queried
+        with count_statements() as statements:
+            context = await load_context(db, conv.id, last_n=3)
+        assert statements == []
+        assert context.recent[0].content == "Alpacas are smaller than llamas"
+
+        # New messages and summaries write through
+        await services.add_message(db, conv.id, "user", "Thanks")
+        hot_cache.set_summary(conv.id, "Alpacas and llamas.")
+        with count_statements() as statements:
+            context = await load_context(db, conv.id, last_n=2)
+        assert statements == []
+        assert context.summary == "Alpacas and llamas."
+        assert [m.content for m in context.recent] == ["Alpaca fibre is soft", "Thanks"]
+
+        # More than the buffer holds goes back to the database
+        with count_statements() as statements:
+            context = await load_context(db, conv.id, last_n=10)
+        assert len(statements) == 1 and len(context.recent) == 5
+
+        assert await load_context(db, 10**9) is None
+
+
+@pytest.mark.asyncio
+async def test_load_that_raced_a_write_does_not_seed_the_cache(hot_cache):
+    async with AsyncTestingSessionLocal() as db:
+        conv = await _conversation(db, "context_race", [("user", "Hello")])
+        generation = hot_cache.generation(conv.id)
+        await services.add_message(db, conv.id, "ai", "Hi there")
+        context = await load_context(db, conv.id)
+        # Seeding with a stale generation is ignored
+        hot_cache.seed(generation, context, complete=True)
+        assert hot_cache.get(conv.id, 1).messages[-1].content == "Hi there"
+        hot_cache._buffers.clear()
+        hot_cache.seed(generation, context, complete=True)
+        assert hot_cache.get(conv.id, 1) is None
@@ -0,0 +1,159 @@
+import asyncio
+import math
+import pytest
+from sqlalchemy import update
+from sqlalchemy.future import select
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.modules.chat import embeddings, retrieval, services
+from ai_content_platform.app.modules.chat.context import ConversationContext
+from ai_content_platform.app.modules.chat.models import Message, MessageEmbedding
+from ai_content_platform.app.modules.users.models import User
+from ai_content_platform.tests.conftest import AsyncTestingSessionLocal
+
+TOPICS = [
+    "My sourdough bread keeps coming out flat after baking",
+    "Which running shoes are best for marathon training?",
+    "The bread starter needs feeding twice a day",
+    "Can you recommend a good laptop for programming?",
+]
+
+
+def test_hashing_embedder_is_normalised_and_ranks_shared_words():
+    embedder = embeddings.HashingEmbedder(256)
+    query = embedder.embed_one("how long should sourdough bread rise")
+    bread, shoes = (embedder.embed_one(text) for text in TOPICS[:2])
+    assert math.isclose(sum(v * v for v in bread), 1.0, rel_tol=1e-5)
+    assert sum(a * b for a, b in zip(query, bread)) > sum(
+        a * b for a, b in zip(query, shoes)
+    )
+    blob = embeddings.encode_vector(bread)
+    assert len(blob) == 4 * 256 and embeddings.decode_vector(blob) == bread
+
+
+@pytest.mark.asyncio
+async def test_related_messages_are_found_without_keywords(monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_EMBEDDING_LAG_SECONDS", 0)
+    monkeypatch.setattr(retrieval.vector_index, "enabled", True)
+    retrieval.vector_index.clear()
+    async with AsyncTestingSessionLocal() as db:
+        user = User(username="recall", email="recall@example.com", hashed_password="x")
+        db.add(user)
+        await db.commit()
+        conv = await services.start_conversation(db, user.id)
+        ids = [
+            (await services.add_message(db, conv.id, "user", text)).id
+            for text in TOPICS
+        ]
+
+        # The background pass stores vectors for every settled message
+        while await embeddings.embed_pending(db, batch_size=100) >= 100:
+            pass
+        stored = (
+            await db.execute(
+                select(MessageEmbedding.message_id).where(
+                    MessageEmbedding.conversation_id == conv.id
+                )
+            )
+        ).scalars()
+        assert sorted(stored) == ids
+
+        related = await retrieval.related_messages(
+            db, conv.id, "why is my sourdough bread flat", k=2
+        )
+        assert related[0] == TOPICS[0]
+        assert TOPICS[1] not in related
+        related = await retrieval.related_messages(
+            db, conv.id, "why is my sourdough bread flat", exclude=[ids[0]], k=1
+        )
+        assert related == [TOPICS[2]]
+
+        # A message the embedder has not reached yet is left out, without
+        # embedding it on the request path, until its vector is stored
+        await services.add_message(db, conv.id, "user", "Any tips for a laptop bag?")
+        calls = []
+        embed = embeddings.embedder.embed
+
+        async def counting_embed(texts):
+            calls.append(texts)
+            return await embed(texts)
+
+        monkeypatch.setattr(embeddings.embedder, "embed", counting_embed)
+        context = ConversationContext(conv.id, user.id, matches=[TOPICS[3]])
+        await retrieval.add_related(db, context, "which laptop bag should I get")
+        assert "Any tips for a laptop bag?" not in context.matches
+        assert calls == [["which laptop bag should I get"]]
+        assert len((await retrieval.vector_index.vectors(db, conv.id)).ids) == 4
+
+        await embeddings.embed_pending(db, batch_size=100)
+        context = ConversationContext(conv.id, user.id, matches=[TOPICS[3]])
+        await retrieval.add_related(db, context, "which laptop bag should I get")
+        assert context.matches[0] == TOPICS[3]
+        assert "Any tips for a laptop bag?" in context.matches
+        assert len(context.matches) == len(set(context.matches))
+        entry = await retrieval.vector_index.vectors(db, conv.id)
+        assert len(entry.ids) == 5
+
+
+@pytest.mark.asyncio
+async def test_messages_without_a_timestamp_do_not_stall_the_embedder(monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_EMBEDDING_LAG_SECONDS", 0)
+    async with AsyncTestingSessionLocal() as db:
+        user = User(username="embed_null", email="en@example.com", hashed_password="x")
+        db.add(user)
+        await db.commit()
+        conv = await services.start_conversation(db, user.id)
+        while await embeddings.embed_pending(db, batch_size=100) >= 100:
+            pass
+        broken = await services.add_message(db, conv.id, "user", "no timestamp")
+        await db.execute(
+            update(Message).where(Message.id == broken.id).values(created_at=None)
+        )
+        await db.commit()
+        later = await services.add_message(db, conv.id, "user", "has a timestamp")
+
+        assert await embeddings.embed_pending(db, batch_size=100) == 1
+        stored = (
+            await db.execute(
+                select(MessageEmbedding.message_id).where(
+                    MessageEmbedding.conversation_id == conv.id
+                )
+            )
+        ).scalars()
+        assert list(stored) == [later.id]
+
+
+@pytest.mark.asyncio
+async def test_prompt_embedding_is_cached_and_time_bounded(monkeypatch):
+    calls = []
+
+    class SlowEmbedder:
+        name = "slow-test"
+        delay = 0.0
+
+        async def embed(self, texts):
+            calls.append(texts)
+            await asyncio.sleep(self.delay)
+            return [embeddings.normalize([1.0, 0.0])]
+
+    slow = SlowEmbedder()
+    monkeypatch.setattr(retrieval, "embedder", slow)
+    monkeypatch.setattr(settings, "CHAT_RETRIEVAL_EMBED_TIMEOUT_SECONDS", 0.05)
+    first = await retrieval.embed_query("tide tables")
+    assert await retrieval.embed_query("tide tables") == first
+    assert calls == [["tide tables"]]
+
+    slow.delay = 1.0
+    with pytest.raises(asyncio.TimeoutError):
+        await retrieval.embed_query("a slow prompt")
+    # The reply goes ahead without retrieval
+    monkeypatch.setattr(retrieval.vector_index, "enabled", True)
+
+    async def vectors(db, conversation_id):
+        entry = retrieval._Vectors()
+        entry.extend([1], [embeddings.normalize([1.0, 0.0])], 10)
+        return entry
+
+    monkeypatch.setattr(retrieval.vector_index, "vectors", vectors)
+    context = ConversationContext(conversation_id=1, user_id=1)
+    await retrieval.add_related(None, context, "another slow prompt")
+    assert context.matches == []
@@ -8,7 +8,7 @@ from ai_content_platform.app.modules.users.models import User
 from ai_content_platform.tests.conftest import AsyncTestingSessionLocal
 import pytest
 import asyncio
-from ai_content_platform.app.modules.content import gemini_service
+from ai_content_platform.app.modules.content import gemini_service, jobs
 
 
 @pytest.fixture(autouse=True)
@@ -26,9 +26,21 @@ def mock_gemini(monkeypatch):
             return "This is a summary of the AI article."
         return "This is AI generated content."
 
+    async def mock_generate_streaming_text(self, prompt, **kwargs):
+        for chunk in ("This is AI ", "generated content.\n<<<SUM", "MARY>>>\n"):
+            yield chunk
+        yield "This is a summary of the AI article."
+
     monkeypatch.setattr(
         gemini_service.GeminiService, "generate_text", mock_generate_text
     )
+    monkeypatch.setattr(
+        gemini_service.GeminiService,
+        "generate_streaming_text",
+        mock_generate_streaming_text,
+    )
+    # Generation jobs are queued on Redis; skip publishing in tests
+    monkeypatch.setattr(jobs, "publish_event", lambda *args: None)
 
 
 @pytest.mark.asyncio
@@ -326,14 +338,29 @@ async def test_create_article_with_new_and_existing_tags(client):
         ),
         timeout=10,
     )
-    if ai_gen_response.status_code != 200:
+    if ai_gen_response.status_code != 202:
         print(
             "AI generate failed:",
             ai_gen_response.status_code,
             ai_gen_response.text,
             flush=True,
         )
-    assert ai_gen_response.status_code == 200
+    assert ai_gen_response.status_code == 202
+    job = get_json_or_debug(ai_gen_response)
+    assert job["status"] == "queued"
+
+    # Run the job as the content worker would, then poll its status
+    await jobs.run_generation_job(job["id"], AsyncTestingSessionLocal)
+    job_response = await asyncio.wait_for(
+        client.get(f"/content/jobs/{job['id']}", headers=headers), timeout=10
+    )
+    assert job_response.status_code == 200
+    job = get_json_or_debug(job_response)
+    assert job["status"] == "succeeded" and job["article_id"]
+    ai_gen_response = await asyncio.wait_for(
+        client.get(f"/content/articles/{job['article_id']}", headers=headers),
+        timeout=10,
+    )
     ai_data = get_json_or_debug(ai_gen_response)
     assert (
         ai_data is not None
@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from ai_content_platform.app.modules.chat import access, services
+from ai_content_platform.app.modules.chat.schemas import conversation_to_out
+from ai_content_platform.app.modules.users.models import User
+from ai_content_platform.tests.conftest import AsyncTestingSessionLocal
+from ai_content_platform.tests.test_chat_context import count_statements
+
+
+@pytest.mark.asyncio
+async def test_access_check_selects_only_the_owner_and_is_cached():
+    async with AsyncTestingSessionLocal() as db:
+        user = User(username="owner", email="owner@example.com", hashed_password="x")
+        db.add(user)
+        await db.commit()
+        conv = await services.start_conversation(db, user.id, "Mine")
+        for i in range(5):
+            await services.add_message(db, conv.id, "user", f"message {i}")
+        access.conversation_owners.clear()
+
+        with count_statements() as statements:
+            await access.require_conversation_access(db, conv.id, user)
+            await access.require_conversation_access(db, conv.id, user)
+        assert len(statements) == 1
+        assert "messages" not in statements[0]
+
+        with pytest.raises(HTTPException) as denied:
+            await access.require_conversation_access(
+                db, conv.id, SimpleNamespace(id=user.id + 1)
+            )
+        assert denied.value.status_code == 404
+        with pytest.raises(HTTPException):
+            await access.require_conversation_access(db, 10**9, user)
+
+
+@pytest.mark.asyncio
+async def test_get_conversation_loads_only_the_latest_messages():
+    async with AsyncTestingSessionLocal() as db:
+        user = User(username="pager", email="pager@example.com", hashed_password="x")
+        db.add(user)
+        await db.commit()
+        conv = await services.start_conversation(db, user.id)
+        assert conversation_to_out(conv).messages == []
+        for i in range(5):
+            await services.add_message(db, conv.id, "user", f"message {i}")
+
+    async with AsyncTestingSessionLocal() as db:
+        conv = await services.get_conversation(db, conv.id, messages_limit=2)
+        out = conversation_to_out(conv)
+        assert [m.content for m in out.messages] == ["message 3", "message 4"]
+        assert await services.get_conversation(db, 10**9) is None
@@ -0,0 +1,94 @@
+import pytest
+from sqlalchemy import update
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.modules.chat import services
+from ai_content_platform.app.modules.chat.models import Conversation
+from ai_content_platform.app.modules.content.gemini_service import GeminiService
+from ai_content_platform.app.modules.users.models import User
+from ai_content_platform.tests.conftest import AsyncTestingSessionLocal
+
+
+@pytest.fixture
+def prompts(monkeypatch):
+    sent = []
+
+    async def generate_text(self, prompt, **kwargs):
+        sent.append(prompt)
+        return f"summary #{len(sent)}"
+
+    monkeypatch.setattr(GeminiService, "generate_text", generate_text)
+    return sent
+
+
+async def _conversation(db, name, count):
+    user = User(username=name, email=f"{name}@example.com", hashed_password="x")
+    db.add(user)
+    await db.commit()
+    conv = await services.start_conversation(db, user.id)
+    for i in range(count):
+        sender = "user" if i % 2 == 0 else "assistant"
+        await services.add_message(db, conv.id, sender, f"turn {i}")
+    return conv
+
+
+@pytest.mark.asyncio
+async def test_summary_reads_only_new_messages(prompts):
+    async with AsyncTestingSessionLocal() as db:
+        conv = await _conversation(db, "summary_delta", 4)
+        assert await services.update_conversation_summary(db, conv.id, threshold=4)
+        assert "turn 0" in prompts[0] and "turn 3" in prompts[0]
+
+        # Below the next threshold nothing is read or sent
+        await services.add_message(db, conv.id, "user", "turn 4")
+        assert not await services.update_conversation_summary(db, conv.id, 4)
+        assert len(prompts) == 1
+
+        for i in range(5, 8):
+            await services.add_message(db, conv.id, "user", f"turn {i}")
+        assert await services.update_conversation_summary(db, conv.id, 4)
+        assert "summary #1" in prompts[1] and "turn 4" in prompts[1]
+        assert "turn 3" not in prompts[1]
+
+        stored = await db.get(Conversation, conv.id, populate_existing=True)
+        assert stored.message_count == 8 and stored.summary_msg_count == 8
+        assert stored.summary == "summary #2" and stored.summary_version == 2
+
+
+@pytest.mark.asyncio
+async def test_long_history_is_summarised_in_chunks(prompts, monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_SUMMARY_CHUNK_MESSAGES", 2)
+    monkeypatch.setattr(settings, "CHAT_SUMMARY_FANOUT", 2)
+    async with AsyncTestingSessionLocal() as db:
+        conv = await _conversation(db, "summary_chunks", 7)
+        assert await services.update_conversation_summary(db, conv.id)
+    # 4 chunks, merged 2 at a time, then one final call
+    chunk_prompts = [p for p in prompts if p.startswith(services.CHUNK_SUMMARY_PROMPT)]
+    merge_prompts = [p for p in prompts if p.startswith(services.MERGE_SUMMARY_PROMPT)]
+    assert len(chunk_prompts) == 4 and len(merge_prompts) == 2
+    assert len(prompts) == 7
+    assert prompts[-1].startswith(services.FIRST_SUMMARY_PROMPT)
+
+
+@pytest.mark.asyncio
+async def test_summary_that_lost_a_race_is_discarded(monkeypatch):
+    async with AsyncTestingSessionLocal() as db:
+        conv = await _conversation(db, "summary_race", 2)
+
+    async def generate_text(self, prompt, **kwargs):
+        # Another worker stores its summary while this one waits on the LLM
+        async with AsyncTestingSessionLocal() as other:
+            await other.execute(
+                update(Conversation)
+                .where(Conversation.id == conv.id)
+                .values(
+                    summary="theirs", summary_version=Conversation.summary_version + 1
+                )
+            )
+            await other.commit()
+        return "mine"
+
+    monkeypatch.setattr(GeminiService, "generate_text", generate_text)
+    async with AsyncTestingSessionLocal() as db:
+        assert not await services.update_conversation_summary(db, conv.id)
+        stored = await db.get(Conversation, conv.id, populate_existing=True)
+        assert stored.summary == "theirs" and stored.summary_version == 1
@@ -0,0 +1,84 @@
+import pytest
+from passlib.hash import bcrypt
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.modules.auth import services as auth_services
+from ai_content_platform.app.modules.auth.credential_cache import credential_cache
+from ai_content_platform.app.modules.users.models import User
+from ai_content_platform.tests.conftest import AsyncTestingSessionLocal
+
+
+@pytest.fixture
+def verifications(monkeypatch):
+    calls = []
+    verify = auth_services.verify_password_async
+
+    async def counting_verify(plain_password, hashed_password):
+        calls.append(plain_password)
+        return await verify(plain_password, hashed_password)
+
+    monkeypatch.setattr(auth_services, "verify_password_async", counting_verify)
+    return calls
+
+
+async def _login(client, username, password):
+    return await client.post(
+        "/auth/login", data={"username": username, "password": password}
+    )
+
+
+@pytest.mark.asyncio
+async def test_cached_credential_is_reused_until_the_password_changes(
+    client, verifications
+):
+    await client.post(
+        "/auth/register",
+        json={
+            "username": "dave_cache",
+            "email": "dave_cache@example.com",
+            "password": "first",
+            "role": "viewer",
+        },
+    )
+    first = await _login(client, "dave_cache", "first")
+    second = await _login(client, "dave_cache", "first")
+    assert first.status_code == second.status_code == 200
+    assert verifications == ["first"]
+    # A wrong password is never answered from the cache
+    assert (await _login(client, "dave_cache", "guess")).status_code == 401
+    assert verifications == ["first", "guess"]
+
+    headers = {"Authorization": f"Bearer {second.json()['access_token']}"}
+    response = await client.put(
+        "/users/me",
+        json={"username": None, "password": "second", "email": None, "avatar": None},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert (await _login(client, "dave_cache", "first")).status_code == 401
+    assert (await _login(client, "dave_cache", "second")).status_code == 200
+    assert verifications[-2:] == ["first", "second"]
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_passwords_below_the_configured_cost():
+    cheap = bcrypt.using(rounds=4).hash("legacy")
+    async with AsyncTestingSessionLocal() as db:
+        db.add(
+            User(
+                username="erin_legacy", email="erin@example.com", hashed_password=cheap
+            )
+        )
+        await db.commit()
+        user = await auth_services.authenticate_user("erin_legacy", "legacy", db)
+        assert user is not None
+
+        stored = await db.get(User, user.id, populate_existing=True)
+        assert stored.hashed_password != cheap
+        assert bcrypt.from_string(stored.hashed_password).rounds == (
+            settings.BCRYPT_ROUNDS
+        )
+        assert bcrypt.verify("legacy", stored.hashed_password)
+        # The upgraded hash is what the cache remembers
+        assert credential_cache.is_verified(
+            "erin_legacy", "legacy", stored.hashed_password
+        )
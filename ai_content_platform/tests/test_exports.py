@@ -0,0 +1,164 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.modules.admin import exports
+from ai_content_platform.app.modules.admin.exports import _frame, _gzip
+from ai_content_platform.app.modules.content.models import Article
+from ai_content_platform.app.modules.users.models import User
+from ai_content_platform.tests.conftest import AsyncTestingSessionLocal
+
+
+async def _rows(*objs):
+    for obj in objs:
+        yield json.dumps(obj).encode()
+
+
+async def _collect(chunks):
+    return b"".join([chunk async for chunk in chunks])
+
+
+@pytest.mark.asyncio
+async def test_ndjson_and_json_array_framing():
+    ndjson = await _collect(_frame(_rows({"id": 1}, {"id": 2}), "ndjson"))
+    assert [json.loads(line) for line in ndjson.splitlines()] == [
+        {"id": 1},
+        {"id": 2},
+    ]
+    array = await _collect(_frame(_rows({"id": 1}, {"id": 2}), "json"))
+    assert json.loads(array) == [{"id": 1}, {"id": 2}]
+    assert json.loads(await _collect(_frame(_rows(), "json"))) == []
+
+
+@pytest.mark.asyncio
+async def test_gzip_stream_decompresses_to_framed_output():
+    body = await _collect(_gzip(_frame(_rows({"id": 1}, {"id": 2}), "ndjson")))
+    assert gzip.decompress(body) == b'{"id": 1}\n{"id": 2}\n'
+
+
+async def _admin_headers(client):
+    await client.post(
+        "/auth/register",
+        json={
+            "username": "export_admin",
+            "email": "export_admin@example.com",
+            "password": "secret",
+            "role": "admin",
+        },
+    )
+    response = await client.post(
+        "/auth/login", data={"username": "export_admin", "password": "secret"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_article_export_route_filters_by_updated_since(client):
+    headers = await _admin_headers(client)
+    # Backdated, so every other test's articles are newer than `since`
+    since = datetime(2001, 1, 1)
+    async with AsyncTestingSessionLocal() as db:
+        articles = [
+            Article(
+                title=f"Export {i}",
+                content=f"Export body {i}.",
+                updated_at=since + timedelta(minutes=i - 1),
+            )
+            for i in range(4)
+        ]
+        db.add_all(articles)
+        await db.commit()
+        ids = [a.id for a in articles]
+
+    response = await client.get(
+        "/admin/articles/export",
+        params={"updated_since": since.isoformat()},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    exported = [row["id"] for row in rows]
+    assert exported == sorted(exported)
+    # The first two articles were not updated after `since`
+    assert [i for i in exported if i in ids] == ids[2:]
+    first = rows[exported.index(ids[2])]
+    assert first["title"] == "Export 2" and first["tags"] == []
+
+    response = await client.get(
+        "/admin/articles/export",
+        params={"updated_since": since.isoformat(), "format": "json", "gzip": True},
+        headers=headers,
+    )
+    assert response.headers["content-type"] == "application/gzip"
+    rows = json.loads(gzip.decompress(response.content))
+    assert [row["id"] for row in rows] == exported
+
+
+@pytest.mark.asyncio
+async def test_user_export_route_resumes_after_id(client):
+    headers = await _admin_headers(client)
+    async with AsyncTestingSessionLocal() as db:
+        users = [
+            User(
+                username=f"exported_{i}",
+                email=f"exported_{i}@example.com",
+                hashed_password="x",
+            )
+            for i in range(5)
+        ]
+        db.add_all(users)
+        await db.commit()
+        ids = [u.id for u in users]
+
+    response = await client.get(
+        "/admin/users/export", params={"after_id": ids[1]}, headers=headers
+    )
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == ids[2:]
+    assert [row["username"] for row in rows] == [f"exported_{i}" for i in (2, 3, 4)]
+
+    everyone = await client.get("/admin/users/export", headers=headers)
+    all_ids = [json.loads(line)["id"] for line in everyone.text.splitlines()]
+    assert all_ids == sorted(all_ids) and set(ids) <= set(all_ids)
+
+
+@pytest.mark.asyncio
+async def test_export_streams_rows_in_batches(monkeypatch):
+    async with AsyncTestingSessionLocal() as db:
+        db.add_all(
+            User(
+                username=f"streamed_{i}", email=f"s{i}@example.com", hashed_password="x"
+            )
+            for i in range(6)
+        )
+        await db.commit()
+    yield_per = []
+    stream_scalars = AsyncSession.stream_scalars
+
+    async def recording_stream_scalars(self, stmt, *args, **kwargs):
+        yield_per.append(stmt.get_execution_options().get("yield_per"))
+        return await stream_scalars(self, stmt, *args, **kwargs)
+
+    monkeypatch.setattr(AsyncSession, "stream_scalars", recording_stream_scalars)
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_BYTES", 1)
+    serialized = []
+
+    def serialize(user):
+        serialized.append(user.id)
+        return json.dumps({"id": user.id}).encode()
+
+    body = exports.export_stream(
+        select(User).order_by(User.id), serialize, "ndjson", gzip=False
+    )
+    first = await body.__anext__()
+    # Rows are written out as they are read, not collected up front
+    assert json.loads(first) == {"id": serialized[0]} and len(serialized) == 1
+    rest = [chunk async for chunk in body]
+    assert len(rest) == len(serialized) - 1 >= 5
+    assert yield_per == [2]
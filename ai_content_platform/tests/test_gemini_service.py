@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+import pytest
+from ai_content_platform.app.modules.content.gemini_service import GeminiService
+
+
+class FakeStream:
+    def __init__(self, texts):
+        self.texts = list(texts)
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.texts:
+            raise StopAsyncIteration
+        return SimpleNamespace(text=self.texts.pop(0))
+
+    async def aclose(self):
+        self.closed = True
+
+
+def _service(monkeypatch, stream):
+    service = GeminiService(api_key="test")
+
+    async def generate_content_stream(model, contents):
+        return stream
+
+    monkeypatch.setattr(
+        service.client.aio.models, "generate_content_stream", generate_content_stream
+    )
+    return service
+
+
+@pytest.mark.asyncio
+async def test_streaming_forwards_chunks_as_they_arrive(monkeypatch):
+    stream = FakeStream(["Hello", "", " world"])
+    service = _service(monkeypatch, stream)
+    chunks = [chunk async for chunk in service.generate_streaming_text("hi")]
+    assert chunks == ["Hello", " world"]
+    assert stream.closed
+
+
+@pytest.mark.asyncio
+async def test_streaming_closes_upstream_when_consumer_stops(monkeypatch):
+    stream = FakeStream(["a", "b", "c"])
+    service = _service(monkeypatch, stream)
+    chunks = service.generate_streaming_text("hi")
+    assert await chunks.__anext__() == "a"
+    await chunks.aclose()
+    assert stream.closed and stream.texts == ["b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_streaming_without_text_is_an_error(monkeypatch):
+    service = _service(monkeypatch, FakeStream([]))
+    with pytest.raises(RuntimeError):
+        async for _ in service.generate_streaming_text("hi"):
+            pass
@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy.future import select
+from ai_content_platform.app.modules.content import jobs
+from ai_content_platform.app.modules.content.gemini_service import GeminiService
+from ai_content_platform.app.modules.content.models import Article, GenerationJob
+from ai_content_platform.tests.conftest import AsyncTestingSessionLocal
+
+
+@pytest.fixture
+def published(monkeypatch):
+    events = []
+    monkeypatch.setattr(
+        jobs,
+        "publish_event",
+        lambda stream, event_type, payload: events.append(
+            (stream, event_type, payload)
+        ),
+    )
+    return events
+
+
+def _llm(monkeypatch, reply):
+    async def generate_text(self, prompt, **kwargs):
+        if isinstance(reply, Exception):
+            raise reply
+        return f"{reply}: {prompt[:40]}"
+
+    async def generate_streaming_text(self, prompt, **kwargs):
+        yield await generate_text(self, prompt)
+
+    monkeypatch.setattr(GeminiService, "generate_text", generate_text)
+    monkeypatch.setattr(
+        GeminiService, "generate_streaming_text", generate_streaming_text
+    )
+
+
+async def _enqueue(title):
+    async with AsyncTestingSessionLocal() as db:
+        return await jobs.enqueue_generation(
+            db, None, title, "Some notes.", None, ["jobs"]
+        )
+
+
+@pytest.mark.asyncio
+async def test_job_runs_in_worker_and_emits_content_generated(monkeypatch, published):
+    _llm(monkeypatch, "generated")
+    job = await _enqueue("Queued article")
+    assert job.status == "queued"
+    assert published == [("content_jobs", "GENERATE_ARTICLE", {"job_id": job.id})]
+
+    done = await jobs.run_generation_job(job.id, AsyncTestingSessionLocal)
+    assert done.status == "succeeded" and done.attempts == 1
+    async with AsyncTestingSessionLocal() as db:
+        article = await db.get(Article, done.article_id)
+        assert article.flagged and article.content.startswith("generated")
+    assert published[-1] == (
+        "content_events",
+        "CONTENT_GENERATED",
+        {"content_id": done.article_id, "job_id": job.id},
+    )
+
+    # Redelivery of a finished job does nothing
+    again = await jobs.run_generation_job(job.id, AsyncTestingSessionLocal)
+    assert again.article_id == done.article_id and again.attempts == 1
+    statuses = [
+        j.status async for j in jobs.watch_job(job.id, AsyncTestingSessionLocal)
+    ]
+    assert statuses == ["succeeded"]
+
+
+@pytest.mark.asyncio
+async def test_failed_generation_is_recorded_on_the_job(monkeypatch, published):
+    _llm(monkeypatch, RuntimeError("quota exceeded"))
+    job = await _enqueue("Doomed article")
+    done = await jobs.run_generation_job(job.id, AsyncTestingSessionLocal)
+    assert done.status == "failed" and "quota exceeded" in done.error
+    assert done.article_id is None and done.finished_at is not None
+    assert [event for _, event, _ in published] == ["GENERATE_ARTICLE"]
+
+
+@pytest.mark.asyncio
+async def test_enqueue_failure_marks_job_failed(monkeypatch):
+    def unavailable(*args):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(jobs, "publish_event", unavailable)
+    with pytest.raises(ConnectionError):
+        await _enqueue("Never queued")
+    async with AsyncTestingSessionLocal() as db:
+        job = (
+            await db.execute(
+                select(GenerationJob).where(GenerationJob.title == "Never queued")
+            )
+        ).scalar_one()
+    assert job.status == "failed" and job.error == "Could not enqueue job"
+    assert job.finished_at is not None
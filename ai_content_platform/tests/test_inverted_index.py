@@ -0,0 +1,158 @@
+from datetime import timedelta
+import pytest
+from sqlalchemy import update
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.modules.content import services
+from ai_content_platform.app.modules.content.models import Article
+from ai_content_platform.app.modules.content.inverted_index import (
+    InvertedIndex,
+    article_index,
+    catch_up_article_index,
+    warm_article_index,
+)
+from ai_content_platform.tests.conftest import AsyncTestingSessionLocal
+
+
+def _index():
+    index = InvertedIndex()
+    index.add(1, "Ocelot habitats", "Wild cats of the rainforest.", ["wildlife"])
+    index.add(2, "Field notes", "An ocelot crossed the rainforest trail.", ["travel"])
+    index.add(3, "Budget report", "Quarterly numbers.", [])
+    return index
+
+
+def _ids(pairs):
+    return [article_id for _, article_id in pairs]
+
+
+def test_bm25_ranks_title_hits_first_and_requires_every_term():
+    index = _index()
+    assert _ids(index.search([["ocelot"]], 10)) == [1, 2]
+    assert _ids(index.search([["ocelot"], ["trail"]], 10)) == [2]
+    assert index.search([["ocelot"], ["missing"]], 10) == []
+    assert _ids(index.search([["ocelot"]], 10, tags=["travel"])) == [2]
+    assert _ids(index.search([index.expand("ocel")], 10)) == [1, 2]
+
+
+def test_updates_and_deletes_tombstone_until_compaction():
+    index = _index()
+    index.add(1, "Renamed", "Nothing about cats.", [])
+    index.remove(3)
+    assert len(index) == 2 and index.dead == 2
+    assert _ids(index.search([["ocelot"]], 10)) == [2]
+    index.compact()
+    assert index.dead == 0
+    assert _ids(index.search([["renamed"]], 10)) == [1]
+    assert _ids(index.search([["ocelot"]], 10)) == [2]
+
+
+def test_search_pages_continue_after_last_pair():
+    index = _index()
+    first = index.search([["rainforest"]], 1)
+    rest = index.search([["rainforest"]], 10, after=first[-1])
+    assert _ids(first + rest) == _ids(index.search([["rainforest"]], 10))
+
+
+def test_snapshot_restore_maps_postings_and_copies_on_write(tmp_path):
+    path = str(tmp_path / "articles.idx")
+    index = _index()
+    index.snapshot(path)
+
+    restored = InvertedIndex()
+    assert restored.restore(path)
+    assert restored.search([["ocelot"]], 10) == index.search([["ocelot"]], 10)
+    assert not isinstance(restored._postings["ocelot"].docs, type(index._doc_ids))
+
+    restored.add(4, "Ocelot kittens", "More ocelot news.", [])
+    assert _ids(restored.search([["ocelot"]], 10))[0] == 4
+    assert not InvertedIndex().restore(str(tmp_path / "missing.idx"))
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_serves_search_and_follows_writes(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "memory")
+    monkeypatch.setattr(settings, "SEARCH_INDEX_SNAPSHOT_PATH", "")
+    try:
+        async with AsyncTestingSessionLocal() as db:
+            await warm_article_index(db)
+            article = await services.create_article(
+                db, "Axolotl care", "An axolotl needs cold water.", None, ["pets"]
+            )
+            page = await services.search_articles(db, "axolotl", tags=["pets"])
+            assert [hit.article.id for hit in page.items] == [article.id]
+            assert "<mark>axolotl</mark>" in page.items[0].snippet
+
+            await services.delete_article(db, article.id)
+            page = await services.search_articles(db, "axolotl")
+            assert page.items == []
+    finally:
+        article_index.clear()
+
+
+@pytest.mark.asyncio
+async def test_catch_up_indexes_articles_written_by_other_processes(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "memory")
+    monkeypatch.setattr(settings, "SEARCH_INDEX_SNAPSHOT_PATH", "")
+    try:
+        async with AsyncTestingSessionLocal() as db:
+            await warm_article_index(db)
+            assert await catch_up_article_index(db) == 0
+
+            # A generation job worker writes through its own copy of the index
+            monkeypatch.setattr(settings, "SEARCH_BACKEND", "auto")
+            article = await services.create_article(
+                db, "Pangolin scales", "A pangolin rolls into a ball.", None, []
+            )
+            monkeypatch.setattr(settings, "SEARCH_BACKEND", "memory")
+            page = await services.search_articles(db, "pangolin")
+            assert page.items == []
+
+            assert await catch_up_article_index(db) == 1
+            page = await services.search_articles(db, "pangolin")
+            assert [hit.article.id for hit in page.items] == [article.id]
+            # The overlap window does not re-add what is already indexed
+            assert await catch_up_article_index(db) == 0
+            assert article_index.dead == 0
+    finally:
+        article_index.clear()
+
+
+@pytest.mark.asyncio
+async def test_catch_up_reindexes_late_commits_inside_the_overlap(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "memory")
+    monkeypatch.setattr(settings, "SEARCH_INDEX_SNAPSHOT_PATH", "")
+    try:
+        async with AsyncTestingSessionLocal() as db:
+            early = await services.create_article(
+                db, "Quokka notes", "A quokka smiles.", None, []
+            )
+            later = await services.create_article(
+                db, "Wombat notes", "A wombat digs.", None, []
+            )
+            await db.execute(
+                update(Article)
+                .where(Article.id == early.id)
+                .values(updated_at=later.updated_at - timedelta(seconds=30))
+            )
+            await db.commit()
+            await warm_article_index(db)
+            assert article_index.watermark >= later.updated_at
+
+            # Another process commits an edit stamped just before the
+            # watermark, after this index has moved past it
+            await db.execute(
+                update(Article)
+                .where(Article.id == early.id)
+                .values(
+                    content="A quokka hops.",
+                    updated_at=article_index.watermark - timedelta(seconds=1),
+                )
+            )
+            await db.commit()
+            assert await catch_up_article_index(db) == 1
+            page = await services.search_articles(db, "hops")
+            assert [hit.article.id for hit in page.items] == [early.id]
+            assert (await services.search_articles(db, "smiles")).items == []
+            assert await catch_up_article_index(db) == 0
+    finally:
+        article_index.clear()
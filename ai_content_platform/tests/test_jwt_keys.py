@@ -0,0 +1,75 @@
+import time
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from jose import jwt
+from ai_content_platform.app.shared import utils
+from ai_content_platform.app.shared.jwt_keys import load_key_ring
+
+
+def _write_rsa_key(path):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    path.write_bytes(
+        private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    return private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+
+
+def test_rs256_ring_verifies_with_public_keys_only(tmp_path, monkeypatch):
+    public_dir = tmp_path / "public"
+    public_dir.mkdir()
+    (public_dir / "old.pem").write_bytes(_write_rsa_key(tmp_path / "old.pem"))
+    (public_dir / "new.pem").write_bytes(_write_rsa_key(tmp_path / "new.pem"))
+
+    issuer = load_key_ring(
+        algorithm="RS256",
+        private_key_path=str(tmp_path / "new.pem"),
+        public_keys_path=str(public_dir),
+        active_kid="new",
+    )
+    verifier = load_key_ring(
+        algorithm="RS256",
+        private_key_path=None,
+        public_keys_path=str(public_dir),
+        active_kid="new",
+    )
+    assert verifier.kids == ["new", "old"]
+    with pytest.raises(RuntimeError):
+        verifier.signing_key
+
+    monkeypatch.setattr(utils, "key_ring", issuer)
+    token = utils.create_access_token({"sub": "erin"})
+    assert jwt.get_unverified_header(token)["kid"] == "new"
+
+    monkeypatch.setattr(utils, "key_ring", verifier)
+    assert utils.verify_access_token(token)["sub"] == "erin"
+
+    forged = jwt.encode(
+        {"sub": "erin", "exp": int(time.time()) + 60},
+        (tmp_path / "old.pem").read_text(),
+        algorithm="RS256",
+        headers={"kid": "new"},
+    )
+    with pytest.raises(HTTPException) as exc:
+        utils.verify_access_token(forged)
+    assert exc.value.status_code == 401
+
+
+def test_verified_tokens_are_cached_until_expiry(monkeypatch):
+    token = utils.create_access_token({"sub": "frank"})
+    utils.verify_access_token(token)
+
+    def fail_decode(*args, **kwargs):
+        raise AssertionError("cached token was decoded again")
+
+    monkeypatch.setattr(utils.jwt, "decode", fail_decode)
+    hits = utils.verified_token_cache_stats()["hits"]
+    assert utils.verify_access_token(token)["sub"] == "frank"
+    assert utils.verified_token_cache_stats()["hits"] == hits + 1
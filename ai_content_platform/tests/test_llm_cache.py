@@ -0,0 +1,71 @@
+import pytest
+from ai_content_platform.app.modules.content.gemini_service import GeminiService
+from ai_content_platform.app.modules.content.llm_cache import LLMResponseCache
+from ai_content_platform.app.modules.content.llm_gateway import LLMGateway
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    calls = []
+
+    async def generate_text(self, prompt, model=None, config=None, usage=None):
+        calls.append((prompt, config))
+        return f"reply {len(calls)}"
+
+    monkeypatch.setattr(GeminiService, "generate_text", generate_text)
+    return calls
+
+
+def _gateway(**cache_options):
+    options = dict(maxsize=16, ttl=60, max_entry_bytes=1024)
+    options.update(cache_options)
+    return LLMGateway(api_key="test", cache=LLMResponseCache(**options))
+
+
+def test_key_normalises_whitespace_but_not_content_or_params():
+    key = LLMResponseCache.cache_key
+    assert key("m", "Summarize:  a\n b ") == key("m", "Summarize: a b")
+    assert key("m", "Summarize: a b") != key("m", "Summarize: a c")
+    assert key("m", "p") != key("other", "p")
+    assert key("m", "p", {"temperature": 0}) != key("m", "p", {"temperature": 1})
+    assert key("m", "p", {"a": 1, "b": 2}) == key("m", "p", {"b": 2, "a": 1})
+
+
+@pytest.mark.asyncio
+async def test_repeated_prompt_is_served_from_cache(upstream):
+    gateway = _gateway()
+    assert await gateway.generate_text("Summarize: same content") == "reply 1"
+    assert await gateway.generate_text("Summarize:  same content") == "reply 1"
+    assert await gateway.generate_text("Summarize: new content") == "reply 2"
+    assert len(upstream) == 2
+    stats = gateway.cache.stats()
+    assert stats["hits"] == 1 and stats["size"] == 2
+    await gateway.aclose()
+
+
+@pytest.mark.asyncio
+async def test_opt_out_and_oversized_responses_bypass_cache(upstream):
+    gateway = _gateway(max_entry_bytes=4)
+    await gateway.generate_text("p", cache=False)
+    await gateway.generate_text("p", cache=False)
+    assert len(upstream) == 2 and len(gateway.cache) == 0
+    # "reply N" is longer than max_entry_bytes, so nothing is stored
+    await gateway.generate_text("p")
+    await gateway.generate_text("p")
+    assert len(upstream) == 4 and gateway.cache.stats()["oversized"] == 2
+    await gateway.aclose()
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_disabled_cache(upstream):
+    gateway = _gateway(maxsize=2)
+    for prompt in ("a", "b", "a", "c", "a", "b"):
+        await gateway.generate_text(prompt)
+    # "b" was least recently used when "c" arrived, so it went upstream twice
+    assert [prompt for prompt, _ in upstream] == ["a", "b", "c", "b"]
+    disabled = _gateway(enabled=False)
+    await disabled.generate_text("a")
+    await disabled.generate_text("a")
+    assert len(upstream) == 6
+    await gateway.aclose()
+    await disabled.aclose()
@@ -0,0 +1,73 @@
+import asyncio
+import time
+import pytest
+from ai_content_platform.app.modules.content.gemini_service import GeminiService
+from ai_content_platform.app.modules.content.llm_gateway import (
+    LLMGateway,
+    TokenBucket,
+)
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Replace the Gemini call with a slow fake that records concurrency."""
+    state = {"calls": 0, "active": 0, "peak": 0}
+
+    async def generate_text(self, prompt, **kwargs):
+        state["calls"] += 1
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            state["active"] -= 1
+        return f"reply to {prompt}"
+
+    monkeypatch.setattr(GeminiService, "generate_text", generate_text)
+    return state
+
+
+@pytest.mark.asyncio
+async def test_identical_prompts_share_one_upstream_call(upstream):
+    gateway = LLMGateway(api_key="test")
+    replies = await asyncio.gather(
+        *(gateway.generate_text("same") for _ in range(5)),
+        gateway.generate_text("other"),
+    )
+    assert replies == ["reply to same"] * 5 + ["reply to other"]
+    assert upstream["calls"] == 2
+    # Finished calls are not cached: the next request goes upstream again
+    await gateway.generate_text("same")
+    assert upstream["calls"] == 3
+    await gateway.aclose()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_call(upstream):
+    gateway = LLMGateway(api_key="test")
+    first = asyncio.create_task(gateway.generate_text("same"))
+    second = asyncio.create_task(gateway.generate_text("same"))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert await second == "reply to same"
+    assert first.cancelled() and upstream["calls"] == 1
+    await gateway.aclose()
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_capped_per_model(upstream):
+    gateway = LLMGateway(api_key="test", max_concurrency=2)
+    await asyncio.gather(*(gateway.generate_text(f"p{i}") for i in range(6)))
+    assert upstream["calls"] == 6 and upstream["peak"] == 2
+    assert gateway.stats()["in_flight"] == {"models/gemini-2.5-flash": 0}
+    await gateway.aclose()
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_spaces_requests_after_burst():
+    bucket = TokenBucket(rate=20, capacity=2)
+    started = time.monotonic()
+    for _ in range(4):
+        await bucket.acquire()
+    # Two from the burst, then two more at 20/s
+    assert 0.08 <= time.monotonic() - started < 0.5
@@ -0,0 +1,224 @@
+import asyncio
+import os
+import uuid
+import pytest
+import pytest_asyncio
+import redis.asyncio as aioredis
+from fastapi import HTTPException
+from ai_content_platform.app.modules.auth.principal import Principal
+from ai_content_platform.app.modules.chat import routes as chat_routes
+from ai_content_platform.app.modules.chat import services as chat_services
+from ai_content_platform.app.modules.chat.schemas import MessageCreate
+from ai_content_platform.app.modules.content import llm_quota as quota_module
+from ai_content_platform.app.modules.content.llm_quota import (
+    Budget,
+    LLMQuota,
+    Reservation,
+    parse_budgets,
+)
+from ai_content_platform.app.modules.content.llm_usage import UsageMeter
+from ai_content_platform.app.modules.users.models import User
+from ai_content_platform.tests.conftest import AsyncTestingSessionLocal
+
+
+class FakeRedis:
+    def __init__(self, reply=0, error=None):
+        self.reply = reply
+        self.error = error
+        self.calls = []
+
+    def register_script(self, script):
+        async def run(keys=None, args=None):
+            if self.error:
+                raise self.error
+            self.calls.append((script, list(keys), list(args)))
+            return self.reply
+
+        return run
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(quota_module, "get_async_redis_connection", lambda: fake)
+    return fake
+
+
+def _quota(**overrides):
+    options = dict(
+        enabled=True,
+        window_seconds=60,
+        user_budget=Budget(1000, 10),
+        role_budgets=parse_budgets("admin=0:0, creator=5000:0"),
+        role_pools=parse_budgets("viewer=20000:100"),
+        reserve_tokens=100,
+    )
+    options.update(overrides)
+    return LLMQuota(**options)
+
+
+def _user(*roles):
+    return Principal(id=7, username="quota", roles=frozenset(roles))
+
+
+def test_most_generous_role_budget_applies_and_pools_are_shared():
+    quota = _quota()
+    assert quota.budgets_for(_user("viewer")) == [
+        ("user:7", Budget(1000, 10)),
+        ("role:viewer", Budget(20000, 100)),
+    ]
+    assert quota.budgets_for(_user("creator")) == [("user:7", Budget(5000, 0))]
+    assert quota.budgets_for(_user("creator", "admin")) == []
+
+
+@pytest.mark.asyncio
+async def test_reserve_books_estimate_and_settle_records_actual(redis):
+    quota = _quota()
+    reservation = await quota.reserve(_user("viewer"), "a short prompt")
+    _, keys, args = redis.calls[0]
+    assert keys == [
+        "llm_quota:user:7",
+        "llm_quota:user:7:tokens",
+        "llm_quota:role:viewer",
+        "llm_quota:role:viewer:tokens",
+    ]
+    assert args[1:4] == [60000, reservation.id, reservation.tokens]
+    assert args[4:] == [1000, 10, 20000, 100] and reservation.tokens == 105
+
+    usage = UsageMeter()
+    usage.record("p", "c", None)
+    await quota.settle(Reservation.from_dict(reservation.to_dict()), usage)
+    _, settled_keys, settled_args = redis.calls[1]
+    assert settled_keys == keys and settled_args == [reservation.id, 2]
+
+
+@pytest.mark.asyncio
+async def test_over_budget_is_429_with_retry_after(redis):
+    redis.reply = 2500
+    quota = _quota()
+    with pytest.raises(HTTPException) as raised:
+        await quota.reserve(_user(), "prompt")
+    assert raised.value.status_code == 429
+    assert raised.value.headers["Retry-After"] == "3"
+    assert quota.stats()["rejected"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_unlimited_disabled_or_unreachable_quota_allows(redis):
+    assert await _quota().reserve(_user("admin"), "p") is None
+    assert await _quota(enabled=False).reserve(_user(), "p") is None
+    assert redis.calls == []
+    redis.error = ConnectionError("redis down")
+    quota = _quota()
+    assert await quota.reserve(_user(), "p") is None
+    assert quota.errors == 1
+
+
+@pytest_asyncio.fixture
+async def real_redis(monkeypatch):
+    """
+    Runs the Lua scripts themselves: on fakeredis's embedded Lua when it is
+    installed, else on the Redis at REDIS_URL; skipped without either.
+    """
+    try:
+        import fakeredis
+
+        client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    except ImportError:
+        client = aioredis.Redis.from_url(
+            os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            decode_responses=True,
+            socket_connect_timeout=0.5,
+        )
+    try:
+        await client.ping()
+    except Exception as e:
+        await client.aclose()
+        pytest.skip(f"Redis not available: {e}")
+    monkeypatch.setattr(quota_module, "get_async_redis_connection", lambda: client)
+    yield client
+    keys = [key async for key in client.scan_iter("llm_quota:*:test-*")]
+    if keys:
+        await client.delete(*keys)
+    await client.aclose()
+
+
+def _test_user(*roles):
+    return Principal(
+        id=f"test-{uuid.uuid4().hex}", username="lua", roles=frozenset(roles)
+    )
+
+
+@pytest.mark.asyncio
+async def test_lua_reserve_enforces_request_and_token_limits(real_redis):
+    by_requests = _quota(user_budget=Budget(0, 2), role_pools={})
+    user = _test_user()
+    await by_requests.reserve(user, "p")
+    await by_requests.reserve(user, "p")
+    with pytest.raises(HTTPException) as raised:
+        await by_requests.reserve(user, "p")
+    assert 1 <= int(raised.value.headers["Retry-After"]) <= 60
+
+    by_tokens = _quota(user_budget=Budget(1000, 0), role_pools={}, reserve_tokens=400)
+    user = _test_user()
+    first = await by_tokens.reserve(user, "p")
+    await by_tokens.reserve(user, "p")
+    with pytest.raises(HTTPException):
+        await by_tokens.reserve(user, "p")
+    # Settling the first estimate at its real cost frees the difference
+    usage = UsageMeter()
+    usage.record("p", "c", None)
+    await by_tokens.settle(first, usage)
+    total = await real_redis.hget(f"llm_quota:{first.keys[0]}:tokens", "total")
+    assert int(total) == 2 + first.tokens
+    assert await by_tokens.reserve(user, "p") is not None
+    assert by_tokens.errors == 0
+
+
+@pytest.mark.asyncio
+async def test_lua_reserve_frees_expired_reservations_and_checks_every_budget(
+    real_redis,
+):
+    pool = f"test-{uuid.uuid4().hex}"
+    quota = _quota(
+        window_seconds=1, user_budget=Budget(0, 5), role_pools={pool: Budget(0, 1)}
+    )
+    user, other = _test_user(pool), _test_user(pool)
+    await quota.reserve(user, "p")
+    # The shared pool is full, so nobody in the role gets in, and nothing
+    # is booked against the user's own budget either
+    with pytest.raises(HTTPException):
+        await quota.reserve(other, "p")
+    assert await real_redis.zcard(f"llm_quota:user:{other.id}") == 0
+
+    await asyncio.sleep(1.1)
+    assert await quota.reserve(other, "p") is not None
+    assert await real_redis.zcard(f"llm_quota:role:{pool}") == 1
+
+
+@pytest.mark.asyncio
+async def test_chat_reservation_is_released_when_storing_the_prompt_fails(
+    redis, monkeypatch
+):
+    monkeypatch.setattr(quota_module.llm_quota, "enabled", True)
+    async with AsyncTestingSessionLocal() as db:
+        owner = User(username="quota_chat", email="qc@example.com", hashed_password="x")
+        db.add(owner)
+        await db.commit()
+        conv = await chat_services.start_conversation(db, owner.id)
+
+        async def broken_add_message(*args, **kwargs):
+            raise RuntimeError("database is gone")
+
+        monkeypatch.setattr(chat_services, "add_message", broken_add_message)
+        with pytest.raises(RuntimeError):
+            await chat_routes.stream_message(
+                conv.id,
+                MessageCreate(sender="user", content="hello"),
+                db=db,
+                user=Principal(id=owner.id, username="quota_chat"),
+            )
+    (reserve_script, keys, args), (settle_script, settled_keys, settled) = redis.calls
+    assert reserve_script == quota_module.RESERVE_SCRIPT
+    assert settle_script == quota_module.SETTLE_SCRIPT
+    assert settled_keys == keys and settled == [args[2], 0]
@@ -0,0 +1,186 @@
+from types import SimpleNamespace
+import pytest
+from sqlalchemy.future import select
+from ai_content_platform.app.modules.auth.principal import Principal
+from ai_content_platform.app.modules.chat import routes as chat_routes
+from ai_content_platform.app.modules.chat import services as chat_services
+from ai_content_platform.app.modules.chat.models import (
+    Conversation,
+    Message,
+    TokenUsage,
+)
+from ai_content_platform.app.modules.chat.schemas import MessageCreate
+from ai_content_platform.app.modules.chat.services import track_token_usage
+from ai_content_platform.app.modules.content.gemini_service import GeminiService
+from ai_content_platform.app.modules.content.llm_cache import LLMResponseCache
+from ai_content_platform.app.modules.content.llm_gateway import LLMGateway
+from ai_content_platform.app.modules.content.llm_quota import llm_quota
+from ai_content_platform.app.modules.content.llm_usage import UsageMeter, count_tokens
+from ai_content_platform.app.modules.users.models import User
+from ai_content_platform.tests.conftest import AsyncTestingSessionLocal
+
+
+def _metadata(prompt, output, thoughts=None):
+    return SimpleNamespace(
+        prompt_token_count=prompt,
+        candidates_token_count=output,
+        thoughts_token_count=thoughts,
+    )
+
+
+def test_local_estimate_is_memoised():
+    count_tokens.cache_clear()
+    assert count_tokens("Tokenization, roughly!") == 7
+    count_tokens("Tokenization, roughly!")
+    assert count_tokens.cache_info().hits == 1
+
+
+@pytest.mark.asyncio
+async def test_service_records_reported_usage_or_an_estimate(monkeypatch):
+    service = GeminiService(api_key="test")
+    responses = [
+        SimpleNamespace(text="four words of reply", usage_metadata=_metadata(7, 5, 3)),
+        SimpleNamespace(text="reply", usage_metadata=None),
+    ]
+
+    async def generate_content(model, contents, config=None):
+        return responses.pop(0)
+
+    monkeypatch.setattr(service.client.aio.models, "generate_content", generate_content)
+    usage = UsageMeter()
+    await service.generate_text("prompt", usage=usage)
+    assert (usage.input_tokens, usage.output_tokens, usage.estimated) == (7, 8, False)
+    await service.generate_text("prompt", usage=usage)
+    assert (usage.input_tokens, usage.output_tokens) == (9, 10)
+    assert usage.estimated and usage.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_records_last_reported_usage_even_when_stopped(monkeypatch):
+    chunks = [
+        SimpleNamespace(text="a", usage_metadata=_metadata(10, 1)),
+        SimpleNamespace(text="b", usage_metadata=_metadata(10, 2)),
+        SimpleNamespace(text="c", usage_metadata=_metadata(10, 3)),
+    ]
+
+    class Stream:
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            if not chunks:
+                raise StopAsyncIteration
+            return chunks.pop(0)
+
+        async def aclose(self):
+            pass
+
+    service = GeminiService(api_key="test")
+
+    async def generate_content_stream(model, contents):
+        return Stream()
+
+    monkeypatch.setattr(
+        service.client.aio.models, "generate_content_stream", generate_content_stream
+    )
+    usage = UsageMeter()
+    stream = service.generate_streaming_text("hi", usage=usage)
+    assert [await stream.__anext__(), await stream.__anext__()] == ["a", "b"]
+    await stream.aclose()
+    assert (usage.input_tokens, usage.output_tokens, usage.calls) == (10, 2, 1)
+
+
+@pytest.mark.asyncio
+async def test_cached_answers_spend_no_tokens(monkeypatch):
+    async def generate_text(self, prompt, usage=None, **kwargs):
+        usage.record(prompt, "reply", _metadata(4, 2))
+        return "reply"
+
+    monkeypatch.setattr(GeminiService, "generate_text", generate_text)
+    gateway = LLMGateway(
+        api_key="test",
+        cache=LLMResponseCache(maxsize=4, ttl=60, max_entry_bytes=1024),
+    )
+    first, second = UsageMeter(), UsageMeter()
+    await gateway.generate_text("prompt", usage=first)
+    await gateway.generate_text("prompt", usage=second)
+    assert first.total_tokens == 6 and second.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_usage_row_splits_prompt_context_and_completion():
+    async with AsyncTestingSessionLocal() as db:
+        user = User(
+            username="usage_user", email="usage@example.com", hashed_password="x"
+        )
+        db.add(user)
+        await db.commit()
+        conv = Conversation(user_id=user.id)
+        db.add(conv)
+        await db.commit()
+
+        usage = UsageMeter()
+        usage.record("ignored", "", _metadata(120, 30))
+        row = await track_token_usage(db, conv.id, user.id, usage, prompt="Why so?")
+        assert row.prompt_tokens == count_tokens("Why so?") == 3
+        assert (row.context_tokens, row.completion_tokens) == (117, 30)
+        assert row.tokens_used == 150 and row.purpose == "chat"
+
+        assert await track_token_usage(db, None, user.id, UsageMeter()) is None
+        rows = (
+            await db.execute(select(TokenUsage).where(TokenUsage.user_id == user.id))
+        ).scalars()
+        assert len(rows.all()) == 1
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_records_usage_when_the_client_disconnects(monkeypatch):
+    settled = []
+
+    async def reserve(principal, prompt=""):
+        return "reservation"
+
+    async def settle(reservation, usage):
+        settled.append((reservation, usage.calls))
+
+    async def generate_streaming_text(self, prompt, usage=None, **kwargs):
+        usage.record(prompt, "Tides rise and fall.")
+        yield "Tides rise "
+        yield "and fall."
+
+    monkeypatch.setattr(llm_quota, "reserve", reserve)
+    monkeypatch.setattr(llm_quota, "settle", settle)
+    monkeypatch.setattr(
+        GeminiService, "generate_streaming_text", generate_streaming_text
+    )
+    async with AsyncTestingSessionLocal() as db:
+        owner = User(
+            username="usage_gone", email="usage_gone@example.com", hashed_password="x"
+        )
+        db.add(owner)
+        await db.commit()
+        conv = await chat_services.start_conversation(db, owner.id)
+        response = await chat_routes.stream_message(
+            conv.id,
+            MessageCreate(sender="user", content="Why tides?"),
+            db=db,
+            user=Principal(id=owner.id, username="usage_gone"),
+        )
+        assert await response.body_iterator.__anext__() == "Tides rise "
+        # The client goes away; Starlette then skips the background task
+        await response.body_iterator.aclose()
+
+    assert settled == [("reservation", 1)]
+    async with AsyncTestingSessionLocal() as db:
+        usage = (
+            await db.execute(
+                select(TokenUsage).where(TokenUsage.conversation_id == conv.id)
+            )
+        ).scalar_one()
+        assert usage.tokens_used > 0 and usage.user_id == owner.id
+        reply = await db.scalar(
+            select(Message.content).where(
+                Message.conversation_id == conv.id, Message.sender == "assistant"
+            )
+        )
+    assert reply == "[INCOMPLETE] Tides rise "
@@ -0,0 +1,61 @@
+import pytest
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.modules.chat import services
+from ai_content_platform.app.modules.users.models import User
+from ai_content_platform.tests.conftest import AsyncTestingSessionLocal
+
+
+async def _conversation(db, name, count):
+    user = User(username=name, email=f"{name}@example.com", hashed_password="x")
+    db.add(user)
+    await db.commit()
+    conv = await services.start_conversation(db, user.id)
+    messages = [
+        await services.add_message(db, conv.id, "user", f"message number {i}")
+        for i in range(count)
+    ]
+    return conv, [m.id for m in messages]
+
+
+@pytest.mark.asyncio
+async def test_pages_walk_backwards_and_forwards_by_message_id():
+    async with AsyncTestingSessionLocal() as db:
+        conv, ids = await _conversation(db, "history_pages", 7)
+
+        page = await services.get_conversation_messages(db, conv.id, limit=3)
+        assert [m.id for m in page.items] == ids[4:]
+        assert page.next_cursor == str(ids[4])
+        page = await services.get_conversation_messages(
+            db, conv.id, limit=3, before=int(page.next_cursor)
+        )
+        assert [m.id for m in page.items] == ids[1:4]
+        page = await services.get_conversation_messages(
+            db, conv.id, limit=3, before=int(page.next_cursor)
+        )
+        assert [m.id for m in page.items] == ids[:1] and page.next_cursor is None
+
+        page = await services.get_conversation_messages(
+            db, conv.id, limit=2, after=ids[1]
+        )
+        assert [m.id for m in page.items] == ids[2:4]
+        assert page.next_cursor == str(ids[3])
+        # A range read between two messages
+        page = await services.get_conversation_messages(
+            db, conv.id, limit=10, after=ids[1], before=ids[5]
+        )
+        assert [m.id for m in page.items] == ids[2:5] and page.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_fields_projection_returns_only_requested_columns(monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_MESSAGE_SNIPPET_CHARS", 9)
+    async with AsyncTestingSessionLocal() as db:
+        conv, ids = await _conversation(db, "history_fields", 3)
+        page = await services.get_conversation_messages(
+            db, conv.id, limit=2, fields=["sender", "snippet"]
+        )
+    assert page.items == [
+        {"sender": "user", "snippet": "message n"},
+        {"sender": "user", "snippet": "message n"},
+    ]
+    assert page.next_cursor == str(ids[1])
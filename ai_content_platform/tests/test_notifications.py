@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+import pytest
+from ai_content_platform.app.modules.notifications.models import (
+    InAppNotificationStore,
+    Notification,
+)
+from ai_content_platform.app.modules.notifications.services import NotificationService
+from ai_content_platform.tests.conftest import AsyncTestingSessionLocal
+
+
+async def _viewer_headers(client, username):
+    response = await client.post(
+        "/auth/register",
+        json={
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": "secret",
+            "role": "viewer",
+        },
+    )
+    user_id = response.json()["id"]
+    response = await client.post(
+        "/auth/login", data={"username": username, "password": "secret"}
+    )
+    return user_id, {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_route_pages_notifications_from_the_database(client, monkeypatch):
+    # Nothing was sent by this process; every notification is in the database
+    monkeypatch.setattr(InAppNotificationStore, "_notifications", [])
+    user_id, headers = await _viewer_headers(client, "nina_notify")
+    start = datetime.utcnow()
+    async with AsyncTestingSessionLocal() as db:
+        db.add_all(
+            Notification(
+                user_id=user_id,
+                message=f"note {i}",
+                notif_type="in_app",
+                read=i == 0,
+                created_at=start + timedelta(seconds=i),
+            )
+            for i in range(5)
+        )
+        db.add(Notification(user_id=user_id, message="mailed", notif_type="email"))
+        await db.commit()
+
+    first = await client.get(f"/api/notifications/{user_id}?limit=3", headers=headers)
+    assert first.status_code == 200
+    assert [n["message"] for n in first.json()] == ["note 4", "note 3", "note 2"]
+    cursor = first.headers["X-Next-Cursor"]
+    second = await client.get(
+        f"/api/notifications/{user_id}",
+        params={"limit": 3, "cursor": cursor},
+        headers=headers,
+    )
+    assert [n["message"] for n in second.json()] == ["note 1", "note 0"]
+    assert "X-Next-Cursor" not in second.headers
+
+    unread = await client.get(
+        f"/api/notifications/{user_id}?unread_only=true", headers=headers
+    )
+    assert len(unread.json()) == 4
+
+
+@pytest.mark.asyncio
+async def test_store_is_served_newest_first_without_a_database(monkeypatch):
+    monkeypatch.setattr(InAppNotificationStore, "_notifications", [])
+    service = NotificationService()
+    for message in ("one", "two", "three"):
+        service.send_in_app_notification(7, message)
+    service.send_email_notification(7, "mailed", "seven@example.com")
+
+    page = await service.get_user_notifications(7, limit=2)
+    assert [n.message for n in page.items] == ["three", "two"]
+    assert page.next_cursor is None
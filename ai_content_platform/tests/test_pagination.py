@@ -0,0 +1,82 @@
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from fastapi import HTTPException
+from ai_content_platform.app.modules.content.models import Tag
+from ai_content_platform.app.modules.chat.models import Conversation
+from ai_content_platform.app.shared.pagination import (
+    NEXT_CURSOR_HEADER,
+    created_at_key,
+    decode_cursor,
+    encode_cursor,
+    make_page,
+)
+from ai_content_platform.tests.conftest import AsyncTestingSessionLocal
+
+
+def test_cursor_round_trips_typed_values():
+    created = datetime(2026, 10, 16, 12, 30, 5, 123456)
+    cursor = encode_cursor((created, 42))
+    assert "=" not in cursor  # URL-safe, unpadded
+    columns = (Conversation.created_at, Conversation.id)
+    assert decode_cursor(cursor, columns) == (created, 42)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor((1, 2, 3))])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, (Conversation.created_at, Conversation.id))
+    assert exc.value.status_code == 400
+
+
+def test_make_page_trims_look_ahead_row():
+    rows = [
+        SimpleNamespace(id=i, created_at=datetime(2026, 1, 1, 0, 0, i))
+        for i in range(3, 0, -1)
+    ]
+    page = make_page(rows, 2, created_at_key)
+    assert [r.id for r in page.items] == [3, 2]
+    assert page.next_cursor == encode_cursor((rows[1].created_at, 2))
+    last = make_page(rows[:2], 2, created_at_key)
+    assert last.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_tag_listing_walks_pages_with_cursor(client):
+    async with AsyncTestingSessionLocal() as session:
+        session.add_all([Tag(name=f"page-tag-{i}") for i in range(5)])
+        await session.commit()
+
+    await client.post(
+        "/auth/register",
+        json={
+            "username": "dave_pages",
+            "email": "dave_pages@example.com",
+            "password": "string",
+            "role": "viewer",
+        },
+    )
+    response = await client.post(
+        "/auth/login", data={"username": "dave_pages", "password": "string"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = await client.get("/content/tags/", params=params, headers=headers)
+        assert page.status_code == 200
+        assert len(page.json()) <= 2
+        seen.extend(tag["id"] for tag in page.json())
+        cursor = page.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+    assert seen == sorted(seen)
+    assert len(seen) == len(set(seen)) >= 5
+
+    bad = await client.get(
+        "/content/tags/", params={"cursor": "garbage"}, headers=headers
+    )
+    assert bad.status_code == 400
@@ -0,0 +1,60 @@
+import asyncio
+import threading
+import pytest
+from fastapi import HTTPException
+from ai_content_platform.app.modules.users import password_hasher as hasher_module
+from ai_content_platform.app.modules.users.password_hasher import PasswordHasher
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_round_trip_off_the_event_loop(monkeypatch):
+    threads = []
+    timed_hash = hasher_module._timed_hash
+
+    def recording_hash(password):
+        threads.append(threading.current_thread().name)
+        return timed_hash(password)
+
+    monkeypatch.setattr(hasher_module, "_timed_hash", recording_hash)
+    hasher = PasswordHasher(workers=2, max_pending=4)
+    try:
+        hashed = await hasher.hash("correct horse")
+        assert hashed != "correct horse"
+        assert await hasher.verify("correct horse", hashed)
+        assert not await hasher.verify("wrong horse", hashed)
+        assert not await hasher.verify("correct horse", "not a bcrypt hash")
+    finally:
+        hasher.shutdown()
+    assert threads and threads[0].startswith("pwhash")
+    assert threads[0] != threading.current_thread().name
+    assert hasher.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_saturated_pool_rejects_with_429_and_retry_after(monkeypatch):
+    release = threading.Event()
+
+    def blocked_hash(password):
+        release.wait(5)
+        return "hashed", 0.0
+
+    monkeypatch.setattr(hasher_module, "_timed_hash", blocked_hash)
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    rejected = hasher.rejected.value
+    try:
+        first = asyncio.create_task(hasher.hash("one"))
+        while hasher.pending < 1:
+            await asyncio.sleep(0.01)
+        with pytest.raises(HTTPException) as busy:
+            await hasher.hash("two")
+        assert busy.value.status_code == 429
+        assert busy.value.headers["Retry-After"] == "1"
+        assert hasher.rejected.value == rejected + 1
+
+        release.set()
+        assert await first == "hashed"
+        # Capacity is back once the queued call finishes
+        assert hasher.pending == 0
+    finally:
+        release.set()
+        hasher.shutdown()
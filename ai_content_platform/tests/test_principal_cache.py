@@ -0,0 +1,117 @@
+import time
+import pytest
+from sqlalchemy import delete, select
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.shared.cache import TTLCache
+from ai_content_platform.app.modules.auth import principal as principal_module
+from ai_content_platform.app.modules.auth.models import user_roles
+from ai_content_platform.app.modules.auth.principal import (
+    PrincipalCache,
+    principal_cache,
+)
+from ai_content_platform.app.modules.users.models import User
+from ai_content_platform.tests.conftest import AsyncTestingSessionLocal
+
+
+def test_ttl_cache_lru_eviction_and_expiry():
+    cache = TTLCache(maxsize=2, ttl=60, name="test")
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" becomes most recently used
+    cache.set("c", 3)  # evicts "b"
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    cache.set("d", 4, ttl=0)  # non-positive TTL is never stored
+    assert "d" not in cache
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_current_user_is_served_from_principal_cache(client, monkeypatch):
+    # Tokens without RBAC claims resolve through the principal cache
+    monkeypatch.setattr(settings, "RBAC_TOKEN_CLAIMS_ENABLED", False)
+    await client.post(
+        "/auth/register",
+        json={
+            "username": "carol_cache",
+            "email": "carol_cache@example.com",
+            "password": "string",
+            "role": "viewer",
+        },
+    )
+    response = await client.post(
+        "/auth/login", data={"username": "carol_cache", "password": "string"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    hits_before = principal_cache.stats()["hits"]
+    first = await client.get("/users/me/roles-permissions", headers=headers)
+    second = await client.get("/users/me/roles-permissions", headers=headers)
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert "view_content" in second.json()["permissions"]
+    assert principal_cache.stats()["hits"] > hits_before
+
+    await principal_cache.invalidate_user("carol_cache")
+    assert not any(
+        key[0] == "carol_cache" for key in principal_cache._local._data.keys()
+    )
+
+
+class _Revocations:
+    def __init__(self, cutoff=None, error=None):
+        self.cutoff = cutoff
+        self.error = error
+
+    async def get(self, key):
+        if self.error:
+            raise self.error
+        return self.cutoff
+
+
+@pytest.mark.asyncio
+async def test_claims_are_trusted_only_when_revocations_are_shared(monkeypatch):
+    local_only = PrincipalCache(maxsize=10, ttl=60)
+    assert not await local_only.trusts_claims("dan", time.time())
+
+    shared = PrincipalCache(maxsize=10, ttl=60, redis_enabled=True)
+    redis = _Revocations()
+    monkeypatch.setattr(principal_module, "get_async_redis_connection", lambda: redis)
+    assert await shared.trusts_claims("dan", time.time())
+    # Another worker invalidated the user after this token was issued
+    redis.cutoff = str(time.time())
+    assert not await shared.trusts_claims("dan", time.time() - 60)
+    assert await shared.trusts_claims("dan", time.time() + 1)
+    redis.error = ConnectionError("redis down")
+    assert not await shared.trusts_claims("dan", time.time() + 1)
+    assert shared.stats()["redis_errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_user_deleted_elsewhere_is_rejected_without_redis(client):
+    assert not principal_cache.redis_enabled
+    await client.post(
+        "/auth/register",
+        json={
+            "username": "gone_user",
+            "email": "gone_user@example.com",
+            "password": "string",
+            "role": "viewer",
+        },
+    )
+    response = await client.post(
+        "/auth/login", data={"username": "gone_user", "password": "string"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    # Deleted by another worker, whose invalidation this process never sees
+    async with AsyncTestingSessionLocal() as db:
+        user_id = (
+            await db.execute(select(User.id).where(User.username == "gone_user"))
+        ).scalar_one()
+        await db.execute(delete(user_roles).where(user_roles.c.user_id == user_id))
+        await db.execute(delete(User).where(User.id == user_id))
+        await db.commit()
+    response = await client.get("/users/me/roles-permissions", headers=headers)
+    assert response.status_code == 401
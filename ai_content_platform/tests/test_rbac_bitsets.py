@@ -0,0 +1,83 @@
+import pytest
+from ai_content_platform.app.modules.auth.permissions import permission_registry
+from ai_content_platform.app.modules.auth.principal import Principal
+from ai_content_platform.app.shared.utils import verify_access_token
+from ai_content_platform.tests.conftest import AsyncTestingSessionLocal
+
+
+@pytest.mark.asyncio
+async def test_role_masks_compile_seeded_grants():
+    async with AsyncTestingSessionLocal() as session:
+        registry = await permission_registry.refresh(session)
+    viewer_mask = registry.mask_for_roles(["viewer"])
+    assert registry.allows(viewer_mask, "view_content")
+    assert not registry.allows(viewer_mask, "delete_content")
+    assert not registry.allows(viewer_mask, "no_such_permission")
+    admin_mask = registry.mask_for_roles(["admin"])
+    assert registry.names_for(admin_mask) >= registry.names_for(viewer_mask)
+
+
+@pytest.mark.asyncio
+async def test_access_token_carries_permission_claims(client):
+    await client.post(
+        "/auth/register",
+        json={
+            "username": "dave_rbac",
+            "email": "dave_rbac@example.com",
+            "password": "string",
+            "role": "viewer",
+        },
+    )
+    response = await client.post(
+        "/auth/login", data={"username": "dave_rbac", "password": "string"}
+    )
+    payload = verify_access_token(response.json()["access_token"])
+    assert payload["pv"] == permission_registry.version
+
+    principal = Principal.from_claims(payload, permission_registry)
+    assert principal is not None
+    assert principal.roles == {"viewer"}
+    assert "view_content" in principal.permissions
+
+    stale = dict(payload, pv="outdated")
+    assert Principal.from_claims(stale, permission_registry) is None
+
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    denied = await client.post(
+        "/content/articles/",
+        json={"title": "x", "content": "y"},
+        headers=headers,
+    )
+    assert denied.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_login_and_refresh_reuse_the_loaded_registry(client, monkeypatch):
+    async with AsyncTestingSessionLocal() as session:
+        await permission_registry.ensure_fresh(session)
+    reloads = []
+    refresh = permission_registry.refresh
+
+    async def counting_refresh(db):
+        reloads.append(db)
+        return await refresh(db)
+
+    monkeypatch.setattr(permission_registry, "refresh", counting_refresh)
+    await client.post(
+        "/auth/register",
+        json={
+            "username": "erin_rbac",
+            "email": "erin_rbac@example.com",
+            "password": "string",
+            "role": "viewer",
+        },
+    )
+    response = await client.post(
+        "/auth/login", data={"username": "erin_rbac", "password": "string"}
+    )
+    assert response.status_code == 200
+    response = await client.post(
+        "/auth/token/refresh", json={"refresh_token": response.json()["refresh_token"]}
+    )
+    assert response.status_code == 200
+    assert reloads == []
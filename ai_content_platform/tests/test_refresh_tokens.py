@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import func, insert, select
+from ai_content_platform.app.modules.auth.models import RefreshToken
+from ai_content_platform.app.modules.auth.refresh_tokens import (
+    sweep_expired_refresh_tokens,
+)
+from ai_content_platform.tests.conftest import AsyncTestingSessionLocal
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_can_only_be_rotated_once(client):
+    await client.post(
+        "/auth/register",
+        json={
+            "username": "gina_rt",
+            "email": "gina_rt@example.com",
+            "password": "string",
+            "role": "viewer",
+        },
+    )
+    response = await client.post(
+        "/auth/login", data={"username": "gina_rt", "password": "string"}
+    )
+    refresh_token = response.json()["refresh_token"]
+
+    first = await client.post(
+        "/auth/token/refresh", json={"refresh_token": refresh_token}
+    )
+    assert first.status_code == 200
+    replay = await client.post(
+        "/auth/token/refresh", json={"refresh_token": refresh_token}
+    )
+    assert replay.status_code == 401
+    second = await client.post(
+        "/auth/token/refresh", json={"refresh_token": first.json()["refresh_token"]}
+    )
+    assert second.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_sweeper_deletes_only_expired_tokens_in_batches():
+    now = datetime.utcnow()
+    rows = [
+        {
+            "token_hash": f"sweep-{i}",
+            "expires_at": now + timedelta(days=-1 if i < 25 else 1),
+            "revoked": i % 2 == 0,
+        }
+        for i in range(30)
+    ]
+    async with AsyncTestingSessionLocal() as session:
+        await session.execute(insert(RefreshToken), rows)
+        await session.commit()
+
+        swept = await sweep_expired_refresh_tokens(session, batch_size=10, now=now)
+        assert swept == 25
+        remaining = await session.scalar(
+            select(func.count())
+            .select_from(RefreshToken)
+            .where(RefreshToken.token_hash.like("sweep-%"))
+        )
+        assert remaining == 5
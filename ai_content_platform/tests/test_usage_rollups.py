@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import delete, update
+from ai_content_platform.app.config import settings
+from ai_content_platform.app.modules.chat import usage_rollups
+from ai_content_platform.app.modules.chat.models import (
+    Conversation,
+    TokenUsage,
+    TokenUsageRollup,
+)
+from ai_content_platform.app.modules.content.models import BatchCheckpoint
+from ai_content_platform.app.modules.users.models import User
+from ai_content_platform.tests.conftest import AsyncTestingSessionLocal
+
+
+def _usage(user_id, conversation_id, model, tokens, created_at, purpose="chat"):
+    return TokenUsage(
+        user_id=user_id,
+        conversation_id=conversation_id,
+        model=model,
+        purpose=purpose,
+        prompt_tokens=tokens // 2,
+        completion_tokens=tokens - tokens // 2,
+        tokens_used=tokens,
+        created_at=created_at,
+    )
+
+
+@pytest.mark.asyncio
+async def test_rollups_are_incremental_and_answer_grouped_queries():
+    day = datetime(2026, 3, 1, 9, 30)
+    async with AsyncTestingSessionLocal() as db:
+        # Start from empty tables and no checkpoint
+        await db.execute(delete(TokenUsage))
+        await db.execute(delete(TokenUsageRollup))
+        await db.execute(
+            delete(BatchCheckpoint).where(
+                BatchCheckpoint.name == usage_rollups.CHECKPOINT_NAME
+            )
+        )
+        await db.commit()
+
+        user = User(username="rollup", email="rollup@example.com", hashed_password="x")
+        db.add(user)
+        await db.commit()
+        conv = Conversation(user_id=user.id)
+        db.add(conv)
+        await db.commit()
+        db.add_all(
+            [
+                _usage(user.id, conv.id, "flash", 100, day),
+                _usage(user.id, conv.id, "flash", 50, day + timedelta(minutes=20)),
+                _usage(user.id, None, "pro", 30, day + timedelta(hours=2), "article"),
+                # Too recent: left for the next pass
+                _usage(user.id, conv.id, "flash", 7, datetime.utcnow()),
+            ]
+        )
+        await db.commit()
+
+        assert await usage_rollups.roll_up_usage(db, batch_size=2) == 2
+        assert await usage_rollups.roll_up_usage(db) == 1
+        assert await usage_rollups.roll_up_usage(db) == 0
+
+        by_hour = await usage_rollups.usage_totals(
+            db, start=day, group_by=["bucket"], granularity="hour"
+        )
+        assert [
+            (r["bucket"].hour, r["tokens_used"], r["requests"]) for r in by_hour
+        ] == [
+            (9, 150, 2),
+            (11, 30, 1),
+        ]
+        by_model = await usage_rollups.usage_totals(
+            db, day, day + timedelta(days=1), ["model", "purpose"], user_id=user.id
+        )
+        assert [(r["model"], r["purpose"], r["tokens_used"]) for r in by_model] == [
+            ("flash", "chat", 150),
+            ("pro", "article", 30),
+        ]
+        [total] = await usage_rollups.usage_totals(db, end=day + timedelta(days=1))
+        assert total["tokens_used"] == 180 and total["prompt_tokens"] == 90
+
+        with pytest.raises(ValueError):
+            await usage_rollups.usage_totals(db, group_by=["tenant"])
+
+
+@pytest.mark.asyncio
+async def test_rows_without_a_timestamp_do_not_stall_the_rollup(monkeypatch):
+    monkeypatch.setattr(settings, "USAGE_ROLLUP_LAG_SECONDS", 0)
+    day = datetime(2026, 4, 1, 8, 0)
+    async with AsyncTestingSessionLocal() as db:
+        user = User(username="rollup_null", email="rn@example.com", hashed_password="x")
+        db.add(user)
+        await db.commit()
+        while await usage_rollups.roll_up_usage(db) > 0:
+            pass
+        broken = _usage(user.id, None, "flash", 11, day)
+        db.add(broken)
+        await db.commit()
+        await db.execute(
+            update(TokenUsage).where(TokenUsage.id == broken.id).values(created_at=None)
+        )
+        db.add(_usage(user.id, None, "flash", 5, day))
+        await db.commit()
+
+        assert await usage_rollups.roll_up_usage(db) == 1
+        [total] = await usage_rollups.usage_totals(
+            db, day, day + timedelta(days=1), user_id=user.id
+        )
+        assert total["tokens_used"] == 5
+        checkpoint = await db.get(BatchCheckpoint, usage_rollups.CHECKPOINT_NAME)
+        assert checkpoint.last_id > broken.id
@@ -0,0 +1,31 @@
+import asyncio
+import pytest
+from ai_content_platform.app import worker
+
+
+@pytest.mark.asyncio
+async def test_background_loops_share_one_event_loop(monkeypatch):
+    loops = []
+
+    async def crashes():
+        loops.append(asyncio.get_running_loop())
+        raise RuntimeError("boom")
+
+    async def finishes():
+        await asyncio.sleep(0)
+        loops.append(asyncio.get_running_loop())
+
+    monkeypatch.setattr(
+        worker, "BACKGROUND_LOOPS", {"crashes": crashes, "finishes": finishes}
+    )
+    # One loop failing is logged and does not take the others down
+    await worker.run_background_loops()
+    assert loops == [asyncio.get_running_loop()] * 2
+
+
+def test_background_loops_are_coroutines():
+    assert "refresh-token sweeper" in worker.BACKGROUND_LOOPS
+    assert "token usage rollups" in worker.BACKGROUND_LOOPS
+    assert "message embedder" in worker.BACKGROUND_LOOPS
+    for run in worker.BACKGROUND_LOOPS.values():
+        assert asyncio.iscoroutinefunction(run)